@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark of reading stored blocks, by the number of transactions in a block.
+
+A chain database is written with the given number of synthetic blocks for each number of
+transactions, as `DATA_Block` records of a database with the previous version, and opened, which
+migrates them if the layout of the blocks changed, then compacted. Reports the time taken to open
+the chain and the mean latency of `GetSysFeeAmount`, `GetHeader` and `GetBlockByHash`, reading a
+system fee amount, a header and a trimmed block by hash, per number of transactions.
+
+Usage:
+
+    python benchmarks/bench_block_reads.py
+    python benchmarks/bench_block_reads.py --transactions 1 500 5000 --blocks 1000 --runs 5
+"""
+import os
+import sys
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import logging
+
+import logzero
+
+# Allow importing 'neo' from parent path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from neo.Core.Blockchain import Blockchain
+from neo.Core.Header import Header
+from neo.IO.MemoryStream import StreamManager
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neocore.IO.BinaryWriter import BinaryWriter
+
+# version of databases storing blocks as `DATA_Block` records
+PREVIOUS_VERSION = b'/NEO:2.0.1/binary-state/'
+
+
+def trimmed_block(header, hashes):
+    # as written by `Block.Trim`
+    ms = StreamManager.GetStream()
+    writer = BinaryWriter(ms)
+    header.SerializeUnsigned(writer)
+    writer.WriteByte(1)
+    header.Script.Serialize(writer)
+    writer.WriteHashes(hashes)
+    out = ms.ToArray()
+    StreamManager.ReleaseStream(ms)
+    return out
+
+
+def make_chain(path, transactions, blocks):
+    chain = LevelDBBlockchain(path)
+
+    genesis = Blockchain.GenesisBlock()
+    hashes = {}
+    index = 0
+    with chain._db.write_batch() as wb:
+        for count in transactions:
+            hashes[count] = []
+            for i in range(blocks):
+                index += 1
+                header = Header(genesis.Hash, genesis.MerkleRoot, genesis.Timestamp + index, index,
+                                genesis.ConsensusData, genesis.NextConsensus, genesis.Script)
+                tx_hashes = [hashlib.sha256(b'%d-%d' % (index, n)).hexdigest().encode('utf-8') for n in range(count)]
+
+                hash = header.Hash.ToBytes()
+                wb.put(DBPrefix.DATA_Block + hash, index.to_bytes(8, 'little') + trimmed_block(header, tx_hashes))
+                hashes[count].append(hash)
+
+        wb.put(DBPrefix.SYS_Version, PREVIOUS_VERSION)
+
+    chain._db.close()
+    return hashes
+
+
+def measure(function, hashes, runs):
+    start = time.perf_counter()
+    for i in range(runs):
+        for hash in hashes:
+            function(hash)
+    return (time.perf_counter() - start) / (runs * len(hashes))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, nargs='+', default=[1, 100, 1000, 5000])
+    parser.add_argument("--blocks", type=int, default=200, help="blocks per number of transactions")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    logzero.loglevel(logging.WARNING)
+
+    path = tempfile.mkdtemp(prefix="bench_block_reads_")
+    try:
+        hashes = make_chain(path, args.transactions, args.blocks)
+
+        start = time.perf_counter()
+        chain = LevelDBBlockchain(path)
+        print("%8d blocks: open %.3f s" % (args.blocks * len(args.transactions), time.perf_counter() - start))
+
+        # not slowed by a compaction running after a migration
+        chain._db.compact_range()
+
+        for count in args.transactions:
+            latencies = [measure(read, hashes[count], args.runs) for read in
+                         [chain.GetSysFeeAmount, chain.GetHeader, chain.GetBlockByHash]]
+            print("%8d transactions: GetSysFeeAmount %8.1f us, GetHeader %8.1f us, GetBlockByHash %8.1f us" %
+                  tuple([count] + [latency * 1000000 for latency in latencies]))
+
+        chain.Dispose()
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark of GAS bonus calculation for wallets holding many spent NEO coins.
+
+A chain database is written with the given number of blocks, each with a cumulative system fee
+amount, and opened. A wallet's spent NEO coins, each spent at its own range of heights, have
+their bonus calculated with `Blockchain.CalculateBonusInternal`, as done by `GetUnclaimedCoins`,
+`GetAvailableClaimTotal` and claim transactions. Reports the time taken to open the chain (twice,
+as a snapshot of the system fee amounts may be written when disposed) and the mean latency of
+the bonus calculation per number of coins.
+
+Usage:
+
+    python benchmarks/bench_claim_bonus.py
+    python benchmarks/bench_claim_bonus.py --blocks 500000 --coins 100 1000 10000
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import hashlib
+import argparse
+import binascii
+import tempfile
+import logging
+from collections import namedtuple
+
+import logzero
+
+# Allow importing 'neo' from parent path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from neo.Core.Blockchain import Blockchain
+from neo.Core.Header import Header
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.TrimmedBlock import SplitTrimmedBlock
+from neocore.Fixed8 import Fixed8
+
+CoinHeight = namedtuple('CoinHeight', 'start end')
+
+
+class SpentCoin():
+
+    def __init__(self, start, end, value):
+        self.Heights = CoinHeight(start, end)
+        self.Value = value
+
+
+def make_chain(path, count):
+    chain = LevelDBBlockchain(path)
+
+    genesis = Blockchain.GenesisBlock()
+    current = Header(genesis.Hash, genesis.MerkleRoot, genesis.Timestamp + count, count - 1,
+                     genesis.ConsensusData, genesis.NextConsensus, genesis.Script)
+    raw = bytes(genesis.Hash.Data)
+    amount = 0
+    with chain._db.write_batch() as wb:
+        for start in range(0, count, 2000):
+            hashes = [raw] + [hashlib.sha256(i.to_bytes(4, 'little')).digest() for i in range(max(start, 1), start + 2000)]
+            if start + 2000 == count:
+                hashes[-1] = bytes(current.Hash.Data)
+            wb.put(DBPrefix.IX_HeaderHashList + start.to_bytes(4, 'little'), binascii.hexlify(b''.join(hashes[-2000:])))
+            raw = hashes[-1]
+
+            for height, hash in enumerate(hashes[-2000:], start):
+                if height > 0:
+                    amount += height % 7
+                    wb.put(DBPrefix.DATA_SysFee + binascii.hexlify(hash[::-1]), amount.to_bytes(8, 'little'))
+
+        wb.put(DBPrefix.DATA_Header + current.Hash.ToBytes(), SplitTrimmedBlock(binascii.unhexlify(current.ToArray()))[0])
+        wb.put(DBPrefix.SYS_CurrentHeader, current.Hash.ToBytes() + (count - 1).to_bytes(4, 'little'))
+        wb.put(DBPrefix.SYS_CurrentBlock, current.Hash.ToBytes() + (count - 1).to_bytes(4, 'little'))
+
+    chain.Dispose()
+
+
+def open_chain(path):
+    start = time.perf_counter()
+    chain = LevelDBBlockchain(path)
+    return chain, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=200000)
+    parser.add_argument("--coins", type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    logzero.loglevel(logging.WARNING)
+
+    count = args.blocks - args.blocks % 2000
+    path = tempfile.mkdtemp(prefix="bench_claim_bonus_")
+    try:
+        make_chain(path, count)
+
+        chain, first = open_chain(path)
+        chain.Dispose()
+        chain, second = open_chain(path)
+        print("%8d blocks: open %.3f s, then %.3f s" % (count, first, second))
+
+        Blockchain.DeregisterBlockchain()
+        Blockchain.RegisterBlockchain(chain)
+
+        rnd = random.Random(count)
+        for coins in args.coins:
+            unclaimed = []
+            for i in range(coins):
+                start = rnd.randint(0, count - 2)
+                unclaimed.append(SpentCoin(start, rnd.randint(start + 1, count - 1), Fixed8.FromDecimal(rnd.randint(1, 100))))
+
+            start = time.perf_counter()
+            for i in range(args.runs):
+                Blockchain.CalculateBonusInternal(unclaimed)
+            elapsed = (time.perf_counter() - start) / args.runs
+            print("%8d coins: CalculateBonusInternal %10.3f ms" % (coins, elapsed * 1000))
+
+        chain.Dispose()
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for DBCollection change tracking.
+
+Simulates persisting a block which touches a large number of storage keys: every key is
+read-or-created with `GetAndChange`, a part of them is removed again, and the collection
+is committed to a throwaway LevelDB through a write batch.
+
+Usage:
+
+    python benchmarks/bench_dbcollection.py
+    python benchmarks/bench_dbcollection.py --keys 10000 50000 100000 --legacy
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+import plyvel
+
+# Allow importing 'neo' from parent path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Core.State.StorageItem import StorageItem
+
+
+class ListTrackingDBCollection(DBCollection):
+    """ DBCollection with the former list based change tracking, for comparison """
+
+    def __init__(self, db, sn, prefix, class_ref):
+        super(ListTrackingDBCollection, self).__init__(db, sn, prefix, class_ref)
+        self.Changed = []
+        self.Deleted = []
+
+    def Remove(self, keyval):
+        if keyval not in self.Deleted:
+            self.Deleted.append(keyval)
+
+    def MarkChanged(self, keyval):
+        if keyval not in self.Changed:
+            self.Changed.append(keyval)
+
+
+def persist_block(db, collection_class, num_keys, delete_every):
+    sn = db.snapshot()
+    storages = collection_class(db, sn, DBPrefix.ST_Storage, StorageItem)
+
+    start = time.perf_counter()
+    with db.write_batch() as wb:
+        for i in range(num_keys):
+            key = i.to_bytes(20, 'little') + b'balance'
+            item = storages.GetAndChange(key, StorageItem(value=bytearray(8)))
+            item.Value = i.to_bytes(8, 'little')
+
+        for i in range(0, num_keys, delete_every):
+            storages.Remove(i.to_bytes(20, 'little') + b'balance')
+
+        storages.Commit(wb)
+    sn.close()
+
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, nargs="+", default=[10000, 50000, 100000],
+                        help="number of keys touched by the synthetic block")
+    parser.add_argument("--delete-every", type=int, default=10, help="remove every n-th key again")
+    parser.add_argument("--legacy", action="store_true", default=False,
+                        help="also run the former list based tracking (quadratic, slow above ~20k keys)")
+    args = parser.parse_args()
+
+    variants = [("DBCollection", DBCollection)]
+    if args.legacy:
+        variants.append(("list tracking", ListTrackingDBCollection))
+
+    for name, collection_class in variants:
+        for num_keys in args.keys:
+            path = tempfile.mkdtemp(prefix="bench_dbcollection_")
+            try:
+                db = plyvel.DB(path, create_if_missing=True)
+                elapsed = persist_block(db, collection_class, num_keys, args.delete_every)
+                db.close()
+            finally:
+                shutil.rmtree(path)
+
+            print("%-15s %8s keys: %8.3f s  (%6.2f us/key)" % (name, num_keys, elapsed, elapsed * 1e6 / num_keys))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark of header hash lookups on a `LevelDBBlockchain` with a long header index.
+
+A fresh chain in a temporary directory gets its header index filled with the given number of
+synthetic header hashes, as on mainnet. Reports the mean latency of `GetBlock` by hash (as the
+`getblock` RPC method does) for hashes near the genesis block, at the middle and at the tip of
+the index and for an unknown hash, and of adding a batch of 2000 headers on top of the index.
+
+Usage:
+
+    python benchmarks/bench_header_index.py
+    python benchmarks/bench_header_index.py --headers 500000 2000000 --runs 20
+"""
+import os
+import sys
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import logging
+
+import logzero
+
+# Allow importing 'neo' from parent path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from neo.Core.Blockchain import Blockchain
+from neo.Core.Header import Header
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+
+
+def fill_header_index(chain, count):
+    hashes = [hashlib.sha256(i.to_bytes(4, 'little')).hexdigest().encode('utf-8') for i in range(1, count)]
+
+    chain._header_index.extend(hashes)
+    chain._stored_header_count = count - count % 2000
+
+    # the blocks looked up read as the genesis block
+    genesis = Blockchain.GenesisBlock().Hash.ToBytes()
+    for prefix in [DBPrefix.DATA_Header, DBPrefix.DATA_BlockTransactions]:
+        record = chain._db.get(prefix + genesis)
+        for hash in [hashes[10], hashes[len(hashes) // 2], hashes[-1]]:
+            chain._db.put(prefix + hash, record)
+
+    return hashes
+
+
+def new_headers(prevhash, start, count):
+    genesis = Blockchain.GenesisBlock()
+    headers = []
+    for index in range(start, start + count):
+        header = Header(prevhash, genesis.MerkleRoot, genesis.Timestamp + index, index,
+                        genesis.ConsensusData, genesis.NextConsensus, genesis.Script)
+        headers.append(header)
+        prevhash = header.Hash
+    return headers
+
+
+def measure(function, runs):
+    start = time.perf_counter()
+    for i in range(runs):
+        function()
+    return (time.perf_counter() - start) / runs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--headers", type=int, nargs='+', default=[100000, 2000000])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    logzero.loglevel(logging.WARNING)
+
+    for count in args.headers:
+        path = tempfile.mkdtemp(prefix="bench_header_index_")
+        chain = LevelDBBlockchain(path)
+        try:
+            hashes = fill_header_index(chain, count)
+
+            print("%8d headers" % count)
+            lookups = [('near genesis', hashes[10]), ('middle', hashes[len(hashes) // 2]),
+                       ('tip', hashes[-1]), ('unknown', b'ab' * 32)]
+            for name, hash in lookups:
+                hash = hash.decode('utf-8')
+                latency = measure(lambda: chain.GetBlock(hash), args.runs)
+                print("    GetBlock %-13s %10.3f ms" % (name, latency * 1000))
+
+            headers = new_headers(Blockchain.GenesisBlock().Hash, count, 2000)
+            start = time.perf_counter()
+            chain.AddHeaders(headers)
+            print("    AddHeaders 2000 headers %10.3f ms" % ((time.perf_counter() - start) * 1000))
+        finally:
+            chain.Dispose()
+            shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Startup and memory benchmark of the header index of `LevelDBBlockchain`.
+
+A chain database is written with the given number of header hashes in `IX_HeaderHashList`
+records, as a synced node stores them, and opened twice: first loading the header index from
+the stored header hash lists, then from the header snapshot written when the chain was disposed
+(if any). Reports the time taken to open the chain in both cases, and the memory allocated while
+loading the header index.
+
+Usage:
+
+    python benchmarks/bench_header_store.py
+    python benchmarks/bench_header_store.py --headers 500000 2000000
+"""
+import os
+import sys
+import time
+import shutil
+import hashlib
+import argparse
+import binascii
+import tempfile
+import tracemalloc
+import logging
+
+import logzero
+
+# Allow importing 'neo' from parent path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from neo.Core.Blockchain import Blockchain
+from neo.Core.Header import Header
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.TrimmedBlock import SplitTrimmedBlock
+
+
+def make_chain(path, count):
+    chain = LevelDBBlockchain(path)
+
+    # the current header is stored, as on a synced node
+    genesis = Blockchain.GenesisBlock()
+    current = Header(genesis.Hash, genesis.MerkleRoot, genesis.Timestamp + count, count - 1,
+                     genesis.ConsensusData, genesis.NextConsensus, genesis.Script)
+
+    raw = bytes(genesis.Hash.Data)
+    with chain._db.write_batch() as wb:
+        for start in range(0, count, 2000):
+            hashes = [raw] + [hashlib.sha256(i.to_bytes(4, 'little')).digest() for i in range(max(start, 1), start + 2000)]
+            if start + 2000 == count:
+                hashes[-1] = bytes(current.Hash.Data)
+            wb.put(DBPrefix.IX_HeaderHashList + start.to_bytes(4, 'little'), binascii.hexlify(b''.join(hashes[-2000:])))
+            raw = hashes[-1]
+
+        wb.put(DBPrefix.DATA_Header + current.Hash.ToBytes(), SplitTrimmedBlock(binascii.unhexlify(current.ToArray()))[0])
+        wb.put(DBPrefix.SYS_CurrentHeader, current.Hash.ToBytes() + (count - 1).to_bytes(4, 'little'))
+
+    chain.Dispose()
+    return current.Hash.ToBytes()
+
+
+def open_chain(path, count, current):
+    start = time.perf_counter()
+    chain = LevelDBBlockchain(path)
+    elapsed = time.perf_counter() - start
+
+    if chain.HeaderHeight != count - 1 or chain.CurrentHeaderHash != current:
+        raise Exception("header index not loaded")
+    return chain, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--headers", type=int, nargs='+', default=[200000, 2000000])
+    args = parser.parse_args()
+
+    logzero.loglevel(logging.WARNING)
+
+    for count in args.headers:
+        count -= count % 2000
+        path = tempfile.mkdtemp(prefix="bench_header_store_")
+        try:
+            current = make_chain(path, count)
+
+            chain, from_lists = open_chain(path, count, current)
+            start = time.perf_counter()
+            chain.Dispose()
+            dispose = time.perf_counter() - start
+            chain = None
+
+            chain, from_snapshot = open_chain(path, count, current)
+            chain.Dispose()
+            chain = None
+
+            tracemalloc.start()
+            chain = LevelDBBlockchain(path)
+            allocated, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            chain.Dispose()
+            chain = None
+
+            print("%8d headers: startup from hash lists %7.3f s, from snapshot %7.3f s (written in %.3f s), "
+                  "header index %6.1f MB (peak %6.1f MB)" % (
+                      count, from_lists, from_snapshot, dispose, allocated / 2 ** 20, peak / 2 ** 20))
+        finally:
+            shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark of identity contract (identity/sc/access-store.avm) invocations.
+
+The contract is deployed into a throwaway LevelDB, and a mix of `createRecord`, `getRecordList`
+and `getUserPubKey` invocations is run on `ApplicationEngine`s, committing storage after every
+invocation. The same invocations are then stepped through without the pre-step checks of
+`ApplicationEngine.Execute` (gas accounting, stack / item / array size and invocation checks),
+to report what those checks cost per executed instruction.
+
+Usage:
+
+    python benchmarks/bench_identity_contract.py
+    python benchmarks/bench_identity_contract.py --invocations 500
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import logging
+
+import plyvel
+import logzero
+
+# Allow importing 'neo' from parent path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from neo.VM.ExecutionEngine import ExecutionEngine
+from neo.VM import OpCode
+from neo.SmartContract.ApplicationEngine import ApplicationEngine
+from neo.SmartContract.StateMachine import StateMachine
+from neo.SmartContract import TriggerType
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.CachedScriptTable import CachedScriptTable
+from neo.Core.State.AccountState import AccountState
+from neo.Core.State.AssetState import AssetState
+from neo.Core.State.ValidatorState import ValidatorState
+from neo.Core.State.ContractState import ContractState, ContractPropertyState
+from neo.Core.State.StorageItem import StorageItem
+from neo.Core.FunctionCode import FunctionCode
+from neocore.Cryptography.Crypto import Crypto
+from neocore.UInt160 import UInt160
+from neocore.Fixed8 import Fixed8
+
+CONTRACT_PATH = os.path.join(os.path.dirname(__file__), "..", "identity", "sc", "access-store.avm")
+
+# contract owner, see identity/sc/access-store.py
+OWNER = b'\x04\x00A\xfb4\xd5\xa1\t\xce\xe7\x03\x1b\x7fD4\xc2\xec\xf9\xcd\xf4'
+
+USER = b'\x17' * 20
+
+
+class OwnerSignedContainer():
+    """ Script container which passes the contract's CheckWitness(OWNER) """
+
+    Hash = None
+
+    def GetScriptHashesForVerifying(self):
+        return [UInt160(data=OWNER)]
+
+
+def push_bytes(data):
+    if len(data) <= 75:
+        return bytes([len(data)]) + data
+    return OpCode.PUSHDATA1 + bytes([len(data)]) + data
+
+
+def invoke_script(contract_hash, operation, args):
+    script = b''
+    for arg in reversed(args):
+        script += push_bytes(arg)
+    script += bytes([OpCode.PUSH1[0] - 1 + len(args)]) if args else OpCode.PUSH0
+    script += OpCode.PACK
+    script += push_bytes(operation.encode('utf-8'))
+    return script + OpCode.APPCALL + contract_hash
+
+
+class Chain():
+
+    def __init__(self, path, contract_script):
+        self.db = plyvel.DB(path, create_if_missing=True)
+        self.contract_hash = Crypto.ToScriptHash(contract_script, unhex=False)
+
+        contracts = DBCollection(self.db, None, DBPrefix.ST_Contract, ContractState)
+        code = FunctionCode(script=contract_script, param_list=bytearray(b'\x07\x10'), return_type=5)
+        contracts.Add(self.contract_hash.ToBytes(), ContractState(code, ContractPropertyState.HasStorage, b'identity', b'1', b'', b'', b''))
+        contracts.Commit(None)
+
+    def invoke(self, script, checked=True):
+        sn = self.db.snapshot()
+        accounts = DBCollection(self.db, sn, DBPrefix.ST_Account, AccountState)
+        assets = DBCollection(self.db, sn, DBPrefix.ST_Asset, AssetState)
+        validators = DBCollection(self.db, sn, DBPrefix.ST_Validator, ValidatorState)
+        contracts = DBCollection(self.db, sn, DBPrefix.ST_Contract, ContractState)
+        storages = DBCollection(self.db, sn, DBPrefix.ST_Storage, StorageItem)
+
+        service = StateMachine(accounts, validators, assets, contracts, storages, None)
+        engine = ApplicationEngine(TriggerType.Application, OwnerSignedContainer(), CachedScriptTable(contracts),
+                                   service, Fixed8.Zero(), testMode=True)
+        engine.LoadScript(script)
+
+        start = time.perf_counter()
+        if checked:
+            success = engine.Execute()
+        else:
+            ExecutionEngine.Execute(engine)
+            success = engine.State == 1
+        elapsed = time.perf_counter() - start
+
+        if not success:
+            raise Exception("invocation failed")
+
+        storages.Commit(None)
+        sn.close()
+
+        return engine.ops_processed, elapsed
+
+    def close(self):
+        self.db.close()
+
+
+def run(contract_script, invocations, checked):
+    path = tempfile.mkdtemp(prefix="bench_identity_")
+    chain = Chain(path, contract_script)
+    try:
+        calls = [
+            ('createRecord', [OWNER, USER, b'DATA_PUB_KEY', b'DATA_ENCR']),
+            ('getRecordList', [USER]),
+            ('getUserPubKey', [USER]),
+        ]
+        scripts = [invoke_script(chain.contract_hash.Data, operation, args) for operation, args in calls]
+
+        ops = 0
+        elapsed = 0
+        for i in range(invocations):
+            o, e = chain.invoke(scripts[i % len(scripts)], checked)
+            ops += o
+            elapsed += e
+        return ops, elapsed
+    finally:
+        chain.close()
+        shutil.rmtree(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--invocations", type=int, default=60)
+    args = parser.parse_args()
+
+    logzero.loglevel(logging.WARNING)
+
+    with open(CONTRACT_PATH, 'rb') as f:
+        contract_script = f.read()
+
+    checked_ops, checked_time = run(contract_script, args.invocations, True)
+    bare_ops, bare_time = run(contract_script, args.invocations, False)
+
+    print("ApplicationEngine.Execute %9s ops in %7.3f s: %8.2f us/op" % (checked_ops, checked_time, checked_time * 1e6 / checked_ops))
+    print("without pre-step checks   %9s ops in %7.3f s: %8.2f us/op" % (bare_ops, bare_time, bare_time * 1e6 / bare_ops))
+    print("pre-step overhead: %.2f us/op" % ((checked_time / checked_ops - bare_time / bare_ops) * 1e6))
+
+
+if __name__ == "__main__":
+    main()
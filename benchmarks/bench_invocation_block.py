@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark of persisting blocks full of small invocation transactions.
+
+Every transaction APPCALLs a small contract doing a Storage.Get / Storage.Put, and is run the
+way `LevelDBBlockchain.Persist` runs `InvocationTransaction`s: a new `StateMachine` and
+`ApplicationEngine` per transaction on top of the block's shared state collections, storages
+written into the block's write batch.
+
+Reports the persisted transactions per second, and the part of it spent on setting up the
+`StateMachine` and `ApplicationEngine` of a transaction.
+
+Usage:
+
+    python benchmarks/bench_invocation_block.py
+    python benchmarks/bench_invocation_block.py --blocks 20 --txs 500
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import logging
+
+import plyvel
+import logzero
+
+# Allow importing 'neo' from parent path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from neo.VM import OpCode
+from neo.SmartContract.ApplicationEngine import ApplicationEngine
+from neo.SmartContract.StateMachine import StateMachine
+from neo.SmartContract import TriggerType
+from neo.Core.TX.InvocationTransaction import InvocationTransaction
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.CachedScriptTable import CachedScriptTable
+from neo.Core.State.AccountState import AccountState
+from neo.Core.State.AssetState import AssetState
+from neo.Core.State.ValidatorState import ValidatorState
+from neo.Core.State.ContractState import ContractState, ContractPropertyState
+from neo.Core.State.StorageItem import StorageItem
+from neo.Core.FunctionCode import FunctionCode
+from neocore.Cryptography.Crypto import Crypto
+
+from bench_vm import push_bytes, syscall
+
+
+def counter_script():
+    # Storage.Put(ctx, 'counter', Storage.Get(ctx, 'counter') + 1)
+    script = push_bytes(b'counter') + syscall("Neo.Storage.GetContext") + syscall("Neo.Storage.Get")
+    script += OpCode.INC
+    script += push_bytes(b'counter') + syscall("Neo.Storage.GetContext") + syscall("Neo.Storage.Put")
+    return script + OpCode.RET
+
+
+def persist_block(db, txs):
+    """ Run the invocations of a block as done by `LevelDBBlockchain.Persist`, returns the setup time """
+    setup = 0
+    sn = db.snapshot()
+
+    with db.write_batch(transaction=True) as wb:
+        accounts = DBCollection(db, sn, DBPrefix.ST_Account, AccountState)
+        validators = DBCollection(db, sn, DBPrefix.ST_Validator, ValidatorState)
+        assets = DBCollection(db, sn, DBPrefix.ST_Asset, AssetState)
+        contracts = DBCollection(db, sn, DBPrefix.ST_Contract, ContractState)
+        storages = DBCollection(db, sn, DBPrefix.ST_Storage, StorageItem)
+
+        for tx in txs:
+            start = time.perf_counter()
+            script_table = CachedScriptTable(contracts)
+            service = StateMachine(accounts, validators, assets, contracts, storages, wb)
+            engine = ApplicationEngine(TriggerType.Application, tx, script_table, service, tx.Gas, testMode=False)
+            engine.LoadScript(tx.Script, False)
+            setup += time.perf_counter() - start
+
+            success = engine.Execute()
+            if not success:
+                raise Exception("invocation failed")
+            service.ExecutionCompleted(engine, success)
+
+    sn.close()
+    return setup
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=10)
+    parser.add_argument("--txs", type=int, default=200, help="invocation transactions per block")
+    args = parser.parse_args()
+
+    logzero.loglevel(logging.WARNING)
+
+    path = tempfile.mkdtemp(prefix="bench_invocation_block_")
+    db = plyvel.DB(path, create_if_missing=True)
+    try:
+        script = counter_script()
+        script_hash = Crypto.ToScriptHash(script, unhex=False)
+
+        contracts = DBCollection(db, None, DBPrefix.ST_Contract, ContractState)
+        code = FunctionCode(script=script, param_list=bytearray(b'\x07\x10'), return_type=5)
+        contracts.Add(script_hash.ToBytes(), ContractState(code, ContractPropertyState.HasStorage, b'counter', b'1', b'', b'', b''))
+        contracts.Commit(None)
+
+        txs = []
+        for i in range(args.txs):
+            tx = InvocationTransaction()
+            # a distinct push per transaction, as real invocations differ
+            tx.Script = push_bytes(i.to_bytes(4, 'little')) + OpCode.DROP + OpCode.APPCALL + script_hash.Data
+            txs.append(tx)
+
+        setup = 0
+        start = time.perf_counter()
+        for i in range(args.blocks):
+            setup += persist_block(db, txs)
+        elapsed = time.perf_counter() - start
+
+        count = args.blocks * args.txs
+        print("%s invocations in %.3f s: %8.0f tx/sec" % (count, elapsed, count / elapsed))
+        print("StateMachine + ApplicationEngine setup: %.2f us/tx" % (setup * 1e6 / count))
+    finally:
+        db.close()
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
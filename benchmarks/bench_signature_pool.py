@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark of the `SignatureVerifier` process pool.
+
+A batch of transactions with standard single signature witnesses, each signing a distinct
+message, is verified on pools of 1, 2, 4 and 8 worker processes, and sequentially in the current
+process (as `Helper.VerifyScripts` does on the reactor thread) for reference. The pools are
+started before timing, and nothing is served from the verification cache.
+
+Usage:
+
+    python benchmarks/bench_signature_pool.py
+    python benchmarks/bench_signature_pool.py --txs 200 --workers 1 2 4 8 16
+"""
+import os
+import sys
+import time
+import argparse
+import binascii
+import logging
+
+from concurrent.futures import wait
+
+import logzero
+
+# Allow importing 'neo' from parent path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from neo.Core.Witness import Witness
+from neo.Core.VerificationCache import VerificationCache
+from neo.Network.SignatureVerifier import SignatureVerifier, VerifyWitness
+from neocore.Cryptography.Crypto import Crypto
+from neocore.KeyPair import KeyPair
+
+
+class SignedTransaction():
+    """ The parts of a transaction the verifier looks at """
+
+    def __init__(self, message, witness):
+        self.message = message
+        self.Scripts = [witness]
+
+    def GetMessage(self):
+        return self.message
+
+
+def make_txs(count):
+    key = KeyPair(b'\x01' * 32)
+    verification = b'\x21' + binascii.unhexlify(key.PublicKey.encode_point(True)) + b'\xac'
+
+    txs = []
+    for i in range(count):
+        message = binascii.hexlify(b'transaction %d' % i)
+        signature = b'\x40' + bytes(Crypto.Sign(message, key.PrivateKey))
+        txs.append(SignedTransaction(message, Witness(signature, verification)))
+    return txs
+
+
+def measure_sequential(txs):
+    start = time.perf_counter()
+    for tx in txs:
+        witness = tx.Scripts[0]
+        if not VerifyWitness(tx.message, witness.VerificationScript, witness.InvocationScript):
+            raise Exception("verification failed")
+    return len(txs) / (time.perf_counter() - start)
+
+
+def measure_pool(txs, workers):
+    verifier = SignatureVerifier(max_workers=workers, cache=VerificationCache())
+    try:
+        # start the worker processes
+        wait(verifier.Submit(make_txs(workers)))
+
+        start = time.perf_counter()
+        futures = verifier.Submit(txs)
+        wait(futures)
+        elapsed = time.perf_counter() - start
+
+        if not all(future.result() for future in futures):
+            raise Exception("verification failed")
+        return len(txs) / elapsed
+    finally:
+        verifier.Shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--txs", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    logzero.loglevel(logging.WARNING)
+
+    txs = make_txs(args.txs)
+    print("CPU count: %s" % os.cpu_count())
+    print("sequential        %8.1f sigs/sec" % measure_sequential(txs))
+    for workers in args.workers:
+        print("%2d worker(s)      %8.1f sigs/sec" % (workers, measure_pool(txs, workers)))
+
+
+if __name__ == "__main__":
+    main()
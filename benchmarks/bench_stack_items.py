@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Memory and throughput benchmarks for VM stack items and the `RandomAccessStack`.
+
+Memory: the bytes allocated (as traced by `tracemalloc`) per stack item, for evaluation stacks
+full of small integers, booleans, byte arrays and arrays, as created by `StackItem.New`.
+
+Throughput: push / peek / pop operations per second on a `RandomAccessStack`, for conversions
+of raw values (`PushT`) and stack shuffling of already typed items, plus the `loop` scenario of
+`bench_vm.py` for the interpreter as a whole.
+
+Usage:
+
+    python benchmarks/bench_stack_items.py
+    python benchmarks/bench_stack_items.py --items 200000
+"""
+import os
+import sys
+import time
+import argparse
+import logging
+import tracemalloc
+
+import logzero
+
+# Allow importing 'neo' from parent path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from neo.VM.RandomAccessStack import RandomAccessStack
+from neo.VM.InteropService import StackItem
+from neocore.BigInteger import BigInteger
+
+from bench_vm import run_loop
+
+
+def value_factories():
+    return [
+        ('small integers', lambda i: BigInteger(i % 16)),
+        ('integers', lambda i: BigInteger(1000000 + i)),
+        ('booleans', lambda i: i % 2 == 0),
+        ('byte arrays', lambda i: bytearray(i.to_bytes(4, 'little'))),
+        ('arrays', lambda i: [StackItem.New(BigInteger(1000000 + i))]),
+    ]
+
+
+def measure_memory(factory, items):
+    values = [factory(i) for i in range(items)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    stack = RandomAccessStack()
+    for value in values:
+        stack.PushT(value)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return (after - before) / items
+
+
+def measure_push_pop(items):
+    values = [BigInteger(i % 16) for i in range(items)]
+    stack = RandomAccessStack()
+
+    start = time.perf_counter()
+    for value in values:
+        stack.PushT(value)
+    for i in range(items):
+        stack.Pop()
+    elapsed = time.perf_counter() - start
+
+    return 2 * items / elapsed
+
+
+def measure_shuffle(items):
+    stack = RandomAccessStack()
+    stack.PushT(1)
+    stack.PushT(2)
+
+    # DUP / SWAP / DROP as done by the engine
+    push = getattr(stack, 'Push', stack.PushT)
+    start = time.perf_counter()
+    for i in range(items):
+        push(stack.Peek())
+        x2 = stack.Pop()
+        x1 = stack.Pop()
+        push(x2)
+        push(x1)
+        stack.Pop()
+    elapsed = time.perf_counter() - start
+
+    return 6 * items / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100000)
+    args = parser.parse_args()
+
+    logzero.loglevel(logging.WARNING)
+
+    for name, factory in value_factories():
+        print("%-15s %8.1f bytes/item" % (name, measure_memory(factory, args.items)))
+
+    print("PushT / Pop     %10.0f ops/sec" % measure_push_pop(args.items))
+    print("DUP SWAP DROP   %10.0f ops/sec" % measure_shuffle(args.items))
+
+    ops, elapsed = run_loop(args.items)
+    print("vm loop         %10.0f ops/sec" % (ops / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the on-disk encoding of state records.
+
+Fills a throwaway LevelDB with account states and storage items, once hex encoded (the
+former format) and once as raw bytes, and reports the database size after compaction and the
+latency of account state and storage item lookups through a fresh `DBCollection`, as done by
+`GetAccountState` and `GetStorageItem`.
+
+Usage:
+
+    python benchmarks/bench_state_encoding.py
+    python benchmarks/bench_state_encoding.py --records 100000 --lookups 20000
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import binascii
+import tempfile
+
+import plyvel
+
+# Allow importing 'neo' from parent path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Core.State.AccountState import AccountState
+from neo.Core.State.StorageItem import StorageItem
+from neo.Core.Blockchain import Blockchain
+from neocore.UInt160 import UInt160
+from neocore.Fixed8 import Fixed8
+
+
+class HexDBCollection(DBCollection):
+    """ DBCollection reading and writing the former hex encoded records, for comparison """
+
+    def Commit(self, wb, destroy=True):
+        for keyval in self.Changed:
+            item = self.Collection[keyval]
+            if item:
+                wb.put(self.Prefix + keyval, item.ToByteArray())
+
+    def _GetItem(self, keyval):
+        buffer = self.DB.get(self.Prefix + keyval)
+        if buffer:
+            item = self.ClassRef.DeserializeFromDB(binascii.unhexlify(buffer))
+            self.Collection[keyval] = item
+            return item
+        return None
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def fill(db, collection_class, num_records):
+    neo = Blockchain.SystemShare().Hash
+    gas = Blockchain.SystemCoin().Hash
+
+    accounts = collection_class(db, None, DBPrefix.ST_Account, AccountState)
+    storages = collection_class(db, None, DBPrefix.ST_Storage, StorageItem)
+
+    for i in range(num_records):
+        script_hash = i.to_bytes(20, 'little')
+        account = AccountState(script_hash=UInt160(data=script_hash))
+        account.AddToBalance(neo, Fixed8(i))
+        account.AddToBalance(gas, Fixed8(i * 10))
+        accounts.Add(script_hash, account)
+        storages.Add(script_hash + b'balance', StorageItem(value=bytearray(i.to_bytes(8, 'little'))))
+
+    with db.write_batch() as wb:
+        accounts.Commit(wb)
+        storages.Commit(wb)
+
+    db.compact_range()
+
+
+def lookup(db, collection_class, prefix, class_ref, keys):
+    start = time.perf_counter()
+    for key in keys:
+        # a fresh collection per lookup, as in GetAccountState / GetStorageItem
+        collection_class(db, None, prefix, class_ref).TryGet(key)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=50000, help="number of accounts and storage items")
+    parser.add_argument("--lookups", type=int, default=10000, help="number of random lookups per kind")
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    indexes = [rnd.randrange(args.records) for _ in range(args.lookups)]
+    account_keys = [i.to_bytes(20, 'little') for i in indexes]
+    storage_keys = [key + b'balance' for key in account_keys]
+
+    for name, collection_class in [("hex", HexDBCollection), ("binary", DBCollection)]:
+        path = tempfile.mkdtemp(prefix="bench_state_encoding_")
+        try:
+            db = plyvel.DB(path, create_if_missing=True)
+            fill(db, collection_class, args.records)
+            size = dir_size(path)
+            account_time = lookup(db, collection_class, DBPrefix.ST_Account, AccountState, account_keys)
+            storage_time = lookup(db, collection_class, DBPrefix.ST_Storage, StorageItem, storage_keys)
+            db.close()
+        finally:
+            shutil.rmtree(path)
+
+        print("%-7s db size: %8.2f MB  GetAccountState: %6.2f us  GetStorageItem: %6.2f us" % (
+            name, size / 1024 / 1024, account_time * 1e6 / args.lookups, storage_time * 1e6 / args.lookups))
+
+
+if __name__ == "__main__":
+    main()
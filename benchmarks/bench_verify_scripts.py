@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark of `Helper.VerifyScripts` on signed transactions, as done by `Transaction.Verify`
+when a transaction is relayed to the node.
+
+Every transaction carries a single witness, either a standard single signature one or a 2-of-3
+multi signature one. Each transaction is verified a first time, and then again, as happens when
+the same transaction arrives from several peers.
+
+Usage:
+
+    python benchmarks/bench_verify_scripts.py
+    python benchmarks/bench_verify_scripts.py --txs 200 --repeat 5
+"""
+import os
+import sys
+import time
+import argparse
+import binascii
+import logging
+
+import logzero
+
+# Allow importing 'neo' from parent path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from neo.Core.Helper import Helper
+from neo.Core.Witness import Witness
+from neo.Core.TX.Transaction import ContractTransaction
+from neo.Core.TX.TransactionAttribute import TransactionAttribute, TransactionAttributeUsage
+from neocore.Cryptography.Crypto import Crypto
+from neocore.KeyPair import KeyPair
+
+
+def public_key(key):
+    return binascii.unhexlify(key.PublicKey.encode_point(True))
+
+
+def signature(tx, key):
+    return b'\x40' + bytes(Crypto.Sign(tx.GetHashData(), key.PrivateKey))
+
+
+def single_sig(keys):
+    verification = b'\x21' + public_key(keys[0]) + b'\xac'
+    return verification, lambda tx: signature(tx, keys[0])
+
+
+def multi_sig(keys):
+    verification = b'\x52' + b''.join(b'\x21' + public_key(key) for key in keys[:3]) + b'\x53\xae'
+    return verification, lambda tx: signature(tx, keys[0]) + signature(tx, keys[1])
+
+
+def make_txs(count, verification, sign):
+    script_hash = Crypto.ToScriptHash(verification, unhex=False)
+
+    txs = []
+    for i in range(count):
+        remark = TransactionAttribute(TransactionAttributeUsage.Remark, i.to_bytes(4, 'little'))
+        tx = ContractTransaction(attributes=[TransactionAttribute(TransactionAttributeUsage.Script, script_hash), remark])
+        tx.scripts = [Witness(sign(tx), verification)]
+        txs.append(tx)
+    return txs
+
+
+def verify_all(txs):
+    start = time.perf_counter()
+    for tx in txs:
+        if not Helper.VerifyScripts(tx):
+            raise Exception("verification failed")
+    return len(txs) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--txs", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3, help="times every transaction is verified again")
+    args = parser.parse_args()
+
+    logzero.loglevel(logging.WARNING)
+
+    keys = sorted([KeyPair(bytes([i]) * 32) for i in range(1, 4)], key=lambda key: key.PublicKey)
+
+    for name, witness in (('single sig', single_sig), ('2-of-3 multi sig', multi_sig)):
+        txs = make_txs(args.txs, *witness(keys))
+
+        first = verify_all(txs)
+        again = sum(verify_all(txs) for i in range(args.repeat)) / args.repeat
+
+        print("%-18s first %8.0f tx/sec   again %8.0f tx/sec" % (name, first, again))
+
+
+if __name__ == "__main__":
+    main()
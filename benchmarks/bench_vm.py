@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the smart contract VM.
+
+Scenarios:
+
+    loop           tight arithmetic loop on a bare ExecutionEngine
+    nep5           storage heavy NEP5 style transfer (Storage.Get / Storage.Put of two balances)
+                   on an ApplicationEngine with a StateMachine, one engine per invocation
+    checkmultisig  3 of 5 multi signature verification script
+    syscall        loop of Neo.Runtime.GetTrigger / Neo.Runtime.CheckWitness syscalls on an
+                   ApplicationEngine, measuring syscall pricing and dispatch
+
+Every scenario reports the executed instructions per second, so numbers of different trees
+can be compared directly.
+
+Usage:
+
+    python benchmarks/bench_vm.py
+    python benchmarks/bench_vm.py --scenario nep5 --iterations 2000
+"""
+import os
+import sys
+import time
+import shutil
+import hashlib
+import argparse
+import binascii
+import tempfile
+import logging
+
+import plyvel
+import logzero
+
+# Allow importing 'neo' from parent path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from neo.VM.ExecutionEngine import ExecutionEngine
+from neo.VM import OpCode
+from neo.SmartContract.ApplicationEngine import ApplicationEngine
+from neo.SmartContract.StateMachine import StateMachine
+from neo.SmartContract.StateReader import StateReader
+from neo.SmartContract import TriggerType
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.CachedScriptTable import CachedScriptTable
+from neo.Core.State.AccountState import AccountState
+from neo.Core.State.AssetState import AssetState
+from neo.Core.State.ValidatorState import ValidatorState
+from neo.Core.State.ContractState import ContractState, ContractPropertyState
+from neo.Core.State.StorageItem import StorageItem
+from neo.Core.FunctionCode import FunctionCode
+from neocore.Cryptography.Crypto import Crypto
+from neocore.KeyPair import KeyPair
+from neocore.Fixed8 import Fixed8
+
+
+def push_int(value):
+    if value == -1:
+        return OpCode.PUSHM1
+    if value == 0:
+        return OpCode.PUSH0
+    if 0 < value <= 16:
+        return bytes([OpCode.PUSH1[0] - 1 + value])
+    data = value.to_bytes((value.bit_length() + 8) // 8, 'little', signed=True)
+    return push_bytes(data)
+
+
+def push_bytes(data):
+    if len(data) <= 75:
+        return bytes([len(data)]) + data
+    return OpCode.PUSHDATA1 + bytes([len(data)]) + data
+
+
+def syscall(name):
+    name = name.encode('ascii')
+    return OpCode.SYSCALL + bytes([len(name)]) + name
+
+
+def jump(opcode, offset):
+    return opcode + offset.to_bytes(2, 'little', signed=True)
+
+
+def loop_script(iterations):
+    body = OpCode.DUP + OpCode.PUSH2 + OpCode.MUL + OpCode.PUSH3 + OpCode.ADD + OpCode.DROP
+    # DUP; JMPIFNOT end; <body>; DEC; JMP start; end: DROP
+    loop = OpCode.DUP + jump(OpCode.JMPIFNOT, 3 + len(body) + 1 + 3 + 1) + body + OpCode.DEC
+    loop += jump(OpCode.JMP, -len(loop))
+    return push_int(iterations) + loop + OpCode.DROP + OpCode.RET
+
+
+def syscall_loop_script(iterations):
+    body = syscall("Neo.Runtime.GetTrigger") + OpCode.DROP + push_bytes(b'\x01' * 20) + syscall("Neo.Runtime.CheckWitness") + OpCode.DROP
+    loop = OpCode.DUP + jump(OpCode.JMPIFNOT, 3 + len(body) + 1 + 3 + 1) + body + OpCode.DEC
+    loop += jump(OpCode.JMP, -len(loop))
+    return push_int(iterations) + loop + OpCode.DROP + OpCode.RET
+
+
+def nep5_transfer_script(addr_from, addr_to, amount):
+    script = b''
+    for addr, op in [(addr_from, OpCode.SUB), (addr_to, OpCode.ADD)]:
+        script += push_bytes(addr) + syscall("Neo.Storage.GetContext") + syscall("Neo.Storage.Get")
+        script += push_int(amount) + op
+        script += push_bytes(addr) + syscall("Neo.Storage.GetContext") + syscall("Neo.Storage.Put")
+    return script + OpCode.RET
+
+
+class MessageContainer():
+
+    def __init__(self, message):
+        self.message = message
+
+    def GetMessage(self):
+        return self.message
+
+
+def multisig_scripts(m, n):
+    message = binascii.hexlify(b'benchmark message').decode('ascii')
+    keys = [KeyPair(priv_key=hashlib.sha256(bytes([i])).digest()) for i in range(n)]
+
+    invocation = b''
+    for key in keys[:m]:
+        invocation += push_bytes(bytes(Crypto.Sign(message, key.PrivateKey)))
+
+    verification = push_int(m)
+    for key in keys:
+        verification += push_bytes(binascii.unhexlify(key.PublicKey.encode_point(True)))
+    verification += push_int(n) + OpCode.CHECKMULTISIG
+
+    return MessageContainer(message), invocation, verification
+
+
+def run_loop(iterations):
+    script = loop_script(iterations)
+
+    start = time.perf_counter()
+    engine = ExecutionEngine(crypto=Crypto)
+    engine.LoadScript(script)
+    engine.Execute()
+    return engine.ops_processed, time.perf_counter() - start
+
+
+def run_nep5(iterations):
+    path = tempfile.mkdtemp(prefix="bench_vm_")
+    db = plyvel.DB(path, create_if_missing=True)
+    try:
+        script = nep5_transfer_script(b'\x01' * 20, b'\x02' * 20, 5)
+        script_hash = Crypto.ToScriptHash(script, unhex=False)
+
+        contracts = DBCollection(db, None, DBPrefix.ST_Contract, ContractState)
+        code = FunctionCode(script=script, param_list=bytearray(b'\x07\x10'), return_type=5)
+        contracts.Add(script_hash.ToBytes(), ContractState(code, ContractPropertyState.HasStorage, b'bench', b'1', b'', b'', b''))
+        contracts.Commit(None)
+
+        ops = 0
+        start = time.perf_counter()
+        for i in range(iterations):
+            sn = db.snapshot()
+            accounts = DBCollection(db, sn, DBPrefix.ST_Account, AccountState)
+            assets = DBCollection(db, sn, DBPrefix.ST_Asset, AssetState)
+            validators = DBCollection(db, sn, DBPrefix.ST_Validator, ValidatorState)
+            contracts = DBCollection(db, sn, DBPrefix.ST_Contract, ContractState)
+            storages = DBCollection(db, sn, DBPrefix.ST_Storage, StorageItem)
+
+            service = StateMachine(accounts, validators, assets, contracts, storages, None)
+            engine = ApplicationEngine(TriggerType.Application, None, CachedScriptTable(contracts), service, Fixed8.Zero(), testMode=True)
+            engine.LoadScript(script)
+            if not engine.Execute():
+                raise Exception("nep5 transfer script failed")
+            ops += engine.ops_processed
+            sn.close()
+
+        return ops, time.perf_counter() - start
+    finally:
+        db.close()
+        shutil.rmtree(path)
+
+
+def run_checkmultisig(iterations):
+    container, invocation, verification = multisig_scripts(3, 5)
+
+    ops = 0
+    start = time.perf_counter()
+    for i in range(iterations):
+        engine = ExecutionEngine(container=container, crypto=Crypto)
+        engine.LoadScript(verification)
+        engine.LoadScript(invocation, True)
+        engine.Execute()
+        if not engine.EvaluationStack.Pop().GetBoolean():
+            raise Exception("multisig verification failed")
+        ops += engine.ops_processed
+
+    return ops, time.perf_counter() - start
+
+
+class WitnessContainer():
+
+    def GetScriptHashesForVerifying(self):
+        return []
+
+
+def run_syscall(iterations):
+    script = syscall_loop_script(iterations)
+
+    start = time.perf_counter()
+    engine = ApplicationEngine(TriggerType.Application, WitnessContainer(), None, StateReader(), Fixed8.Zero(), testMode=True)
+    engine.LoadScript(script)
+    if not engine.Execute():
+        raise Exception("syscall script failed")
+    return engine.ops_processed, time.perf_counter() - start
+
+
+SCENARIOS = {
+    'loop': (run_loop, 100000),
+    'nep5': (run_nep5, 1000),
+    'checkmultisig': (run_checkmultisig, 5),
+    'syscall': (run_syscall, 20000),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS.keys()), nargs="+", default=['loop', 'nep5', 'checkmultisig', 'syscall'])
+    parser.add_argument("--iterations", type=int, default=None, help="loop iterations / number of invocations")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario, the best one is reported")
+    args = parser.parse_args()
+
+    logzero.loglevel(logging.WARNING)
+
+    for name in args.scenario:
+        func, iterations = SCENARIOS[name]
+        iterations = args.iterations or iterations
+
+        best = None
+        for i in range(args.repeat):
+            ops, elapsed = func(iterations)
+            if best is None or elapsed < best[1]:
+                best = (ops, elapsed)
+
+        ops, elapsed = best
+        print("%-14s %9s ops in %7.3f s: %10.0f ops/sec" % (name, ops, elapsed, ops / elapsed))
+
+
+if __name__ == "__main__":
+    main()
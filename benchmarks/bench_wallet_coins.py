@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark of `Wallet.MakeTransaction` coin selection for wallets holding many unspent coins.
+
+A wallet with the given numbers of confirmed NEO and GAS coins spread over a few addresses
+makes a transaction sending some NEO, with a GAS fee and a few excluded inputs, as a hot wallet
+does. Reports the mean latency of `MakeTransaction` per wallet size.
+
+Usage:
+
+    python benchmarks/bench_wallet_coins.py
+    python benchmarks/bench_wallet_coins.py --coins 1000 100000 --runs 50
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import logging
+
+import logzero
+
+# Allow importing 'neo' from parent path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from neo.Core.Blockchain import Blockchain
+from neo.Core.CoinReference import CoinReference
+from neo.Core.State.CoinState import CoinState
+from neo.Core.TX.Transaction import ContractTransaction, TransactionOutput
+from neo.Wallets.Coin import Coin
+from neo.Wallets.Wallet import Wallet
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+from neocore.UInt256 import UInt256
+
+try:
+    from neo.Wallets.CoinStore import CoinStore
+except ImportError:
+    CoinStore = dict
+
+
+def make_wallet(count, rnd):
+    addresses = [UInt160(data=bytearray(rnd.getrandbits(8) for i in range(20))) for i in range(5)]
+    assets = [Blockchain.SystemShare().Hash, Blockchain.SystemCoin().Hash]
+
+    wallet = Wallet.__new__(Wallet)
+    wallet._contracts = {}
+    wallet._vin_exclude = None
+    wallet._coins = CoinStore()
+
+    for i in range(count):
+        reference = CoinReference(UInt256(data=bytearray(rnd.getrandbits(8) for i in range(32))), rnd.randint(0, 3))
+        output = TransactionOutput(assets[i % 2], Fixed8.FromDecimal(rnd.randint(1, 1000)), rnd.choice(addresses))
+        wallet._coins[reference] = Coin.CoinFromRef(reference, output, CoinState.Confirmed)
+
+    return wallet, addresses[0]
+
+
+def measure(wallet, address, runs, rnd):
+    references = list(wallet._coins.keys())
+
+    elapsed = 0
+    for i in range(runs):
+        tx = ContractTransaction()
+        tx.outputs = [TransactionOutput(Blockchain.SystemShare().Hash, Fixed8.FromDecimal(rnd.randint(1, 3000)), address)]
+        exclude = rnd.sample(references, 3)
+
+        start = time.perf_counter()
+        tx = wallet.MakeTransaction(tx, change_address=address, fee=Fixed8.FromDecimal(0.001), exclude_vin=exclude)
+        elapsed += time.perf_counter() - start
+
+        if tx is None:
+            raise Exception("insufficient funds")
+
+    return elapsed / runs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--coins", type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    logzero.loglevel(logging.WARNING)
+
+    for count in args.coins:
+        rnd = random.Random(count)
+        wallet, address = make_wallet(count, rnd)
+        print("%7d coins: MakeTransaction %8.3f ms" % (count, measure(wallet, address, args.runs, rnd) * 1000))
+
+
+if __name__ == "__main__":
+    main()
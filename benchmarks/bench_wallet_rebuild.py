@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark of `UserWallet` block processing, as done when a wallet is rebuilt.
+
+The wallet processes a synthetic chain where every block holds one wallet transaction
+creating two coins, spending a NEO coin (its state changes) and a GAS coin (it is deleted),
+through `ProcessBlocks` in batches of 1000 blocks. The wallet's SQLite database is on disk, in
+a temporary directory (or `--dir`), so commits pay for syncing the file as for a real wallet.
+
+Reports blocks per second, and the time a wallet rebuild of the given number of wallet blocks
+takes at that rate.
+
+Usage:
+
+    python benchmarks/bench_wallet_rebuild.py
+    python benchmarks/bench_wallet_rebuild.py --blocks 5000 --dir /var/tmp
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import logging
+
+import logzero
+
+# Allow importing 'neo' from parent path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from neo.Core.Blockchain import Blockchain
+from neo.Core.CoinReference import CoinReference
+from neo.Core.State.CoinState import CoinState
+from neo.Core.TX.Transaction import ContractTransaction, TransactionOutput
+from neo.Core.TX.TransactionAttribute import TransactionAttribute, TransactionAttributeUsage
+from neo.Implementations.Wallets.peewee.Models import Address
+from neo.Implementations.Wallets.peewee.UserWallet import UserWallet
+from neo.Wallets.Coin import Coin
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+from neocore.UInt256 import UInt256
+
+try:
+    from neo.Wallets.CoinStore import CoinStore
+except ImportError:
+    CoinStore = dict
+
+# hex safe ids, stored as is by any peewee version
+SCRIPT_HASH = UInt160(data=bytearray(b'w' * 20))
+NEO = UInt256(data=bytearray(b'n' * 32))
+GAS = UInt256(data=bytearray(b'g' * 32))
+
+
+class SyntheticBlock():
+
+    def __init__(self, index):
+        self.Index = index
+        self.Timestamp = 1500000000 + index
+        tx = ContractTransaction()
+        tx.Attributes = [TransactionAttribute(TransactionAttributeUsage.Remark, index.to_bytes(4, 'little'))]
+        tx.outputs = [TransactionOutput(NEO, Fixed8.FromDecimal(1), SCRIPT_HASH),
+                      TransactionOutput(GAS, Fixed8.FromDecimal(1), SCRIPT_HASH)]
+        self.FullTransactions = [tx]
+        self.Transactions = [tx]
+
+
+class SyntheticChain(Blockchain):
+
+    def __init__(self, height):
+        self._height = height
+
+    @property
+    def Height(self):
+        return self._height
+
+    def GetBlockByHeight(self, height):
+        return SyntheticBlock(height)
+
+
+class Contract():
+    ScriptHash = SCRIPT_HASH
+
+
+class BenchmarkWallet(UserWallet):
+    """ A wallet following the synthetic chain, with hex safe coin references """
+
+    def ProcessNewBlock(self, block):
+        added = set()
+        changed = set()
+        deleted = set()
+
+        for index, output in enumerate(block.FullTransactions[0].outputs):
+            reference = CoinReference(UInt256(data=bytearray(b'%031x%d' % (block.Index, index))), index)
+            coin = Coin.CoinFromRef(reference, output, CoinState.Confirmed)
+            self._coins[reference] = coin
+            added.add(coin)
+
+        if block.Index > 0:
+            spent = self._coins[CoinReference(UInt256(data=bytearray(b'%031x0' % (block.Index - 1))), 0)]
+            spent.State |= CoinState.Spent
+            changed.add(spent)
+
+            reference = CoinReference(UInt256(data=bytearray(b'%031x1' % (block.Index - 1))), 1)
+            deleted.add(self._coins[reference])
+            del self._coins[reference]
+
+        self._current_height += 1
+        self.OnProcessNewBlock(block, added, changed, deleted)
+
+
+def make_wallet(path):
+    wallet = BenchmarkWallet.__new__(BenchmarkWallet)
+    wallet._path = path
+    wallet._contracts = {SCRIPT_HASH.ToBytes(): Contract()}
+    wallet._watch_only = []
+    wallet._holds = []
+    wallet._coins = CoinStore()
+    wallet._current_height = 0
+    wallet.BuildDatabase()
+    Address.create(ScriptHash=bytes(SCRIPT_HASH.Data))
+    return wallet
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=2000)
+    parser.add_argument("--dir", default=None, help="directory of the wallet database")
+    parser.add_argument("--wallet-blocks", type=int, default=100000, help="wallet blocks of the rebuild to estimate")
+    args = parser.parse_args()
+
+    logzero.loglevel(logging.WARNING)
+
+    Blockchain.RegisterBlockchain(SyntheticChain(args.blocks - 1))
+
+    path = tempfile.mkdtemp(prefix="bench_wallet_rebuild_", dir=args.dir)
+    try:
+        wallet = make_wallet(os.path.join(path, "wallet.db3"))
+
+        start = time.perf_counter()
+        while wallet.WalletHeight < args.blocks:
+            wallet.ProcessBlocks()
+        elapsed = time.perf_counter() - start
+
+        rate = args.blocks / elapsed
+        print("%s blocks in %.3f s: %8.1f blocks/sec" % (args.blocks, elapsed, rate))
+        print("rebuild of %s wallet blocks: %.1f min" % (args.wallet_blocks, args.wallet_blocks / rate / 60))
+        wallet.Close()
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
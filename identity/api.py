@@ -20,6 +20,7 @@ from logzero import logger
 from Crypto import Random
 
 from twisted.internet import reactor, task, endpoints
+from twisted.internet.defer import Deferred
 from twisted.web.server import Request, Site
 from twisted.python import log
 from twisted.internet.protocol import Factory
@@ -32,6 +33,8 @@ sys.path.insert(0, parent_dir)
 from neo.Network.NodeLeader import NodeLeader
 from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
 from neo.Core.Blockchain import Blockchain
+from neo.VM.InstructionCache import InstructionCache
+from neo.Core.VerificationCache import VerificationCache
 from neo.Settings import settings
 
 from identity.sc_invoke_flow import IdentitySmartContract
@@ -46,6 +49,13 @@ WALLET_FILE = os.getenv("IDENTITY_WALLET_FILE", os.path.join(parent_dir, "identi
 WALLET_PWD = os.getenv("IDENTITY_WALLET_PWD", "identity123")
 CONTRACT_HASH = os.getenv("IDENTITY_SC_HASH", "1bc5b3eda086169dac515353e5d914c20cf08c56")
 
+# Write batching: max contract calls per transaction and max seconds to wait for a batch to fill up
+BATCH_MAX_SIZE = int(os.getenv("IDENTITY_BATCH_MAX_SIZE", "20"))
+BATCH_MAX_WAIT = float(os.getenv("IDENTITY_BATCH_MAX_WAIT", "0.5"))
+
+# Number of threads for contract invokes and wallet work, so they never block the reactor
+THREAD_POOL_SIZE = int(os.getenv("IDENTITY_THREAD_POOL_SIZE", "10"))
+
 # PRIVNET CONFIG
 # PROTOCOL_CONFIG = os.path.join(parent_dir, "protocol.privnet.json")
 # WALLET_FILE = os.getenv("IDENTITY_WALLET_FILE", os.path.join(parent_dir, "identity-wallets/neo-privnet.wallet"))
@@ -72,7 +82,7 @@ if not API_AUTH_TOKEN:
 
 
 # Setup the smart contract
-smart_contract = IdentitySmartContract(CONTRACT_HASH, WALLET_FILE, WALLET_PWD)
+smart_contract = IdentitySmartContract(CONTRACT_HASH, WALLET_FILE, WALLET_PWD, BATCH_MAX_SIZE, BATCH_MAX_WAIT, THREAD_POOL_SIZE)
 
 # Setup web app
 app = Klein()
@@ -113,38 +123,65 @@ def authenticated(func):
 
 
 def json_response(func):
-    """ @json_response decorator adds header and dumps response object """
+    """ @json_response decorator adds header and dumps response object, also if it is returned by a Deferred """
+    def to_json(res, request):
+        request.setHeader('Content-Type', 'application/json')
+        return json.dumps(res) if isinstance(res, dict) else res
+
     @wraps(func)
     def wrapper(request, *args, **kwargs):
         res = func(request, *args, **kwargs)
-        request.setHeader('Content-Type', 'application/json')
-        return json.dumps(res) if isinstance(res, dict) else res
+        if isinstance(res, Deferred):
+            return res.addCallback(to_json, request)
+        return to_json(res, request)
     return wrapper
 
 
 def catch_exceptions(func):
-    """ @catch_exceptions decorator which handles generic exceptions in the request handler """
+    """ @catch_exceptions decorator which handles generic exceptions in the request handler, and failed Deferreds """
+    def on_error(e, request):
+        logger.exception(e)
+        request.setResponseCode(500)
+        request.setHeader('Content-Type', 'application/json')
+        return build_error(STATUS_ERROR_GENERIC, str(e))
+
+    def on_failure(failure, request):
+        logger.error(failure.getTraceback())
+        return on_error(failure.value, request)
+
     @wraps(func)
     def wrapper(request, *args, **kwargs):
         try:
             res = func(request, *args, **kwargs)
         except Exception as e:
-            logger.exception(e)
-            request.setResponseCode(500)
-            request.setHeader('Content-Type', 'application/json')
-            return build_error(STATUS_ERROR_GENERIC, str(e))
+            return on_error(e, request)
+        if isinstance(res, Deferred):
+            return res.addErrback(on_failure, request)
         return res
     return wrapper
 
 
+def single_write_response(res):
+    """ Response for a batched write of a single contract call """
+    results, tx_unconfirmed, tx_failed, tx_hash = res
+    return {"result": byte_to_int(results[0]), "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed, "tx_hash": tx_hash}
+
+
+def multi_write_response(res):
+    """ Response for a batched write of several contract calls """
+    results, tx_unconfirmed, tx_failed, tx_hash = res
+    return {"result": byte_list_to_int_list(results), "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed, "tx_hash": tx_hash}
+
+
 @app.route('/identity/claim_gas/<usr_adr>', methods=['GET'])
 @authenticated
 @catch_exceptions
 @json_response
 def claim_gas(request, usr_adr):
     if IS_DEV:
-        tx_hash = smart_contract.claim_gas(usr_adr)
-        return {"result": tx_hash}
+        d = smart_contract.defer_after_wallet_sync(smart_contract.claim_gas, usr_adr)
+        d.addCallback(lambda tx_hash: {"result": tx_hash})
+        return d
     return {"result": "Not supported"}
 
 
@@ -153,8 +190,30 @@ def claim_gas(request, usr_adr):
 @catch_exceptions
 @json_response
 def find_transaction(request, tx_hash):
-    found = smart_contract.find_tx(tx_hash)
-    return {"result": found}
+    d = smart_contract.defer_to_pool(smart_contract.find_tx, tx_hash)
+    d.addCallback(lambda found: {"result": found})
+    return d
+
+
+@app.route('/identity/tx/<tx_hash>/wait', methods=['GET'])
+@authenticated
+@catch_exceptions
+@json_response
+def wait_for_transaction(request, tx_hash):
+    """ Responds once the transaction is confirmed (result: true), or failed to get confirmed (result: false) """
+    d = smart_contract.wait_for_confirmation(tx_hash)
+    d.addCallback(lambda confirmed: {"result": confirmed})
+    return d
+
+
+@app.route('/identity/cache/', methods=['GET'])
+@authenticated
+@catch_exceptions
+@json_response
+def get_cache_stats(request):
+    return {"result": smart_contract.result_cache.ToJson(), "storage_version": smart_contract.storage_version,
+            "instruction_cache": InstructionCache.Default().ToJson(),
+            "verification_cache": VerificationCache.Default().ToJson()}
 
 
 @app.route('/identity/users/', methods=['GET'])
@@ -162,9 +221,13 @@ def find_transaction(request, tx_hash):
 @catch_exceptions
 @json_response
 def get_users(request):
-    results, tx_unconfirmed, tx_failed, tx_hash = smart_contract.invoke_single("getUserList", [])
-    usr_adr_list = [bytes_to_address(item) for item in results]
-    return {"result": usr_adr_list, "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed}
+    def respond(res):
+        results, tx_unconfirmed, tx_failed, tx_hash = res
+        usr_adr_list = [bytes_to_address(item) for item in results]
+        return {"result": usr_adr_list, "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed}
+
+    d = smart_contract.defer_to_pool(smart_contract.invoke_single, "getUserList", [])
+    return d.addCallback(respond)
 
 
 @app.route('/identity/users/<user_adr>/pubkey/', methods=['GET'])
@@ -172,8 +235,12 @@ def get_users(request):
 @catch_exceptions
 @json_response
 def get_pubkey_by_user_id(request, user_adr):
-    result, tx_unconfirmed, tx_failed, tx_hash = smart_contract.invoke_single("getUserPubKey", [user_adr])
-    return {"result": bytestr_to_str(result), "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed}
+    def respond(res):
+        result, tx_unconfirmed, tx_failed, tx_hash = res
+        return {"result": bytestr_to_str(result), "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed}
+
+    d = smart_contract.defer_to_pool(smart_contract.invoke_single, "getUserPubKey", [user_adr])
+    return d.addCallback(respond)
 
 
 @app.route('/identity/users/<user_adr>/pubkey/', methods=['POST'])
@@ -195,8 +262,9 @@ def set_pubkey_by_user_id(request, user_adr):
         request.setResponseCode(400)
         return build_error(STATUS_ERROR_JSON, "Missing creator_adr")
     pub_key = body["pub_key"]
-    result, tx_unconfirmed, tx_failed, tx_hash = smart_contract.invoke_single("setUserPubKey", [user_adr, pub_key], True)
-    return {"result": byte_to_int(result), "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed, "tx_hash": tx_hash}
+    d = smart_contract.invoke_batched([("setUserPubKey", [user_adr, pub_key])])
+    d.addCallback(single_write_response)
+    return d
 
 
 @app.route('/identity/users/<user_adr>/records/', methods=['GET'])
@@ -204,8 +272,12 @@ def set_pubkey_by_user_id(request, user_adr):
 @catch_exceptions
 @json_response
 def get_records_by_user_id(request, user_adr):
-    results, tx_unconfirmed, tx_failed, tx_hash = smart_contract.invoke_single("getRecordIdList", [user_adr])
-    return {"result": byte_list_to_int_list(results), "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed}
+    def respond(res):
+        results, tx_unconfirmed, tx_failed, tx_hash = res
+        return {"result": byte_list_to_int_list(results), "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed}
+
+    d = smart_contract.defer_to_pool(smart_contract.invoke_single, "getRecordIdList", [user_adr])
+    return d.addCallback(respond)
 
 
 @app.route('/identity/users/<user_adr>/records/', methods=['POST'])
@@ -250,8 +322,9 @@ def insert_record(request, user_adr):
         data_encr = item["data_encr"]
         invoke_list.append(("createRecord", [creator_adr, user_adr, data_pub_key, data_encr]))
 
-    results, tx_unconfirmed, tx_failed, tx_hash= smart_contract.invoke_multi(invoke_list, True)
-    return {"result": byte_list_to_int_list(results), "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed, "tx_hash": tx_hash}
+    d = smart_contract.invoke_batched(invoke_list)
+    d.addCallback(multi_write_response)
+    return d
 
 
 @app.route('/identity/records/<record_id>/verify', methods=['POST'])
@@ -268,8 +341,9 @@ def verify_record(request, record_id):
     for id in record_id_list:
         invoke_list.append(("verifyRecord", [id]))
 
-    results, tx_unconfirmed, tx_failed, tx_hash = smart_contract.invoke_multi(invoke_list, True)
-    return {"result": byte_list_to_int_list(results), "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed, "tx_hash": tx_hash}
+    d = smart_contract.invoke_batched(invoke_list)
+    d.addCallback(multi_write_response)
+    return d
 
 
 @app.route('/identity/records/<record_id>', methods=['GET'])
@@ -286,21 +360,25 @@ def get_record_by_id(request, record_id):
     for id in record_id_list:
         invoke_list.append(("getRecord", [id]))
 
-    results, tx_unconfirmed, tx_failed, tx_hash = smart_contract.invoke_multi(invoke_list)
-    result_list = []
-    for result in results:
-        item = {}
-        if len(result) == 5:
-            item['usr_adr'] = bytes_to_address(result[0])
-            item['pub_key'] = bytestr_to_str(result[1])
-            item['creator_adr'] = bytes_to_address(result[2])
-            item['is_verified'] = True if result[3] == b'\x01' else False
-            item['data_encr'] = bytestr_to_str(result[4])
-        else:
+    def respond(res):
+        results, tx_unconfirmed, tx_failed, tx_hash = res
+        result_list = []
+        for result in results:
             item = {}
-        result_list.append(item)
+            if len(result) == 5:
+                item['usr_adr'] = bytes_to_address(result[0])
+                item['pub_key'] = bytestr_to_str(result[1])
+                item['creator_adr'] = bytes_to_address(result[2])
+                item['is_verified'] = True if result[3] == b'\x01' else False
+                item['data_encr'] = bytestr_to_str(result[4])
+            else:
+                item = {}
+            result_list.append(item)
 
-    return {"result": result_list, "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed}
+        return {"result": result_list, "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed}
+
+    d = smart_contract.defer_to_pool(smart_contract.invoke_multi, invoke_list)
+    return d.addCallback(respond)
 
 
 @app.route('/identity/records/<record_id>', methods=['DELETE'])
@@ -308,8 +386,9 @@ def get_record_by_id(request, record_id):
 @catch_exceptions
 @json_response
 def remove_record_by_id(request, record_id):
-    result, tx_unconfirmed, tx_failed, tx_hash= smart_contract.invoke_single("deleteRecord", [record_id], True)
-    return {"result": byte_to_int(result), "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed, "tx_hash": tx_hash}
+    d = smart_contract.invoke_batched([("deleteRecord", [record_id])])
+    d.addCallback(single_write_response)
+    return d
 
 
 @app.route('/identity/orders/', methods=['GET'])
@@ -317,9 +396,13 @@ def remove_record_by_id(request, record_id):
 @catch_exceptions
 @json_response
 def get_orders(request):
-    results, tx_unconfirmed, tx_failed, tx_hash = smart_contract.invoke_single("getOrderIdList", [])
-    id_list = [int.from_bytes(item, byteorder='little') for item in results]
-    return {"result": id_list, "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed}
+    def respond(res):
+        results, tx_unconfirmed, tx_failed, tx_hash = res
+        id_list = [int.from_bytes(item, byteorder='little') for item in results]
+        return {"result": id_list, "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed}
+
+    d = smart_contract.defer_to_pool(smart_contract.invoke_single, "getOrderIdList", [])
+    return d.addCallback(respond)
 
 
 @app.route('/identity/users/<user_adr>/orders/', methods=['POST'])
@@ -366,8 +449,9 @@ def insert_order(request, user_adr):
         request.setResponseCode(400)
         return build_error(STATUS_ERROR_JSON, "Price can not be negative")
 
-    result, tx_unconfirmed, tx_failed, tx_hash= smart_contract.invoke_single("createOrder", [user_adr, record_id_list_str, price], True)
-    return {"result": byte_to_int(result), "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed, "tx_hash": tx_hash}
+    d = smart_contract.invoke_batched([("createOrder", [user_adr, record_id_list_str, price])])
+    d.addCallback(single_write_response)
+    return d
 
 
 @app.route('/identity/orders/<order_id>', methods=['GET'])
@@ -384,20 +468,24 @@ def get_order_by_id(request, order_id):
     for id in order_id_list:
         invoke_list.append(("getOrder", [id]))
 
-    results, tx_unconfirmed, tx_failed, tx_hash = smart_contract.invoke_multi(invoke_list)
-    result_list = []
-    for result in results:
-        item = {}
-        if len(result) == 4:
-            item['usr_adr'] = bytes_to_address(result[0])
-            item['record_list'] = parse_id_list(bytestr_to_str(str(result[1])))
-            item['price'] = int.from_bytes(result[2], byteorder='little')
-            item['customer'] = bytestr_to_str(result[3])
-        else:
+    def respond(res):
+        results, tx_unconfirmed, tx_failed, tx_hash = res
+        result_list = []
+        for result in results:
             item = {}
-        result_list.append(item)
+            if len(result) == 4:
+                item['usr_adr'] = bytes_to_address(result[0])
+                item['record_list'] = parse_id_list(bytestr_to_str(str(result[1])))
+                item['price'] = int.from_bytes(result[2], byteorder='little')
+                item['customer'] = bytestr_to_str(result[3])
+            else:
+                item = {}
+            result_list.append(item)
 
-    return {"result": result_list, "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed}
+        return {"result": result_list, "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed}
+
+    d = smart_contract.defer_to_pool(smart_contract.invoke_multi, invoke_list)
+    return d.addCallback(respond)
 
 
 @app.route('/identity/orders/<order_id>', methods=['DELETE'])
@@ -405,8 +493,9 @@ def get_order_by_id(request, order_id):
 @catch_exceptions
 @json_response
 def remove_order_by_id(request, order_id):
-    result, tx_unconfirmed, tx_failed, tx_hash= smart_contract.invoke_single("deleteOrder", [order_id], True)
-    return {"result": byte_to_int(result), "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed, "tx_hash": tx_hash}
+    d = smart_contract.invoke_batched([("deleteOrder", [order_id])])
+    d.addCallback(single_write_response)
+    return d
 
 
 @app.route('/identity/orders/<order_id>/purchase', methods=['POST'])
@@ -434,26 +523,34 @@ def purchase_order_by_id(request, order_id):
         request.setResponseCode(400)
         return build_error(STATUS_ERROR_JSON, "attach_neo can not be negative")
 
-    order, tx_unconfirmed, tx_failed, tx_hash = smart_contract.invoke_single("getOrder", [order_id])
-    if len(order) == 4:
-        order[0] = bytes_to_address(order[0])
-        order[1] = parse_id_list(bytestr_to_str(str(order[1])))
-        order[2] = int.from_bytes(order[2], byteorder='little')
-        order[3] = bytestr_to_str(order[3])
-    else:
-        request.setResponseCode(400)
-        return build_error(STATUS_ERROR_JSON, "Order doesn't exist")
+    def respond(res):
+        result, tx_unconfirmed, tx_failed, tx_hash = res
+        return {"result": byte_to_int(result), "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed, "tx_hash": tx_hash}
+
+    def purchase(res):
+        order, tx_unconfirmed, tx_failed, tx_hash = res
+        if len(order) == 4:
+            order[0] = bytes_to_address(order[0])
+            order[1] = parse_id_list(bytestr_to_str(str(order[1])))
+            order[2] = int.from_bytes(order[2], byteorder='little')
+            order[3] = bytestr_to_str(order[3])
+        else:
+            request.setResponseCode(400)
+            return build_error(STATUS_ERROR_JSON, "Order doesn't exist")
 
-    if order[3] != '\\x00' and order[3] != '':
-        request.setResponseCode(400)
-        return build_error(STATUS_ERROR_JSON, "Already purchased")
+        if order[3] != '\\x00' and order[3] != '':
+            request.setResponseCode(400)
+            return build_error(STATUS_ERROR_JSON, "Already purchased")
 
-    if attach_neo < order[2]:
-        request.setResponseCode(400)
-        return build_error(STATUS_ERROR_JSON, "NEO required: "+str(order[2]))
+        if attach_neo < order[2]:
+            request.setResponseCode(400)
+            return build_error(STATUS_ERROR_JSON, "NEO required: "+str(order[2]))
 
-    result, tx_unconfirmed, tx_failed, tx_hash= smart_contract.invoke_single("purchaseData", [order_id, pub_key], True, attach_neo)
-    return {"result": byte_to_int(result), "tx_unconfirmed": tx_unconfirmed, "tx_failed": tx_failed, "tx_hash": tx_hash}
+        d = smart_contract.defer_after_wallet_sync(smart_contract.invoke_single, "purchaseData", [order_id, pub_key], True, attach_neo)
+        return d.addCallback(respond)
+
+    d = smart_contract.defer_to_pool(smart_contract.invoke_single, "getOrder", [order_id])
+    return d.addCallback(purchase)
 
 
 if __name__ == "__main__":
@@ -475,6 +572,10 @@ if __name__ == "__main__":
     dbloop.start(.1)
     Blockchain.Default().PersistBlocks()
 
+    # Open the wallet once, it is kept in sync in the background from now on
+    smart_contract.start()
+    reactor.addSystemEventTrigger('before', 'shutdown', smart_contract.stop)
+
     # Hook up Klein API to Twisted reactor
     endpoint_description = "tcp:port=%s:interface=0.0.0.0" % API_PORT
     endpoint = endpoints.serverFromString(reactor, endpoint_description)
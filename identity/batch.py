@@ -0,0 +1,90 @@
+from logzero import logger
+from twisted.internet import defer, reactor
+from twisted.internet.threads import deferToThreadPool
+
+
+class InvokeBatcher():
+    """
+    Submission queue which coalesces write invokes into a single multi-APPCALL transaction.
+
+    Requests submitted within `max_wait` seconds of the first pending one are sent together,
+    a batch is flushed early once it holds `max_size` contract calls. `submit` and all
+    bookkeeping happen on the reactor thread, the batch itself is invoked in a worker thread.
+
+    If a whole batch fails, its requests are retried one by one, so a single bad request
+    doesn't fail the others.
+    """
+    max_size = None
+    max_wait = None
+
+    def __init__(self, invoke_batch, max_size=20, max_wait=0.5, threadpool=None, when_ready=None):
+        """
+        Args:
+            invoke_batch (callable): takes a list of invoke lists and returns (outcomes, tx_hash),
+                                     with one result list or Exception per invoke list
+            max_size (int): max number of contract calls per transaction
+            max_wait (float): max seconds a request waits for others to join its batch
+            threadpool (ThreadPool): pool to invoke batches on, defaults to the reactor pool
+            when_ready (callable): returns a Deferred which fires once a batch may be invoked
+        """
+        self._invoke_batch = invoke_batch
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending = []
+        self._pending_calls = 0
+        self._flush_call = None
+        self._threadpool = threadpool if threadpool is not None else reactor.getThreadPool()
+        self._when_ready = when_ready if when_ready is not None else lambda: defer.succeed(None)
+
+    def submit(self, invoke_list):
+        """
+        Returns:
+            Deferred: fires with (results, tx_hash) for this invoke list
+        """
+        if self._pending and self._pending_calls + len(invoke_list) > self.max_size:
+            self.flush()
+
+        d = defer.Deferred()
+        self._pending.append((invoke_list, d))
+        self._pending_calls += len(invoke_list)
+
+        if self._pending_calls >= self.max_size:
+            self.flush()
+        elif self._flush_call is None:
+            self._flush_call = reactor.callLater(self.max_wait, self.flush)
+
+        return d
+
+    def flush(self):
+        if self._flush_call is not None and self._flush_call.active():
+            self._flush_call.cancel()
+        self._flush_call = None
+
+        batch, self._pending, self._pending_calls = self._pending, [], 0
+        if batch:
+            self._send(batch)
+
+    def _send(self, batch):
+        logger.info("Sending batch of %s write requests", len(batch))
+        invoke_lists = [invoke_list for invoke_list, _ in batch]
+        d = self._when_ready()
+        d.addCallback(lambda _: deferToThreadPool(reactor, self._threadpool, self._invoke_batch, invoke_lists))
+        d.addCallbacks(self._on_batch_done, self._on_batch_failed, callbackArgs=(batch,), errbackArgs=(batch,))
+
+    def _on_batch_done(self, outcome, batch):
+        outcomes, tx_hash = outcome
+        for (_, d), result in zip(batch, outcomes):
+            if isinstance(result, Exception):
+                d.errback(result)
+            else:
+                d.callback((result, tx_hash))
+
+    def _on_batch_failed(self, failure, batch):
+        if len(batch) > 1:
+            logger.info("Batch failed (%s), retrying requests one by one", failure.getErrorMessage())
+            for item in batch:
+                self._send([item])
+            return
+
+        for _, d in batch:
+            d.errback(failure)
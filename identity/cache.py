@@ -0,0 +1,58 @@
+import copy
+import threading
+
+from collections import OrderedDict
+
+
+class ResultCache():
+    """
+    Bounded LRU cache for smart contract test invoke results.
+
+    Every entry is stored together with a `version` token. A lookup only hits if the
+    caller asks for the same version the entry was computed at, so bumping the version
+    (eg. when the contract storage changed) invalidates all entries at once.
+
+    Results are copied on the way in and out, since callers are free to modify them.
+    """
+    max_size = None
+    hits = 0
+    misses = 0
+
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key, version, value):
+        with self._lock:
+            self._items[key] = (version, copy.deepcopy(value))
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def ToJson(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0,
+            }
@@ -1,8 +1,13 @@
 import time
+import binascii
 import threading
 
+from collections import defaultdict
+
 from logzero import logger
-from twisted.internet import task
+from twisted.internet import defer, reactor, task
+from twisted.internet.threads import deferToThreadPool
+from twisted.python.threadpool import ThreadPool
 
 from neo.Implementations.Wallets.peewee.UserWallet import UserWallet
 from neo.Prompt.Commands.Invoke import InvokeContract, TestInvokeContract, test_invoke
@@ -11,14 +16,37 @@ from neo.Prompt.Utils import parse_param
 from neo.Settings import settings
 from neo.Core.Blockchain import Blockchain
 from neo.Core.TX.Transaction import TransactionOutput
+from neo.Core.TX.InvocationTransaction import InvocationTransaction
+from neo.SmartContract.ApplicationEngine import ApplicationEngine
+from neo.VM import VMState
 from neo.VM.InteropService import stack_item_to_py
 from neo.VM.ScriptBuilder import ScriptBuilder
 from neo.Blockchain import GetBlockchain
 from neo.Wallets.utils import to_aes_key
 from neo.contrib.smartcontract import SmartContract
+from neo.EventHub import SmartContractEvent
 from neocore.Fixed8 import Fixed8
+from neocore.UInt256 import UInt256
 
 from identity.utils import bytes_to_address
+from identity.cache import ResultCache
+from identity.batch import InvokeBatcher
+
+# Max seconds an invoke waits for the wallet to catch up with the chain
+WALLET_SYNC_TIMEOUT = 30
+
+# Seconds after which a sent transaction which is not in a persisted block counts as failed
+TX_CONFIRM_TIMEOUT = 120
+
+# Max number of cached read-only invoke results
+RESULT_CACHE_SIZE = 1000
+
+# Max number of contract calls sent in one transaction, and max seconds a write waits for others to join
+BATCH_MAX_SIZE = 20
+BATCH_MAX_WAIT = 0.5
+
+# Number of threads running contract invokes and wallet work, off the reactor thread
+THREAD_POOL_SIZE = 10
 
 
 # Setup the blockchain processor
@@ -28,6 +56,19 @@ class IdentitySmartContract():
 
     Eg. many api calls want to initiate a smart contract methods, they are locked
     until the last one finished, and they get processed as they can (eg. if gas is available)
+
+    The wallet is opened once with `start` and kept in sync by a background loop. Work needing
+    the wallet is scheduled once it is synced, and catches up with blocks persisted since on its
+    own thread, so it never waits for the loop, which may be queued behind it on `threadpool`.
+
+    Blocking work (contract invokes, wallet sync) runs on `threadpool`, never on the reactor
+    thread, which also drives P2P sync and block persisting. Use `defer_to_pool` and
+    `defer_after_wallet_sync` to get a Deferred for it.
+
+    Read-only invoke results are cached per chain height and `storage_version`, which is bumped
+    whenever a persisted block writes to or deletes from the contract storage. The height also
+    covers results depending on the time, the chain or the storage of other contracts, and
+    deletes of keys which are not addresses, which dispatch no storage event.
     """
     smart_contract = None
     contract_hash = None
@@ -38,11 +79,22 @@ class IdentitySmartContract():
 
     tx_unconfirmed = None
     tx_failed = None
-    _tx_unconfirmed_loop = None
+    _tx_lock = None
+    _tx_waiters = None
+    _tx_expire_loop = None
     wallet = None
     _walletdb_loop = None
+    _sync_waiters = None
+
+    threadpool = None
 
-    def __init__(self, contract_hash, wallet_path, wallet_pass):
+    write_batcher = None
+    result_cache = None
+    storage_version = 0
+    _storage_dirty = False
+
+    def __init__(self, contract_hash, wallet_path, wallet_pass, batch_max_size=BATCH_MAX_SIZE, batch_max_wait=BATCH_MAX_WAIT,
+                 threadpool_size=THREAD_POOL_SIZE):
 
         self.contract_hash = contract_hash
         self.wallet_path = wallet_path
@@ -53,10 +105,23 @@ class IdentitySmartContract():
 
         self.tx_unconfirmed = dict()
         self.tx_failed = []
-        self._tx_unconfirmed_loop = task.LoopingCall(self.update_tx_unconfirmed)
-        self._tx_unconfirmed_loop.start(5)
+        self._tx_lock = threading.Lock()
+        self._tx_waiters = defaultdict(list)
+        self._tx_expire_loop = task.LoopingCall(self.expire_tx_unconfirmed)
+        self._tx_expire_loop.start(5)
 
         self.wallet = None
+        self._sync_waiters = []
+
+        self.threadpool = ThreadPool(maxthreads=threadpool_size, name="identity")
+
+        self.write_batcher = InvokeBatcher(self.invoke_batch, batch_max_size, batch_max_wait,
+                                           threadpool=self.threadpool, when_ready=self.when_wallet_synced)
+
+        self.result_cache = ResultCache(RESULT_CACHE_SIZE)
+        self.storage_version = 0
+        self._storage_dirty = False
+        Blockchain.PersistCompleted.on_change += self.on_persist_completed
 
         settings.set_log_smart_contract_events(False)
 
@@ -69,71 +134,180 @@ class IdentitySmartContract():
                 address_from = bytes_to_address(event.event_payload[1])
                 address_to = bytes_to_address(event.event_payload[2])
                 amount = int.from_bytes(event.event_payload[3], byteorder='little')
-                self.transfer("neo", address_from, address_to, amount)
+                self.defer_after_wallet_sync(self.transfer, "neo", address_from, address_to, amount)
+
+        @self.smart_contract.on_storage
+        def sc_storage(event):
+            """ Storage events are dispatched before the block is written, so bump again once it is """
+            if not event.test_mode and event.event_type in [SmartContractEvent.STORAGE_PUT, SmartContractEvent.STORAGE_DELETE]:
+                self._storage_dirty = True
+                self.storage_version += 1
+
+    def on_persist_completed(self, block):
+        if self._storage_dirty:
+            self._storage_dirty = False
+            self.storage_version += 1
+
+        with self._tx_lock:
+            if not self.tx_unconfirmed:
+                return
+            confirmed = [tx.Hash.ToString() for tx in block.Transactions]
+            confirmed = [tx_hash for tx_hash in confirmed if tx_hash in self.tx_unconfirmed]
+
+        for tx_hash in confirmed:
+            self._resolve_tx(tx_hash, True)
 
     def transfer(self, asset, address_from, address_to, amount):
         logger.info("Transfer %s %s from %s to %s", amount, asset, address_from, address_to)
         try:
-            self.open_wallet()
-            self.sync_wallet(10)
-            tx = construct_and_send(None, self.wallet, [asset, address_to, str(amount)], False)
+            self.wait_for_wallet_sync()
+            with self.wallet_mutex:
+                tx = construct_and_send(None, self.wallet, [asset, address_to, str(amount)], False)
             if tx:
                 sent_tx_hash = tx.Hash.ToString()
                 logger.info("Transfer success, transaction underway: %s" % sent_tx_hash)
-                self.tx_unconfirmed[sent_tx_hash] = 0
+                self.track_tx(sent_tx_hash)
                 return sent_tx_hash
             return False
         except Exception as e:
             logger.info("Transfer failed: %s" % str(e))
-        finally:
-            self.close_wallet()
 
     def claim_gas(self, usr_adr):
         return self.transfer("gas", "API", usr_adr, 100)
 
     def invoke_single(self, method_name, args, need_transaction=False, amount_neo=None):
-        results, tx_hash = self._invoke_method([(method_name, args)], need_transaction, amount_neo)
-        return results[0], list(self.tx_unconfirmed.keys()), self.tx_failed, tx_hash
+        results, tx_hash = self._invoke(invoke_list=[(method_name, args)], need_transaction=need_transaction, amount_neo=amount_neo)
+        return results[0], self.get_tx_unconfirmed(), self.tx_failed, tx_hash
 
     def invoke_multi(self, invoke_list, need_transaction=False, amount_neo=None):
-        results, tx_hash = self._invoke_method(invoke_list, need_transaction, amount_neo)
-        return results, list(self.tx_unconfirmed.keys()), self.tx_failed, tx_hash
+        results, tx_hash = self._invoke(invoke_list=invoke_list, need_transaction=need_transaction, amount_neo=amount_neo)
+        return results, self.get_tx_unconfirmed(), self.tx_failed, tx_hash
+
+    def _invoke(self, invoke_list, need_transaction, amount_neo):
+        # Read-only calls don't need the wallet, so they can run concurrently with each other and with writes
+        if not need_transaction and not amount_neo:
+            return self._test_invoke_readonly(invoke_list), None
+        return self._invoke_method(invoke_list, need_transaction, amount_neo)
+
+    def start(self):
+        """ Start the thread pool and open the wallet. Call once the blockchain is registered. """
+        self.threadpool.start()
+        self.open_wallet()
+
+    def stop(self):
+        self.close_wallet()
+        self.threadpool.stop()
+
+    def defer_to_pool(self, func, *args, **kwargs):
+        """ Run `func` on the identity thread pool. Returns a Deferred with its result. """
+        return deferToThreadPool(reactor, self.threadpool, func, *args, **kwargs)
+
+    def defer_after_wallet_sync(self, func, *args, **kwargs):
+        """ Run `func` on the identity thread pool once the wallet is synced. Returns a Deferred with its result. """
+        d = self.when_wallet_synced()
+        d.addCallback(lambda _: self.defer_to_pool(func, *args, **kwargs))
+        return d
 
     def open_wallet(self):
-        """ Open a wallet. Needed for invoking contract methods. """
-        assert self.wallet is None
-        self.wallet_mutex.acquire()
+        """
+        Open the wallet once and keep it in sync with the chain in the background.
+
+        The wallet session lives for the lifetime of the process: `ProcessBlocks` is driven by a
+        LoopingCall, and invokes only wait until the wallet has caught up with the chain height.
+        """
+        if self.wallet is not None:
+            return
         self.wallet = UserWallet.Open(self.wallet_path, self.wallet_pass)
-        self._walletdb_loop = task.LoopingCall(self.wallet.ProcessBlocks)
+        self._walletdb_loop = task.LoopingCall(self._process_wallet_blocks_in_pool)
         self._walletdb_loop.start(1)
 
     def close_wallet(self):
-        if self.wallet is not None:
+        if self._walletdb_loop is not None and self._walletdb_loop.running:
             self._walletdb_loop.stop()
-            self._walletdb_loop = None
-            self.wallet = None
+        self._walletdb_loop = None
+        with self.wallet_mutex:
+            if self.wallet is not None:
+                self.wallet.Close()
+                self.wallet = None
+
+    def _process_wallet_blocks_in_pool(self):
+        # The LoopingCall waits for the returned Deferred, so runs never overlap
+        d = self.defer_to_pool(self.process_wallet_blocks)
+        d.addCallback(lambda _: self._fire_sync_waiters())
+        d.addErrback(lambda failure: logger.error("Could not process wallet blocks: %s", failure.getErrorMessage()))
+        return d
+
+    def _fire_sync_waiters(self):
+        if not self.is_wallet_synced():
+            return
+        waiters, self._sync_waiters = self._sync_waiters, []
+        for d in waiters:
+            if not d.called:
+                d.callback(None)
+
+    def when_wallet_synced(self, timeout=WALLET_SYNC_TIMEOUT):
+        """
+        Returns a Deferred which fires on the reactor thread once the wallet has processed every
+        persisted block, or fails after `timeout` seconds.
+        """
+        if self.is_wallet_synced():
+            return defer.succeed(None)
+
+        d = defer.Deferred()
+        self._sync_waiters.append(d)
+
+        def on_timeout():
+            if d in self._sync_waiters:
+                self._sync_waiters.remove(d)
+            d.errback(Exception("Wallet is not synced yet (%s/100). Try again later." % self.percent_synced()))
+
+        timeout_call = reactor.callLater(timeout, on_timeout)
+
+        def cancel_timeout(res):
+            if timeout_call.active():
+                timeout_call.cancel()
+            return res
+
+        return d.addBoth(cancel_timeout)
+
+    def percent_synced(self):
+        if self.wallet is None:
+            return 0
+        return int(100 * self.wallet.WalletHeight / max(Blockchain.Default().Height, 1))
+
+    def process_wallet_blocks(self):
+        """ Incrementally sync the wallet. Skipped if an invoke currently holds the wallet. """
+        if not self.wallet_mutex.acquire(blocking=False):
+            return
+        try:
+            if self.wallet is not None:
+                self.wallet.ProcessBlocks()
+        finally:
             self.wallet_mutex.release()
 
-    def reopen_wallet(self):
-        self._walletdb_loop.stop()
-        self.wallet = UserWallet.Open(self.wallet_path, self.wallet_pass)
-        self._walletdb_loop = task.LoopingCall(self.wallet.ProcessBlocks)
-        self._walletdb_loop.start(1)
+    def is_wallet_synced(self):
+        return self.wallet is not None and self.wallet.WalletHeight > Blockchain.Default().Height
+
+    def wait_for_wallet_sync(self):
+        """
+        Catch the wallet up with the chain on the calling thread.
+
+        Callers are scheduled with `defer_after_wallet_sync` or `when_wallet_synced`, so only the
+        blocks persisted since are processed here. Waiting for the background loop instead could
+        wait forever on a thread pool full of such callers.
+        """
+        if self.wallet is None:
+            raise Exception("Open a wallet before invoking a smart contract method.")
 
-    def sync_wallet(self, attempts):
-        percent_synced = 0
-        wallet_synced = False
-        for i in range(0, attempts):
-            percent_synced = int(100 * self.wallet._current_height / Blockchain.Default().Height)
-            if percent_synced > 99:
-                wallet_synced = True
-                break
-            logger.info("waiting for wallet sync... height: %s. percent synced: %s" % (
-            self.wallet._current_height, percent_synced))
-            time.sleep(5)
-            self.reopen_wallet()
-        if not wallet_synced:
-            raise Exception("Wallet is not synced yet (%s/100). Try again later." % percent_synced)
+        with self.wallet_mutex:
+            while not self.is_wallet_synced():
+                height = self.wallet.WalletHeight
+                self.wallet.ProcessBlocks()
+                if self.wallet.WalletHeight == height:
+                    break
+
+        if not self.is_wallet_synced():
+            raise Exception("Wallet is not synced yet (%s/100). Try again later." % self.percent_synced())
 
     def wallet_has_gas(self):
         # Make sure no tx is in progress and we have GAS
@@ -152,21 +326,208 @@ class IdentitySmartContract():
             return True
         return False
 
-    def update_tx_unconfirmed(self):
-        for (tx_hash, time_passed) in self.tx_unconfirmed.items():
-            found = self.find_tx(tx_hash)
-            if found:
-                logger.info("Transaction found! %s" % tx_hash)
-                self.tx_unconfirmed.pop(tx_hash)
-                break
-            time_passed += 5
-            if time_passed > 120:  # wait 2 minutes
-                logger.info("Transaction failed :( %s" % tx_hash)
-                self.tx_unconfirmed.pop(tx_hash)
+    def get_tx_unconfirmed(self):
+        with self._tx_lock:
+            return list(self.tx_unconfirmed.keys())
+
+    def track_tx(self, tx_hash):
+        """
+        Start tracking a sent transaction. It is confirmed by `on_persist_completed` as soon as
+        a block containing it is persisted, so no polling of the blockchain is needed.
+        """
+        with self._tx_lock:
+            self.tx_unconfirmed[tx_hash] = time.time()
+
+        # In case the block was persisted before we got here
+        if Blockchain.Default().ContainsTransaction(UInt256.ParseString(tx_hash)):
+            reactor.callFromThread(self._resolve_tx, tx_hash, True)
+
+    def wait_for_confirmation(self, tx_hash):
+        """
+        Returns a Deferred which fires with True once the transaction is in a persisted block,
+        or with False if it failed to get confirmed in time. Must be called from the reactor thread.
+        """
+        with self._tx_lock:
+            if tx_hash in self.tx_unconfirmed:
+                d = defer.Deferred()
+                self._tx_waiters[tx_hash].append(d)
+                return d
+            failed = tx_hash in self.tx_failed
+
+        if failed:
+            return defer.succeed(False)
+        return self.defer_to_pool(self.find_tx, tx_hash)
+
+    def expire_tx_unconfirmed(self):
+        """ Mark transactions which didn't make it into a block in time as failed """
+        now = time.time()
+        with self._tx_lock:
+            expired = [tx_hash for tx_hash, sent_at in self.tx_unconfirmed.items() if now - sent_at > TX_CONFIRM_TIMEOUT]
+
+        for tx_hash in expired:
+            self._resolve_tx(tx_hash, False)
+
+    def _resolve_tx(self, tx_hash, confirmed):
+        with self._tx_lock:
+            if self.tx_unconfirmed.pop(tx_hash, None) is None:
+                return
+            if not confirmed:
                 self.tx_failed.append(tx_hash)
-                break
-            else:
-                self.tx_unconfirmed[tx_hash] = time_passed
+            waiters = self._tx_waiters.pop(tx_hash, [])
+
+        if confirmed:
+            logger.info("Transaction found! %s" % tx_hash)
+        else:
+            logger.info("Transaction failed :( %s" % tx_hash)
+
+        for d in waiters:
+            d.callback(confirmed)
+
+    def _build_script(self, contract, invoke_list):
+        sb = ScriptBuilder()
+        for index, (method, args) in enumerate(invoke_list):
+            params = parse_param(str(args))
+            sb.EmitAppCallWithOperationAndArgs(contract.Code.ScriptHash(), method, params)
+            logger.info("TestInvokeContract %s method: %s" % (str(index), str(method)))
+            logger.info("TestInvokeContract %s args: %s" % (str(index), str(params)))
+        return sb.ToArray()
+
+    def _get_contract(self):
+        contract = GetBlockchain().GetContract(self.contract_hash)
+        if not contract:
+            raise Exception("Contract %s not found" % self.contract_hash)
+        return contract
+
+    def _test_invoke_readonly(self, invoke_list):
+        """
+        Test invoke the contract against a LevelDB snapshot, without touching the wallet.
+
+        The script container is an unsigned stub transaction, so no coins are selected and
+        nothing is signed. Safe to call from many threads at once.
+        """
+        logger.info("invoke_readonly: %s", str(invoke_list))
+
+        version = (Blockchain.Default().Height, self.storage_version)
+        cache_key = (self.contract_hash, tuple((method, str(args)) for method, args in invoke_list))
+        results = self.result_cache.get(cache_key, version)
+        if results is not None:
+            return results
+
+        script = self._build_script(self._get_contract(), invoke_list)
+
+        container = InvocationTransaction()
+        container.Version = 1
+        container.inputs = []
+        container.outputs = []
+        container.Attributes = []
+        container.scripts = []
+        container.Script = binascii.unhexlify(script)
+
+        engine = ApplicationEngine.Run(script, container=container)
+        if engine.State & VMState.FAULT > 0:
+            raise Exception("TestInvokeContract failed")
+
+        results = [stack_item_to_py(item) for item in engine.EvaluationStack.Items]
+        logger.info("TestInvokeContract results: %s ", results)
+        logger.info("TestInvokeContract num_ops: %s" % engine.ops_processed)
+
+        if len(results) == 1 and results[0] == b'\x00':
+            raise Exception("TestInvokeContract returned False")
+
+        self.result_cache.put(cache_key, version, results)
+        return results
+
+    def invoke_batched(self, invoke_list):
+        """
+        Queue a write invoke, to be sent together with other pending writes in one transaction.
+        Must be called from the reactor thread.
+
+        Returns:
+            Deferred: fires with (results, tx_unconfirmed, tx_failed, tx_hash)
+        """
+        d = self.write_batcher.submit(invoke_list)
+        d.addCallback(lambda res: (res[0], self.get_tx_unconfirmed(), self.tx_failed, res[1]))
+        return d
+
+    def invoke_batch(self, batch):
+        """
+        Invoke several write requests with one transaction.
+
+        Requests whose single call returns False are left out of the transaction, the same way
+        `_invoke_method` refuses to send them.
+
+        Args:
+            batch (list): list of invoke lists, one per request
+
+        Returns:
+            tuple: (outcomes, tx_hash), with one outcome per request: its result list or an Exception
+        """
+        logger.info("invoke_batch: %s requests", len(batch))
+
+        self.wait_for_wallet_sync()
+
+        with self.wallet_mutex:
+            contract = self._get_contract()
+
+            outcomes = [None] * len(batch)
+            pending = list(range(len(batch)))
+            tx = fee = None
+            while pending:
+                invoke_list = [call for i in pending for call in batch[i]]
+                tx, fee, results = self._test_invoke_with_wallet(contract, invoke_list, [])
+
+                offset = 0
+                rejected = []
+                for i in pending:
+                    request_results = results[offset:offset + len(batch[i])]
+                    offset += len(batch[i])
+                    if len(request_results) == 1 and request_results[0] == b'\x00':
+                        outcomes[i] = Exception("TestInvokeContract returned False")
+                        rejected.append(i)
+                    else:
+                        outcomes[i] = request_results
+
+                if not rejected:
+                    break
+
+                # Results of the remaining calls may depend on the rejected ones, so test again
+                pending = [i for i in pending if i not in rejected]
+
+            if not pending:
+                return outcomes, None
+
+            return outcomes, self._send_invoke_tx(tx, fee)
+
+    def _test_invoke_with_wallet(self, contract, invoke_list, outputs):
+        """ Test invoke with a wallet made transaction. Caller must hold wallet_mutex. """
+        script = self._build_script(contract, invoke_list)
+        tx, fee, results, num_ops = test_invoke(script, self.wallet, outputs)
+        if not tx:
+            raise Exception("TestInvokeContract failed")
+
+        results = [stack_item_to_py(item) for item in results]
+        logger.info("TestInvokeContract fee: %s" % fee)
+        logger.info("TestInvokeContract results: %s ", results)
+        logger.info("TestInvokeContract num_ops: %s" % num_ops)
+        return tx, fee, results
+
+    def _send_invoke_tx(self, tx, fee):
+        """ Sign and relay a test invoked transaction. Caller must hold wallet_mutex. """
+        logger.info("TestInvokeContract done, calling InvokeContract now...")
+
+        if not self.wallet_has_gas():
+            logger.error("Oh no, wallet has no gas!")
+            logger.info(self.wallet.GetSyncedBalances())
+            raise Exception("Wallet has no gas.")
+
+        sent_tx = InvokeContract(self.wallet, tx, fee)
+        if not sent_tx:
+            raise Exception("InvokeContract failed")
+
+        sent_tx_hash = sent_tx.Hash.ToString()
+        logger.info("InvokeContract success, transaction underway: %s" % sent_tx_hash)
+        self.track_tx(sent_tx_hash)
+        return sent_tx_hash
 
     def _invoke_method(self, invoke_list, send_tx_needed, neo_to_attach=None):
         """ invoke a method of the smart contract """
@@ -174,23 +535,12 @@ class IdentitySmartContract():
         logger.info("invoke_method: %s", str(invoke_list))
         logger.info("Block %s / %s" % (str(Blockchain.Default().Height), str(Blockchain.Default().HeaderHeight)))
 
-        try:
-            self.open_wallet()
-
-            if not self.wallet:
-                raise Exception("Open a wallet before invoking a smart contract method.")
-
-            logger.info("making sure wallet is synced...")
-            time.sleep(3)
-
-            # Wait until wallet is synced:
-            self.sync_wallet(5)
+        # Wait until wallet is synced, before taking the wallet for this invoke
+        self.wait_for_wallet_sync()
 
+        with self.wallet_mutex:
             # access contract
-            BC = GetBlockchain()
-            contract = BC.GetContract(self.contract_hash)
-            if not contract:
-                raise Exception("Contract %s not found" % self.contract_hash)
+            contract = self._get_contract()
 
             # process attachments
             outputs = []
@@ -202,49 +552,13 @@ class IdentitySmartContract():
                                            )
                 outputs.append(output)
 
-            # construct script
-            sb = ScriptBuilder()
-            for index, (method, args) in enumerate(invoke_list):
-                params = parse_param(str(args))
-                sb.EmitAppCallWithOperationAndArgs(contract.Code.ScriptHash(), method, params)
-                logger.info("TestInvokeContract %s method: %s" % (str(index), str(method)))
-                logger.info("TestInvokeContract %s args: %s" % (str(index), str(params)))
-
-            # make testinvoke
-            tx, fee, results, num_ops = test_invoke(sb.ToArray(), self.wallet, outputs)
-            if not tx:
-                raise Exception("TestInvokeContract failed")
-
-            logger.info("TestInvokeContract fee: %s" % fee)
-            logger.info("TestInvokeContract results: %s ", [stack_item_to_py(item) for item in results])
-            logger.info("TestInvokeContract num_ops: %s" % num_ops)
-            results = [stack_item_to_py(item) for item in results]
+            # construct script and make testinvoke
+            tx, fee, results = self._test_invoke_with_wallet(contract, invoke_list, outputs)
 
             if(len(results) == 1 and results[0] == b'\x00'):
                 raise Exception("TestInvokeContract returned False")
 
             if not send_tx_needed:
-                self.close_wallet()
                 return results, None
 
-            logger.info("TestInvokeContract done, calling InvokeContract now...")
-
-            if not self.wallet_has_gas():
-                logger.error("Oh no, wallet has no gas!")
-                logger.info(self.wallet.GetSyncedBalances())
-                raise Exception("Wallet has no gas.")
-
-            sent_tx = InvokeContract(self.wallet, tx, fee)
-
-            if sent_tx:
-                sent_tx_hash = sent_tx.Hash.ToString()
-                logger.info("InvokeContract success, transaction underway: %s" % sent_tx_hash)
-                self.tx_unconfirmed[sent_tx_hash] = 0
-                self.close_wallet()
-                return results, sent_tx_hash
-
-            else:
-                raise Exception("InvokeContract failed")
-        except:
-            self.close_wallet()
-            raise
+            return results, self._send_invoke_tx(tx, fee)
@@ -0,0 +1,101 @@
+import time
+
+from twisted.internet import defer, reactor
+from twisted.python.threadpool import ThreadPool
+
+from neo.Utils.NeoTestCase import NeoTestCase
+from identity.batch import InvokeBatcher
+
+
+class InvokeBatcherTestCase(NeoTestCase):
+
+    def setUp(self):
+        self.batches = []
+        self.threadpool = ThreadPool(minthreads=1, maxthreads=2, name="test-batch")
+        self.threadpool.start()
+
+    def tearDown(self):
+        self.threadpool.stop()
+
+    def invoke_batch(self, batch):
+        self.batches.append(batch)
+        return [[call.upper() for call in invoke_list] for invoke_list in batch], 'tx%s' % len(self.batches)
+
+    def submit(self, batcher, invoke_list):
+        results = []
+        batcher.submit(invoke_list).addBoth(results.append)
+        return results
+
+    def wait_for(self, *results):
+        timeout = time.time() + 10
+        while not all(results) and time.time() < timeout:
+            reactor.runUntilCurrent()
+            time.sleep(0.001)
+
+    def test_full_batch_sent_in_one_transaction(self):
+        batcher = InvokeBatcher(self.invoke_batch, max_size=3, max_wait=60, threadpool=self.threadpool)
+        first = self.submit(batcher, ['a'])
+        second = self.submit(batcher, ['b', 'c'])
+        self.wait_for(first, second)
+
+        self.assertEqual(self.batches, [[['a'], ['b', 'c']]])
+        self.assertEqual(first, [(['A'], 'tx1')])
+        self.assertEqual(second, [(['B', 'C'], 'tx1')])
+
+    def test_request_not_fitting_starts_next_batch(self):
+        batcher = InvokeBatcher(self.invoke_batch, max_size=3, max_wait=60, threadpool=self.threadpool)
+        first = self.submit(batcher, ['a', 'b'])
+        second = self.submit(batcher, ['c', 'd'])
+        self.wait_for(first)
+        batcher.flush()
+        self.wait_for(second)
+
+        self.assertEqual(self.batches, [[['a', 'b']], [['c', 'd']]])
+        self.assertEqual(second, [(['C', 'D'], 'tx2')])
+
+    def test_flushed_after_max_wait(self):
+        batcher = InvokeBatcher(self.invoke_batch, max_size=10, max_wait=0.01, threadpool=self.threadpool)
+        results = self.submit(batcher, ['a'])
+        self.assertEqual(self.batches, [])
+
+        self.wait_for(results)
+        self.assertEqual(results, [(['A'], 'tx1')])
+
+    def test_failed_request_only_fails_itself(self):
+        def invoke_batch(batch):
+            return [Exception('rejected'), ['ok']], 'tx'
+
+        batcher = InvokeBatcher(invoke_batch, max_size=2, max_wait=60, threadpool=self.threadpool)
+        failed = self.submit(batcher, ['a'])
+        succeeded = self.submit(batcher, ['b'])
+        self.wait_for(failed, succeeded)
+
+        self.assertEqual(str(failed[0].value), 'rejected')
+        self.assertEqual(succeeded, [(['ok'], 'tx')])
+
+    def test_failed_batch_retried_one_by_one(self):
+        def invoke_batch(batch):
+            self.batches.append(batch)
+            if len(batch) > 1 or batch[0] == ['bad']:
+                raise Exception('batch failed')
+            return [['ok']], 'tx%s' % len(self.batches)
+
+        batcher = InvokeBatcher(invoke_batch, max_size=2, max_wait=60, threadpool=self.threadpool)
+        bad = self.submit(batcher, ['bad'])
+        good = self.submit(batcher, ['good'])
+        self.wait_for(bad, good)
+
+        self.assertEqual(len(self.batches), 3)
+        self.assertEqual(str(bad[0].value), 'batch failed')
+        self.assertEqual(good[0][0], ['ok'])
+
+    def test_waits_until_ready(self):
+        ready = defer.Deferred()
+        batcher = InvokeBatcher(self.invoke_batch, max_size=1, max_wait=60, threadpool=self.threadpool,
+                                when_ready=lambda: ready)
+        results = self.submit(batcher, ['a'])
+        self.assertEqual(self.batches, [])
+
+        ready.callback(None)
+        self.wait_for(results)
+        self.assertEqual(results, [(['A'], 'tx1')])
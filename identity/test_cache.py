@@ -0,0 +1,52 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from identity.cache import ResultCache
+
+
+class ResultCacheTestCase(NeoTestCase):
+
+    def test_get_put(self):
+        cache = ResultCache(max_size=10)
+        self.assertIsNone(cache.get('key', 1))
+
+        cache.put('key', 1, [b'value'])
+        self.assertEqual(cache.get('key', 1), [b'value'])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_other_version_misses(self):
+        cache = ResultCache(max_size=10)
+        cache.put('key', (5, 0), [1])
+
+        self.assertIsNone(cache.get('key', (6, 0)))
+        self.assertIsNone(cache.get('key', (5, 1)))
+        self.assertEqual(cache.get('key', (5, 0)), [1])
+
+    def test_results_are_copied(self):
+        cache = ResultCache(max_size=10)
+        value = [[1, 2]]
+        cache.put('key', 1, value)
+        value[0].append(3)
+
+        result = cache.get('key', 1)
+        self.assertEqual(result, [[1, 2]])
+        result[0].append(4)
+        self.assertEqual(cache.get('key', 1), [[1, 2]])
+
+    def test_least_recently_used_evicted(self):
+        cache = ResultCache(max_size=2)
+        cache.put('a', 1, 'a')
+        cache.put('b', 1, 'b')
+        cache.get('a', 1)
+        cache.put('c', 1, 'c')
+
+        self.assertIsNone(cache.get('b', 1))
+        self.assertEqual(cache.get('a', 1), 'a')
+        self.assertEqual(cache.get('c', 1), 'c')
+
+    def test_clear_and_stats(self):
+        cache = ResultCache(max_size=2)
+        cache.put('a', 1, 'a')
+        cache.get('a', 1)
+        cache.get('b', 1)
+        cache.clear()
+
+        self.assertEqual(cache.ToJson(), {"size": 0, "max_size": 2, "hits": 1, "misses": 1, "hit_rate": 0.5})
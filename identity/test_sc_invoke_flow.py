@@ -0,0 +1,163 @@
+import time
+import threading
+
+from twisted.internet import reactor
+
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Core.Blockchain import Blockchain
+from neocore.UInt256 import UInt256
+from identity import sc_invoke_flow
+from identity.sc_invoke_flow import IdentitySmartContract
+
+
+class Transaction():
+
+    def __init__(self, number):
+        self.Hash = UInt256(data=bytearray([number]) * 32)
+
+
+class PersistedBlock():
+
+    def __init__(self, transactions):
+        self.Transactions = transactions
+
+
+class StubWallet():
+    """ A wallet processing `step` blocks at a time, up to `limit` """
+
+    def __init__(self, step, limit=None):
+        self.WalletHeight = 0
+        self.step = step
+        self.limit = limit
+        self.threads = set()
+
+    def ProcessBlocks(self):
+        self.threads.add(threading.get_ident())
+        height = self.WalletHeight + self.step
+        self.WalletHeight = min(height, self.limit) if self.limit is not None else height
+
+
+class StubChain():
+    """ A chain holding the given transactions and no contract """
+
+    def __init__(self):
+        self.Height = 5
+        self.transactions = set()
+
+    def ContainsTransaction(self, hash):
+        return hash.ToBytes() in self.transactions
+
+    def GetContract(self, hash):
+        return None
+
+
+class IdentitySmartContractTestCase(NeoTestCase):
+
+    def setUp(self):
+        self._default_chain = Blockchain.Default()
+        Blockchain.DeregisterBlockchain()
+        self.chain = StubChain()
+        Blockchain.RegisterBlockchain(self.chain)
+
+        self.contract = IdentitySmartContract('ab' * 20, 'wallet.db3', 'password')
+
+    def tearDown(self):
+        self.contract._tx_expire_loop.stop()
+        Blockchain.PersistCompleted.on_change -= self.contract.on_persist_completed
+
+        Blockchain.DeregisterBlockchain()
+        if self._default_chain is not None:
+            Blockchain.RegisterBlockchain(self._default_chain)
+
+    def test_confirmed_by_persisted_block(self):
+        tx = Transaction(1)
+        tx_hash = tx.Hash.ToString()
+        self.contract.track_tx(tx_hash)
+        self.assertEqual(self.contract.get_tx_unconfirmed(), [tx_hash])
+
+        results = []
+        self.contract.wait_for_confirmation(tx_hash).addCallback(results.append)
+        self.contract.on_persist_completed(PersistedBlock([Transaction(2)]))
+        self.assertEqual(results, [])
+
+        self.contract.on_persist_completed(PersistedBlock([Transaction(2), tx]))
+        self.assertEqual(results, [True])
+        self.assertEqual(self.contract.get_tx_unconfirmed(), [])
+        self.assertEqual(self.contract.tx_failed, [])
+
+    def test_already_persisted_when_tracked(self):
+        tx = Transaction(1)
+        self.chain.transactions.add(tx.Hash.ToBytes())
+
+        results = []
+        self.contract.track_tx(tx.Hash.ToString())
+        self.contract.wait_for_confirmation(tx.Hash.ToString()).addCallback(results.append)
+        reactor.runUntilCurrent()
+
+        self.assertEqual(results, [True])
+        self.assertEqual(self.contract.get_tx_unconfirmed(), [])
+
+    def test_expired(self):
+        tx_hash = Transaction(1).Hash.ToString()
+        self.contract.track_tx(tx_hash)
+        results = []
+        self.contract.wait_for_confirmation(tx_hash).addCallback(results.append)
+
+        self.contract.expire_tx_unconfirmed()
+        self.assertEqual(results, [])
+
+        self.contract.tx_unconfirmed[tx_hash] = time.time() - sc_invoke_flow.TX_CONFIRM_TIMEOUT - 1
+        self.contract.expire_tx_unconfirmed()
+        self.assertEqual(results, [False])
+        self.assertEqual(self.contract.tx_failed, [tx_hash])
+
+        # and stays failed
+        self.contract.on_persist_completed(PersistedBlock([Transaction(1)]))
+        self.contract.wait_for_confirmation(tx_hash).addCallback(results.append)
+        self.assertEqual(results, [False, False])
+
+    def test_readonly_results_cached_per_height_and_storage_version(self):
+        invoke_list = [('getUsers', [])]
+        key = (self.contract.contract_hash, (('getUsers', '[]'),))
+        self.contract.result_cache.put(key, (5, 0), [b'users'])
+
+        self.assertEqual(self.contract._test_invoke_readonly(invoke_list), [b'users'])
+
+        # invoked again, failing as there is no contract
+        self.chain.Height = 6
+        with self.assertRaises(Exception) as context:
+            self.contract._test_invoke_readonly(invoke_list)
+        self.assertIn('not found', str(context.exception))
+
+        self.contract.result_cache.put(key, (6, 0), [b'users'])
+        self.contract._storage_dirty = True
+        self.contract.on_persist_completed(PersistedBlock([]))
+        with self.assertRaises(Exception):
+            self.contract._test_invoke_readonly(invoke_list)
+
+    def test_wallet_caught_up_on_calling_thread(self):
+        self.contract.wallet = StubWallet(step=2)
+        errors = []
+
+        def invoke():
+            try:
+                self.contract.wait_for_wallet_sync()
+            except Exception as e:
+                errors.append(e)
+
+        # as a thread of the pool would, while the background loop is not running
+        thread = threading.Thread(target=invoke)
+        thread.start()
+        thread.join(10)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(errors, [])
+        self.assertEqual(self.contract.wallet.WalletHeight, 6)
+        self.assertEqual(self.contract.wallet.threads, {thread.ident})
+
+    def test_wallet_not_catching_up(self):
+        self.contract.wallet = StubWallet(step=2, limit=3)
+
+        with self.assertRaises(Exception) as context:
+            self.contract.wait_for_wallet_sync()
+        self.assertIn('not synced', str(context.exception))
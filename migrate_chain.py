@@ -0,0 +1,54 @@
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB import StateMigration
+import plyvel
+import argparse
+import os
+
+
+def main(path, batch_size):
+    if not os.path.isdir(path):
+        print('Chain directory not found')
+        return 1
+
+    try:
+        db = plyvel.DB(path, create_if_missing=False)
+    except Exception as e:
+        print("Could not open chain database, make sure no node is running on it: %s" % e)
+        return 1
+
+    try:
+        version = db.get(DBPrefix.SYS_Version)
+        if version == LevelDBBlockchain._sysversion:
+            print("The chain at %s is already migrated" % path)
+            return 0
+
+        if not StateMigration.NeedsMigration(version) and not StateMigration.NeedsBlockMigration(version):
+            print("Unknown chain database version %s, not migrating" % version)
+            return 1
+
+        if StateMigration.NeedsMigration(version):
+            converted = StateMigration.MigrateHexStateToBinary(db, StateMigration.BINARY_STATE_VERSION, batch_size=batch_size)
+            version = StateMigration.BINARY_STATE_VERSION
+            print("Migrated %s state records" % converted)
+
+        if StateMigration.NeedsBlockMigration(version):
+            converted = StateMigration.MigrateBlocks(db, LevelDBBlockchain._sysversion, batch_size=batch_size)
+            print("Migrated %s blocks" % converted)
+
+        db.compact_range()
+        print("The chain can now be opened with this version of neo-python")
+    finally:
+        db.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Rewrites the hex encoded state records of a chain database as raw bytes and splits its blocks into '
+                    'separate header, system fee and transaction hashes records. Stop the node before running it.')
+    parser.add_argument('path', help='path to the chain directory, eg. ./Chains/SC234')
+    parser.add_argument('--batch-size', type=int, default=10000, help='number of records per write batch')
+    args = parser.parse_args()
+    exit(main(args.path, args.batch_size))
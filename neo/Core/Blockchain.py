@@ -155,6 +155,16 @@ class Blockchain(object):
         # abstract
         pass
 
+    @property
+    def VerifyBlocks(self):
+        """
+        Flag indicating if blocks are verified when added.
+
+        Returns:
+            bool:
+        """
+        return False
+
     @property
     def CurrentBlock(self):
         # abstract
@@ -233,33 +243,23 @@ class Blockchain(object):
         genAmount = Blockchain.GENERATION_AMOUNT
         genLen = len(genAmount)
 
-        for coinheight, group in groupby(unclaimed, lambda x: x.Heights):
-            amount = 0
-            ustart = int(coinheight.start / decInterval)
-
-            if ustart < genLen:
-
-                istart = coinheight.start % decInterval
-                uend = int(coinheight.end / decInterval)
-                iend = coinheight.end % decInterval
+        # amount generated before each decrement interval
+        genTotals = [0]
+        for amount in genAmount:
+            genTotals.append(genTotals[-1] + amount * decInterval)
 
-                if uend >= genLen:
-                    iend = 0
+        def generated(height):
+            # amount generated by the blocks below height
+            u, i = divmod(min(height, genLen * decInterval), decInterval)
+            return genTotals[u] + i * genAmount[u] if i else genTotals[u]
 
-                if iend == 0:
-                    uend -= 1
-                    iend = decInterval
+        blockchain = Blockchain.Default()
 
-                while ustart < uend:
-                    amount += (decInterval - istart) * genAmount[ustart]
-                    ustart += 1
-                    istart = 0
-
-                amount += (iend - istart) * genAmount[ustart]
+        for coinheight, group in groupby(unclaimed, lambda x: x.Heights):
+            amount = generated(coinheight.end) - generated(coinheight.start)
 
-            endamount = Blockchain.Default().GetSysFeeAmountByHeight(coinheight.end - 1)
-            startamount = 0 if coinheight.start == 0 else Blockchain.Default().GetSysFeeAmountByHeight(
-                coinheight.start - 1)
+            endamount = blockchain.GetSysFeeAmountByHeight(coinheight.end - 1)
+            startamount = 0 if coinheight.start == 0 else blockchain.GetSysFeeAmountByHeight(coinheight.start - 1)
             amount += endamount - startamount
 
             outputSum = 0
@@ -6,6 +6,7 @@ from neocore.UInt160 import UInt160
 from neo.IO.MemoryStream import StreamManager
 from neo.VM.ScriptBuilder import ScriptBuilder
 from neo.SmartContract.ApplicationEngine import ApplicationEngine
+from neo.Core.VerificationCache import VerificationCache, IsPureScript, VerifySingleSignature
 from neocore.Fixed8 import Fixed8
 from neo.SmartContract import TriggerType
 from neo.Settings import settings
@@ -154,9 +155,12 @@ class Helper(object):
             return False
 
         blockchain = GetBlockchain()
+        cache = VerificationCache.Default()
+        message = None
 
         for i in range(0, len(hashes)):
             verification = verifiable.Scripts[i].VerificationScript
+            invocation = verifiable.Scripts[i].InvocationScript
 
             if len(verification) == 0:
                 sb = ScriptBuilder()
@@ -168,26 +172,44 @@ class Helper(object):
                 if hashes[i] != verification_hash:
                     return False
 
-            state_reader = GetStateReader()
-            engine = ApplicationEngine(TriggerType.Verification, verifiable, blockchain, state_reader, Fixed8.Zero())
-            engine.LoadScript(verification, False)
-            invoction = verifiable.Scripts[i].InvocationScript
-            engine.LoadScript(invoction, True)
+                if IsPureScript(verification, checks=True) and IsPureScript(invocation):
+                    if message is None:
+                        message = verifiable.GetMessage()
 
-            try:
-                success = engine.Execute()
-                state_reader.ExecutionCompleted(engine, success)
-            except Exception as e:
-                state_reader.ExecutionCompleted(engine, False, e)
+                    key = VerificationCache.GetKey(verification, invocation, message)
+                    result = cache.Get(key)
+                    if result is None:
+                        result = VerifySingleSignature(message, verification, invocation)
+                        if result is None:
+                            result = Helper._ExecuteVerification(verifiable, blockchain, verification, invocation)
+                        cache.Add(key, result)
 
-            if engine.EvaluationStack.Count != 1 or not engine.EvaluationStack.Pop().GetBoolean():
-                Helper.EmitServiceEvents(state_reader)
-                return False
+                    if not result:
+                        return False
+                    continue
 
-            Helper.EmitServiceEvents(state_reader)
+            if not Helper._ExecuteVerification(verifiable, blockchain, verification, invocation):
+                return False
 
         return True
 
+    @staticmethod
+    def _ExecuteVerification(verifiable, blockchain, verification, invocation):
+        state_reader = GetStateReader()
+        engine = ApplicationEngine(TriggerType.Verification, verifiable, blockchain, state_reader, Fixed8.Zero())
+        engine.LoadScript(verification, False)
+        engine.LoadScript(invocation, True)
+
+        try:
+            success = engine.Execute()
+            state_reader.ExecutionCompleted(engine, success)
+        except Exception as e:
+            state_reader.ExecutionCompleted(engine, False, e)
+
+        result = engine.EvaluationStack.Count == 1 and engine.EvaluationStack.Pop().GetBoolean()
+        Helper.EmitServiceEvents(state_reader)
+        return result
+
     @staticmethod
     def IToBA(value):
         return [1 if digit == '1' else 0 for digit in bin(value)[2:]]
@@ -65,6 +65,22 @@ class StateBase(SerializableMixin):
 
         return retval
 
+    def ToBytes(self):
+        """
+        Serialize self to raw (not hex encoded) bytes, as stored in the database.
+
+        Returns:
+            bytes: serialized object.
+        """
+        ms = StreamManager.GetStream()
+        writer = BinaryWriter(ms)
+        self.Serialize(writer)
+
+        retval = ms.getvalue()
+        StreamManager.ReleaseStream(ms)
+
+        return retval
+
     def ToJson(self):
         """
         Convert object members to a dictionary that can be parsed as JSON.
@@ -0,0 +1,156 @@
+import hashlib
+import threading
+
+from collections import OrderedDict
+
+from neocore.Cryptography.Crypto import Crypto
+
+from neo.VM.InstructionCache import DecodeInstruction
+from neo.VM.OpCode import PUSH16, PUSHBYTES33, PUSHBYTES64, CHECKSIG, CHECKMULTISIG
+
+PUSH16_INT = PUSH16[0]
+CHECK_INTS = (CHECKSIG[0], CHECKMULTISIG[0])
+
+
+def IsPureScript(script, checks=False):
+    """
+    Check that the outcome of a script only depends on the script itself and the signed message.
+
+    That is a script made of push instructions only, followed by a CHECKSIG or CHECKMULTISIG if
+    `checks` is set, as are the invocation and verification scripts of standard contracts.
+    Anything else (SYSCALL, APPCALL, jumps...) may depend on the state of the chain.
+
+    Args:
+        script (bytes): the script.
+        checks (bool): allow CHECKSIG and CHECKMULTISIG instructions.
+
+    Returns:
+        bool:
+    """
+    offset = 0
+    while offset < len(script):
+        instruction = DecodeInstruction(script, offset)
+        if instruction.Error is not None:
+            return False
+
+        op = instruction.OpCode[0]
+        if op > PUSH16_INT and not (checks and op in CHECK_INTS):
+            return False
+
+        offset = instruction.NextOffset
+
+    return True
+
+
+def VerifySingleSignature(message, verification, invocation):
+    """
+    Verify a standard single signature witness without running it in the VM.
+
+    Args:
+        message (bytes): the signed message, as returned by `GetMessage()`.
+        verification (bytes): the verification script.
+        invocation (bytes): the invocation script.
+
+    Returns:
+        bool: the outcome of the verification, or None if the witness is not a plain
+              PUSHBYTES64 <signature> / PUSHBYTES33 <public key> CHECKSIG one.
+    """
+    if len(verification) != 35 or verification[0:1] != PUSHBYTES33 or verification[34:35] != CHECKSIG:
+        return None
+
+    if len(invocation) != 65 or invocation[0:1] != PUSHBYTES64:
+        return None
+
+    try:
+        return bool(Crypto.VerifySignature(message, invocation[1:], verification[1:34]))
+    except Exception:
+        return False
+
+
+class VerificationCache():
+    """
+    Bounded LRU cache of witness verification results.
+
+    Results are keyed by verification script, invocation script and hash of the signed message,
+    so a transaction relayed by several peers only has its signatures checked once. Only witnesses
+    of pure scripts (see `IsPureScript`) are cached, their outcome can not change afterwards.
+    """
+    max_size = None
+    hits = 0
+    misses = 0
+
+    _default = None
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def Default():
+        """
+        Get the cache shared by all script verifications.
+
+        Returns:
+            VerificationCache:
+        """
+        if VerificationCache._default is None:
+            VerificationCache._default = VerificationCache()
+        return VerificationCache._default
+
+    @staticmethod
+    def GetKey(verification, invocation, message):
+        """
+        Get the cache key of a witness.
+
+        Args:
+            verification (bytes): the verification script.
+            invocation (bytes): the invocation script.
+            message (bytes): the signed message.
+
+        Returns:
+            tuple:
+        """
+        return bytes(verification), bytes(invocation), hashlib.sha256(message).digest()
+
+    def Get(self, key):
+        """
+        Get the verification result of a witness.
+
+        Args:
+            key (tuple): key of the witness, see `GetKey`.
+
+        Returns:
+            bool: the result, None if not cached.
+        """
+        with self._lock:
+            result = self._items.get(key)
+            if result is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return result
+
+    def Add(self, key, result):
+        with self._lock:
+            self._items[key] = result
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def ToJson(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0,
+            }
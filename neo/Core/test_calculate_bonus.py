@@ -0,0 +1,38 @@
+from collections import namedtuple
+
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Core.Blockchain import Blockchain
+from neocore.Fixed8 import Fixed8
+
+CoinHeight = namedtuple('CoinHeight', 'start end')
+
+
+class SpentCoin():
+
+    def __init__(self, start, end, value):
+        self.Heights = CoinHeight(start, end)
+        self.Value = Fixed8.FromDecimal(value)
+
+
+class SysFeeBlockchain(Blockchain):
+
+    def GetSysFeeAmountByHeight(self, height):
+        return height * 10
+
+
+class CalculateBonusTestCase(NeoTestCase):
+
+    def setUp(self):
+        Blockchain.DeregisterBlockchain()
+        Blockchain.RegisterBlockchain(SysFeeBlockchain())
+
+    def tearDown(self):
+        Blockchain.DeregisterBlockchain()
+
+    def test_calculate_bonus(self):
+        # 10 blocks generating 8 and 90 system fee
+        self.assertEqual(Blockchain.CalculateBonusInternal([SpentCoin(0, 10, 100)]).value, 17000)
+
+        # across a decrement interval, and across the end of the generation
+        coins = [SpentCoin(1999990, 2000010, 1), SpentCoin(1999990, 2000010, 2), SpentCoin(43999990, 44000010, 5)]
+        self.assertEqual(Blockchain.CalculateBonusInternal(coins).value, 3 * (80 + 70 + 200) + 5 * (10 + 200))
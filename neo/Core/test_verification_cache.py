@@ -0,0 +1,103 @@
+import binascii
+
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Core.Helper import Helper
+from neo.Core.Witness import Witness
+from neo.Core.VerificationCache import VerificationCache, IsPureScript, VerifySingleSignature
+from neocore.Cryptography.Crypto import Crypto
+from neocore.KeyPair import KeyPair
+
+
+class Verifiable():
+
+    def __init__(self, message, scripts):
+        self.message = message
+        self.Scripts = scripts
+
+    @property
+    def Hash(self):
+        return Crypto.Hash256(self.message)
+
+    def GetMessage(self):
+        return self.message
+
+    def GetScriptHashesForVerifying(self):
+        return [Crypto.ToScriptHash(witness.VerificationScript, unhex=False) for witness in self.Scripts]
+
+
+class VerificationCacheTestCase(NeoTestCase):
+
+    def setUp(self):
+        self.keys = [KeyPair(bytes([i]) * 32) for i in (1, 2)]
+        self.message = binascii.hexlify(b'verification cache test')
+        VerificationCache._default = VerificationCache()
+
+    def tearDown(self):
+        VerificationCache._default = None
+
+    def sign(self, key):
+        return b'\x40' + bytes(Crypto.Sign(self.message, key.PrivateKey))
+
+    def single_sig_script(self, key):
+        return b'\x21' + binascii.unhexlify(key.PublicKey.encode_point(True)) + b'\xac'
+
+    def test_single_signature(self):
+        verification = self.single_sig_script(self.keys[0])
+        good = self.sign(self.keys[0])
+        bad = self.sign(self.keys[1])
+
+        self.assertTrue(VerifySingleSignature(self.message, verification, good))
+        self.assertFalse(VerifySingleSignature(self.message, verification, bad))
+        self.assertFalse(VerifySingleSignature(self.message, verification, b'\x40' + b'\x00' * 64))
+        self.assertIsNone(VerifySingleSignature(self.message, verification, b'\x01\x01' + good))
+
+        # same outcome as running the witness in the VM
+        verifiable = Verifiable(self.message, [])
+        for invocation in (good, bad, b'\x01\x01' + good):
+            self.assertEqual(Helper._ExecuteVerification(verifiable, None, verification, invocation), invocation == good)
+
+    def test_verify_scripts_cached(self):
+        cache = VerificationCache.Default()
+        verifiable = Verifiable(self.message, [Witness(self.sign(self.keys[0]), self.single_sig_script(self.keys[0]))])
+
+        self.assertTrue(Helper.VerifyScripts(verifiable))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        self.assertTrue(Helper.VerifyScripts(verifiable))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # another message is another entry
+        verifiable.message = binascii.hexlify(b'another message')
+        self.assertFalse(Helper.VerifyScripts(verifiable))
+        self.assertFalse(Helper.VerifyScripts(verifiable))
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_multi_signature(self):
+        points = [binascii.unhexlify(key.PublicKey.encode_point(True)) for key in self.keys]
+        verification = b'\x52' + b''.join(b'\x21' + point for point in points) + b'\x52\xae'
+        invocation = self.sign(self.keys[0]) + self.sign(self.keys[1])
+
+        self.assertTrue(IsPureScript(verification, checks=True))
+        self.assertIsNone(VerifySingleSignature(self.message, verification, invocation))
+
+        verifiable = Verifiable(self.message, [Witness(invocation, verification)])
+        self.assertTrue(Helper.VerifyScripts(verifiable))
+        self.assertTrue(Helper.VerifyScripts(verifiable))
+        self.assertEqual(VerificationCache.Default().hits, 1)
+
+    def test_pure_script(self):
+        self.assertTrue(IsPureScript(b''))
+        self.assertTrue(IsPureScript(b'\x00\x51\x02\x01\x02'))
+        self.assertFalse(IsPureScript(b'\x4d\x01'))
+        self.assertFalse(IsPureScript(b'\xac'))
+        self.assertTrue(IsPureScript(b'\xac', checks=True))
+        # SYSCALL / APPCALL depend on the state of the chain
+        self.assertFalse(IsPureScript(b'\x68\x04test', checks=True))
+        self.assertFalse(IsPureScript(b'\x67' + b'\x00' * 20, checks=True))
+
+    def test_bounded(self):
+        cache = VerificationCache(max_size=2)
+        for i in range(3):
+            cache.Add(VerificationCache.GetKey(b'', bytes([i]), b''), True)
+        self.assertIsNone(cache.Get(VerificationCache.GetKey(b'', b'\x00', b'')))
+        self.assertTrue(cache.Get(VerificationCache.GetKey(b'', b'\x02', b'')))
+        self.assertEqual(cache.ToJson()['size'], 2)
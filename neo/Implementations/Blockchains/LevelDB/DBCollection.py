@@ -1,8 +1,21 @@
-import binascii
 from logzero import logger
 
 
 class DBCollection():
+    """
+    Cache of deserialized state objects for one key prefix, which tracks the keys
+    that have to be written back or deleted on `Commit`.
+
+    `Changed` is a dict used as an insertion ordered set, so that commits happen in a deterministic
+    order, and `Deleted` is a set. Both make tracking a key O(1), no matter how many keys a block touches.
+
+    `Commit` writes into the given write batch, so nothing reaches the database before the batch is
+    written. Keys deleted by an earlier commit into the same batch are remembered, so that they are
+    not read back from the database in the meantime.
+
+    Items are stored as raw serialized bytes (see `StateMigration` for databases written with the
+    former hex encoding).
+    """
 
     DB = None
 #    SN = None
@@ -12,11 +25,13 @@ class DBCollection():
 
     Collection = {}
 
-    Changed = []
-    Deleted = []
+    Changed = {}
+    Deleted = set()
 
     _built_keys = False
 
+    _committed_deletes = None
+
     DebugStorage = False
 
     def __init__(self, db, sn, prefix, class_ref):
@@ -28,8 +43,9 @@ class DBCollection():
         self.ClassRef = class_ref
 
         self.Collection = {}
-        self.Changed = []
-        self.Deleted = []
+        self.Changed = {}
+        self.Deleted = set()
+        self._committed_deletes = set()
 
     @property
     def Keys(self):
@@ -54,23 +70,33 @@ class DBCollection():
     def _BuildCollectionKeys(self):
         for key in self.DB.iterator(prefix=self.Prefix, include_value=False):
             key = key[1:]
-            if key not in self.Collection.keys():
+            if key not in self.Collection:
                 self.Collection[key] = None
 
     def Commit(self, wb, destroy=True):
+        """
+        Write changed and deleted items.
+
+        Args:
+            wb (plyvel.WriteBatch): batch to write into. If None, items are written to the database directly.
+            destroy (bool): release the collection afterwards.
+        """
+        target = wb if wb is not None else self.DB
 
         for keyval in self.Changed:
             item = self.Collection[keyval]
             if item:
-                self.DB.put(self.Prefix + keyval, self.Collection[keyval].ToByteArray())
-        for keyval in self.Deleted:
-            self.DB.delete(self.Prefix + keyval)
+                target.put(self.Prefix + keyval, item.ToBytes())
+                self._committed_deletes.discard(keyval)
+        for keyval in sorted(self.Deleted):
+            target.delete(self.Prefix + keyval)
             self.Collection[keyval] = None
+            self._committed_deletes.add(keyval)
         if destroy:
             self.Destroy()
         else:
-            self.Changed = []
-            self.Deleted = []
+            self.Changed = {}
+            self.Deleted = set()
 
     def GetAndChange(self, keyval, new_instance=None, debug_item=False):
 
@@ -92,8 +118,7 @@ class DBCollection():
 
         item = new_instance
 
-        if keyval in self.Deleted:
-            self.Deleted.remove(keyval)
+        self.Deleted.discard(keyval)
 
         self.Add(keyval, item)
 
@@ -107,7 +132,7 @@ class DBCollection():
         if keyval in self.Deleted:
             return None
 
-        if keyval in self.Collection.keys():
+        if keyval in self.Collection:
             item = self.Collection[keyval]
             if item is None:
                 item = self._GetItem(keyval)
@@ -129,13 +154,13 @@ class DBCollection():
         return None
 
     def _GetItem(self, keyval):
-        if keyval in self.Deleted:
+        if keyval in self.Deleted or keyval in self._committed_deletes:
             return None
 
         try:
             buffer = self.DB.get(self.Prefix + keyval)
             if buffer:
-                item = self.ClassRef.DeserializeFromDB(binascii.unhexlify(buffer))
+                item = self.ClassRef.DeserializeFromDB(buffer)
                 self.Collection[keyval] = item
                 return item
             return None
@@ -149,20 +174,27 @@ class DBCollection():
         self.MarkChanged(keyval)
 
     def Remove(self, keyval):
-        if keyval not in self.Deleted:
-            self.Deleted.append(keyval)
+        self.Deleted.add(keyval)
 
     def MarkChanged(self, keyval):
-        if keyval not in self.Changed:
-            self.Changed.append(keyval)
+        self.Changed[keyval] = None
 
     # @TODO This has not been tested or verified to work.
     def Find(self, key_prefix):
-        key_prefix = self.Prefix + key_prefix
-        res = []
-        for key, val in self.DB.iterator(prefix=key_prefix):
-            res.append({key: val})
-        return res
+        prefix = self.Prefix + key_prefix
+        found = {}
+        for key, val in self.DB.iterator(prefix=prefix):
+            found[key] = val
+
+        # items committed into a batch that is not written yet, or not committed at all, are only
+        # known to the collection
+        for keyval in self._committed_deletes | self.Deleted:
+            found.pop(self.Prefix + keyval, None)
+        for keyval, item in self.Collection.items():
+            if item is not None and keyval not in self.Deleted and keyval.startswith(key_prefix):
+                found[self.Prefix + keyval] = item.ToBytes()
+
+        return [{key: found[key]} for key in sorted(found)]
 
     def Destroy(self):
         self.DB = None
@@ -172,4 +204,5 @@ class DBCollection():
         self.Prefix = None
         self.Deleted = None
         self.Changed = None
+        self._committed_deletes = None
         logger = None
@@ -1,7 +1,11 @@
 class DBPrefix:
 
+    # system fee amount and hex encoded trimmed block, only found in databases to migrate
     DATA_Block = b'\x01'
     DATA_Transaction = b'\x02'
+    DATA_Header = b'\x03'
+    DATA_SysFee = b'\x04'
+    DATA_BlockTransactions = b'\x05'
 
     ST_Account = b'\x40'
     ST_Coin = b'\x44'
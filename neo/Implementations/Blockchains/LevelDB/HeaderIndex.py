@@ -0,0 +1,207 @@
+import binascii
+from array import array
+from struct import Struct, iter_unpack
+
+from neo.Implementations.Blockchains.LevelDB.Snapshot import WriteSnapshot, ReadSnapshot
+
+# size of a raw header hash
+HASH_SIZE = 32
+
+# the buffer grows by at least this many hashes, a stored header hash list
+MIN_GROWTH = 2000
+
+SNAPSHOT_MAGIC = b'NEOHIDX1'
+
+# precedes the hashes and the table of heights in a snapshot: number of hashes, number of slots
+SNAPSHOT_HEADER = Struct('<II')
+
+
+class HeaderIndex():
+    """
+    The header hashes of a chain by height, as a sequence of hex encoded hash bytes
+    (`UInt256.ToBytes()`), like the list it replaces.
+
+    Hashes are kept as 32 raw bytes each in one growable buffer, in the byte order of
+    `UInt256.Data` and of the stored `IX_HeaderHashList` records, and only hex encoded when read.
+    Heights are found by hash through an open addressing table of `height + 1` values, probed
+    with the leading bytes of the hash, which are uniformly distributed already.
+
+    Both are written as is to snapshot files, so they load without decoding a hash.
+    """
+
+    def __init__(self):
+        self._data = bytearray()
+        self._count = 0
+        self._slots = array('I', bytes(4 * 1024))
+        self._mask = 1023
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError('header index out of range')
+
+        return binascii.hexlify(self.GetRaw(index)[::-1])
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def __contains__(self, hash):
+        return self.IndexOf(hash) >= 0
+
+    def GetRaw(self, height):
+        """
+        Get a hash as raw bytes.
+
+        Args:
+            height (int): height of the hash, from 0 to `len(self) - 1`.
+
+        Returns:
+            bytes: the 32 bytes of the hash, in `UInt256.Data` order.
+        """
+        start = height * HASH_SIZE
+        return bytes(self._data[start:start + HASH_SIZE])
+
+    def IndexOf(self, hash):
+        """
+        Get the height of a hash.
+
+        Args:
+            hash (bytes): hex encoded hash, as `UInt256.ToBytes()`.
+
+        Returns:
+            int: the height, -1 if the hash is not in the index.
+        """
+        try:
+            raw = binascii.unhexlify(hash)[::-1]
+        except (binascii.Error, TypeError):
+            return -1
+        if len(raw) != HASH_SIZE:
+            return -1
+
+        data = self._data
+        slots = self._slots
+        mask = self._mask
+        slot = int.from_bytes(raw[:8], 'little') & mask
+        while True:
+            entry = slots[slot]
+            if entry == 0:
+                return -1
+            start = (entry - 1) * HASH_SIZE
+            if data[start:start + HASH_SIZE] == raw:
+                return entry - 1
+            slot = (slot + 1) & mask
+
+    def append(self, hash):
+        self.extend([hash])
+
+    def extend(self, hashes):
+        """
+        Append hashes.
+
+        Args:
+            hashes (list): of hex encoded hashes, in height order.
+        """
+        self.ExtendRaw(b''.join(binascii.unhexlify(hash)[::-1] for hash in hashes))
+
+    def ExtendRaw(self, data):
+        """
+        Append hashes given as raw bytes, as stored in `IX_HeaderHashList` records.
+
+        Args:
+            data (bytes): concatenated 32 byte hashes, in `UInt256.Data` order and height order.
+        """
+        count = len(data) // HASH_SIZE
+        if count * HASH_SIZE != len(data):
+            raise ValueError('header hashes must be %s bytes each' % HASH_SIZE)
+
+        start = self._count
+        end = start + count
+
+        # grow ahead, as a list does
+        if end * HASH_SIZE > len(self._data):
+            self.Reserve(max(end + (end >> 3), start + MIN_GROWTH))
+        self._data[start * HASH_SIZE:end * HASH_SIZE] = data
+        self._count = end
+
+        self._AddSlots(start, end)
+
+    def Reserve(self, capacity):
+        """
+        Allocate room for a number of hashes, so appending up to that many hashes neither copies
+        the buffer nor rebuilds the table of heights.
+
+        Args:
+            capacity (int): number of hashes.
+        """
+        if capacity * HASH_SIZE > len(self._data):
+            self._data.extend(bytes(capacity * HASH_SIZE - len(self._data)))
+
+        # at most half of the slots are used
+        size = len(self._slots)
+        if capacity * 2 > size:
+            while capacity * 2 > size:
+                size *= 2
+            self._slots = array('I', bytes(4 * size))
+            self._mask = size - 1
+            self._AddSlots(0, self._count)
+
+    def _AddSlots(self, start, end):
+        slots = self._slots
+        mask = self._mask
+        view = memoryview(self._data)[start * HASH_SIZE:end * HASH_SIZE]
+        for height, (key,) in enumerate(iter_unpack('<Q24x', view), start + 1):
+            slot = key & mask
+            while slots[slot]:
+                slot = (slot + 1) & mask
+            slots[slot] = height
+        view.release()
+
+    def WriteSnapshot(self, path):
+        """
+        Write the index to a snapshot file, replacing it once complete.
+
+        Args:
+            path (str): path of the snapshot file.
+        """
+        with memoryview(self._data)[:self._count * HASH_SIZE] as data:
+            WriteSnapshot(path, SNAPSHOT_MAGIC, [SNAPSHOT_HEADER.pack(self._count, len(self._slots)), data, self._slots])
+
+    @staticmethod
+    def LoadSnapshot(path):
+        """
+        Load an index from a snapshot file.
+
+        Args:
+            path (str): path of the snapshot file.
+
+        Returns:
+            HeaderIndex: the index, None if there is no snapshot or it is not complete.
+        """
+        return ReadSnapshot(path, SNAPSHOT_MAGIC, HeaderIndex._FromSnapshot)
+
+    @staticmethod
+    def _FromSnapshot(content):
+        if len(content) < SNAPSHOT_HEADER.size:
+            return None
+
+        count, size = SNAPSHOT_HEADER.unpack_from(content)
+        start = SNAPSHOT_HEADER.size
+        end = start + count * HASH_SIZE
+        if end + size * 4 != len(content) or count == 0 or size & (size - 1) or count * 2 > size:
+            return None
+
+        index = HeaderIndex()
+        index._data = bytearray(content[start:end])
+        index._count = count
+        index._slots = array('I')
+        index._slots.frombytes(content[end:])
+        index._mask = size - 1
+        return index
@@ -1,6 +1,8 @@
+import os
 import time
 import plyvel
 import binascii
+from array import array
 
 from logzero import logger
 
@@ -9,10 +11,12 @@ from neo.Core.Header import Header
 from neo.Core.Block import Block
 from neo.Core.TX.Transaction import Transaction, TransactionType
 from neocore.IO.BinaryWriter import BinaryWriter
-from neocore.IO.BinaryReader import BinaryReader
 from neo.IO.MemoryStream import StreamManager
 from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
 from neo.Implementations.Blockchains.LevelDB.CachedScriptTable import CachedScriptTable
+from neo.Implementations.Blockchains.LevelDB.HeaderIndex import HeaderIndex
+from neo.Implementations.Blockchains.LevelDB.Snapshot import WriteSnapshot, ReadSnapshot
+from neo.Implementations.Blockchains.LevelDB.TrimmedBlock import SplitTrimmedBlock
 from neocore.Fixed8 import Fixed8
 from neocore.UInt160 import UInt160
 from neocore.UInt256 import UInt256
@@ -26,6 +30,7 @@ from neo.Core.State.ValidatorState import ValidatorState
 from neo.Core.State.ContractState import ContractState
 from neo.Core.State.StorageItem import StorageItem
 from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB import StateMigration
 
 from neo.SmartContract.StateMachine import StateMachine
 from neo.SmartContract.ApplicationEngine import ApplicationEngine
@@ -39,19 +44,38 @@ class LevelDBBlockchain(Blockchain):
     _path = None
     _db = None
 
-    _header_index = []
+    _header_index = None
     _block_cache = {}
 
     _current_block_height = 0
     _stored_header_count = 0
 
+    # file in the chain directory holding a snapshot of the header index
+    HEADER_SNAPSHOT_FILE = 'header_index.snapshot'
+    # number of headers added between two snapshots
+    HEADER_SNAPSHOT_INTERVAL = 100000
+    _snapshot_header_height = 0
+
+    # cumulative system fee amount by block height, as stored in `DATA_SysFee` records
+    _sysfee_amounts = None
+
+    # file in the chain directory holding a snapshot of the system fee amounts
+    SYSFEE_SNAPSHOT_FILE = 'sysfee.snapshot'
+    SYSFEE_SNAPSHOT_MAGIC = b'NEOSFEE1'
+    # number of blocks persisted between two snapshots
+    SYSFEE_SNAPSHOT_INTERVAL = 100000
+    _snapshot_sysfee_height = 0
+
     _disposed = False
 
     _verify_blocks = False
 
     # this is the version of the database
     # should not be updated for network version changes
-    _sysversion = b'/NEO:2.0.1/'
+    # 'binary-state': state records are stored as raw bytes instead of hex
+    # 'split-blocks': the header, system fee amount and transaction hashes of a block are stored
+    # as separate raw records instead of one hex encoded `DATA_Block` record
+    _sysversion = b'/NEO:2.0.1/binary-state/split-blocks/'
 
     _persisting_block = None
 
@@ -81,6 +105,10 @@ class LevelDBBlockchain(Blockchain):
         height = len(self._header_index) - 1
         return height
 
+    @property
+    def VerifyBlocks(self):
+        return self._verify_blocks
+
     @property
     def Height(self):
         return self._current_block_height
@@ -95,12 +123,21 @@ class LevelDBBlockchain(Blockchain):
     def Path(self):
         return self._path
 
+    @property
+    def HeaderSnapshotPath(self):
+        return os.path.join(self._path, self.HEADER_SNAPSHOT_FILE)
+
+    @property
+    def SysFeeSnapshotPath(self):
+        return os.path.join(self._path, self.SYSFEE_SNAPSHOT_FILE)
+
     def __init__(self, path):
         super(LevelDBBlockchain, self).__init__()
         self._path = path
 
-        self._header_index = []
+        self._header_index = HeaderIndex()
         self._header_index.append(Blockchain.GenesisBlock().Header.Hash.ToBytes())
+        self._sysfee_amounts = array('Q')
 
         try:
             self._db = plyvel.DB(self._path, create_if_missing=True)
@@ -111,6 +148,16 @@ class LevelDBBlockchain(Blockchain):
 
         version = self._db.get(DBPrefix.SYS_Version)
 
+        if StateMigration.NeedsMigration(version):
+            logger.info("Migrating state records of %s to binary encoding, this may take a while" % self._path)
+            StateMigration.MigrateHexStateToBinary(self._db, StateMigration.BINARY_STATE_VERSION)
+            version = StateMigration.BINARY_STATE_VERSION
+
+        if StateMigration.NeedsBlockMigration(version):
+            logger.info("Migrating blocks of %s to separate records, this may take a while" % self._path)
+            StateMigration.MigrateBlocks(self._db, self._sysversion)
+            version = self._sysversion
+
         if version == self._sysversion:  # or in the future, if version doesn't equal the current version...
 
             ba = bytearray(self._db.get(DBPrefix.SYS_CurrentBlock, 0))
@@ -123,40 +170,36 @@ class LevelDBBlockchain(Blockchain):
             #            logger.info("current header hash!! %s " % current_header_hash)
             #            logger.info("current header height, hashes %s %s %s" %(self._current_block_height, self._header_index, current_header_height) )
 
+            self._LoadHeaderSnapshot(current_header_height)
+
+            # the stored header hash lists not in the snapshot, if any
             hashes = []
             try:
-                for key, value in self._db.iterator(prefix=DBPrefix.IX_HeaderHashList):
-                    ms = StreamManager.GetStream(value)
-                    reader = BinaryReader(ms)
-                    hlist = reader.Read2000256List()
-                    key = int.from_bytes(key[-4:], 'little')
-                    hashes.append({'k': key, 'v': hlist})
-                    StreamManager.ReleaseStream(ms)
-            #                hashes.append({'index':int.from_bytes(key, 'little'), 'hash':value})
-
+                for key in self._db.iterator(prefix=DBPrefix.IX_HeaderHashList, include_value=False):
+                    hashes.append(int.from_bytes(key[-4:], 'little'))
             except Exception as e:
                 logger.info("Could not get stored header hash list: %s " % e)
 
             if len(hashes):
-                hashes.sort(key=lambda x: x['k'])
-                genstr = Blockchain.GenesisBlock().Hash.ToBytes()
-                for hlist in hashes:
-
-                    for hash in hlist['v']:
-                        if hash != genstr:
-                            self._header_index.append(hash)
-                        self._stored_header_count += 1
-
-            if self._stored_header_count == 0:
+                hashes.sort()
+                self._stored_header_count = len(hashes) * 2000
+                self._header_index.Reserve(self._stored_header_count)
+                for start in hashes:
+                    skip = len(self._header_index) - start
+                    if skip >= 2000:
+                        continue
+
+                    # the hex of 2000 raw hashes, as written by `BinaryWriter.Write2000256List`
+                    value = self._db.get(DBPrefix.IX_HeaderHashList + start.to_bytes(4, 'little'))
+                    self._header_index.ExtendRaw(binascii.unhexlify(value)[max(skip, 0) * 32:])
+
+            if self._stored_header_count == 0 and len(self._header_index) == 1:
                 headers = []
-                for key, value in self._db.iterator(prefix=DBPrefix.DATA_Block):
-                    dbhash = bytearray(value)[8:]
-                    headers.append(Header.FromTrimmedData(binascii.unhexlify(dbhash), 0))
+                for value in self._db.iterator(prefix=DBPrefix.DATA_Header, include_key=False):
+                    headers.append(Header.FromTrimmedData(value, 0))
 
                 headers.sort(key=lambda h: h.Index)
-                for h in headers:
-                    if h.Index > 0:
-                        self._header_index.append(h.Hash.ToBytes())
+                self._header_index.extend([h.Hash.ToBytes() for h in headers if h.Index > 0])
 
             elif current_header_height > self._stored_header_count:
 
@@ -173,11 +216,17 @@ class LevelDBBlockchain(Blockchain):
                     self.AddHeaders(newhashes)
                 except Exception as e:
                     pass
+
+            self._LoadSysFeeAmounts()
         else:
             with self._db.write_batch() as wb:
                 for key, value in self._db.iterator():
                     wb.delete(key)
 
+            for path in [self.HeaderSnapshotPath, self.SysFeeSnapshotPath]:
+                if os.path.exists(path):
+                    os.remove(path)
+
             self.Persist(Blockchain.GenesisBlock())
             self._db.put(DBPrefix.SYS_Version, self._sysversion)
 
@@ -414,10 +463,9 @@ class LevelDBBlockchain(Blockchain):
     def GetHeader(self, hash):
 
         try:
-            out = bytearray(self._db.get(DBPrefix.DATA_Block + hash))
-            out = out[8:]
-            outhex = binascii.unhexlify(out)
-            return Header.FromTrimmedData(outhex, 0)
+            out = self._db.get(DBPrefix.DATA_Header + hash)
+            if out is not None:
+                return Header.FromTrimmedData(out, 0)
         except TypeError as e2:
             pass
         except Exception as e:
@@ -482,7 +530,7 @@ class LevelDBBlockchain(Blockchain):
         if type(hash) is UInt256:
             hash = hash.ToBytes()
         try:
-            value = self._db.get(DBPrefix.DATA_Block + hash)[0:8]
+            value = self._db.get(DBPrefix.DATA_SysFee + hash)
             amount = int.from_bytes(value, 'little', signed=False)
             return amount
         except Exception as e:
@@ -490,6 +538,64 @@ class LevelDBBlockchain(Blockchain):
 
         return 0
 
+    def GetSysFeeAmountByHeight(self, height):
+        """
+        Get the system fee for the specified block.
+
+        Args:
+            height (int): block height.
+
+        Returns:
+            int: the cumulative system fee amount of the blocks up to this height.
+        """
+        if 0 <= height < len(self._sysfee_amounts):
+            return self._sysfee_amounts[height]
+        return super(LevelDBBlockchain, self).GetSysFeeAmountByHeight(height)
+
+    def _LoadSysFeeAmounts(self):
+        """
+        Load the system fee amounts from their snapshot if it matches the stored blocks, and get
+        the amounts of the blocks persisted after it from their `DATA_SysFee` records.
+        """
+        amounts = ReadSnapshot(self.SysFeeSnapshotPath, self.SYSFEE_SNAPSHOT_MAGIC, self._SysFeeAmountsFromSnapshot)
+
+        if amounts is not None:
+            height = len(amounts) - 1
+            if height > self._current_block_height or amounts[height] != self.GetSysFeeAmount(self.GetBlockHash(height)):
+                logger.info("Ignoring system fee snapshot not matching the stored blocks")
+                amounts = None
+            else:
+                self._snapshot_sysfee_height = height
+
+        if amounts is None:
+            amounts = array('Q')
+            if self._current_block_height > 0:
+                logger.info("Building the system fee index, this may take a while")
+
+        for height in range(len(amounts), self._current_block_height + 1):
+            amounts.append(self.GetSysFeeAmount(self.GetBlockHash(height)))
+
+        self._sysfee_amounts = amounts
+
+    @staticmethod
+    def _SysFeeAmountsFromSnapshot(content):
+        amounts = array('Q')
+        if len(content) == 0 or len(content) % amounts.itemsize:
+            return None
+        amounts.frombytes(content)
+        return amounts
+
+    def WriteSysFeeSnapshot(self):
+        """
+        Write a snapshot of the system fee amounts, loaded instead of reading every stored block
+        at startup.
+        """
+        try:
+            WriteSnapshot(self.SysFeeSnapshotPath, self.SYSFEE_SNAPSHOT_MAGIC, [self._sysfee_amounts])
+            self._snapshot_sysfee_height = len(self._sysfee_amounts) - 1
+        except OSError as e:
+            logger.info("Could not write system fee snapshot: %s " % e)
+
     def GetBlockByHeight(self, height):
         """
         Get a block by its height.
@@ -531,10 +637,13 @@ class LevelDBBlockchain(Blockchain):
 
     def GetBlockByHash(self, hash):
         try:
-            out = bytearray(self._db.get(DBPrefix.DATA_Block + hash))
-            out = out[8:]
-            outhex = binascii.unhexlify(out)
-            return Block.FromTrimmedData(outhex, 0)
+            header = self._db.get(DBPrefix.DATA_Header + hash)
+            if header is None:
+                return None
+
+            # a header stored before its block has no transaction hashes
+            hashes = self._db.get(DBPrefix.DATA_BlockTransactions + hash, b'\x00')
+            return Block.FromTrimmedData(header + hashes, 0)
         except Exception as e:
             logger.info("Could not get block %s " % e)
         return None
@@ -576,15 +685,15 @@ class LevelDBBlockchain(Blockchain):
         return True
 
     def ProcessNewHeaders(self, headers):
-        start = time.clock()
+        start = time.perf_counter()
 
         lastheader = headers[-1]
 
         hashes = [h.Hash.ToBytes() for h in headers]
 
-        self._header_index = self._header_index + hashes
+        self._header_index.extend(hashes)
 
-        logger.debug("Process Headers: %s %s" % (lastheader, (time.clock() - start)))
+        logger.debug("Process Headers: %s %s" % (lastheader, (time.perf_counter() - start)))
 
         if lastheader is not None:
             self.OnAddHeader(lastheader)
@@ -611,9 +720,47 @@ class LevelDBBlockchain(Blockchain):
             logger.debug("Trimming stored header index %s" % self._stored_header_count)
 
         with self._db.write_batch() as wb:
-            wb.put(DBPrefix.DATA_Block + hHash, bytes(8) + header.ToArray())
+            wb.put(DBPrefix.DATA_SysFee + hHash, bytes(8))
+            wb.put(DBPrefix.DATA_Header + hHash, SplitTrimmedBlock(binascii.unhexlify(header.ToArray()))[0])
             wb.put(DBPrefix.SYS_CurrentHeader, hHash + header.Index.to_bytes(4, 'little'))
 
+        if header.Index - self._snapshot_header_height >= self.HEADER_SNAPSHOT_INTERVAL:
+            self.WriteHeaderSnapshot()
+
+    def _LoadHeaderSnapshot(self, current_header_height):
+        """
+        Load the header index from the header snapshot, if it is complete and matches the stored
+        headers: the hash at its top height is of a stored header of that height, not above the
+        current header.
+
+        Args:
+            current_header_height (int): height of the stored current header.
+        """
+        index = HeaderIndex.LoadSnapshot(self.HeaderSnapshotPath)
+        if index is None:
+            return
+
+        height = len(index) - 1
+        header = self.GetHeader(index[height])
+        if index[0] != self._header_index[0] or height > current_header_height or \
+                header is None or header.Index != height:
+            logger.info("Ignoring header snapshot not matching the stored headers")
+            return
+
+        self._header_index = index
+        self._snapshot_header_height = height
+
+    def WriteHeaderSnapshot(self):
+        """
+        Write a snapshot of the header index, loaded instead of the stored header hash lists at
+        startup.
+        """
+        try:
+            self._header_index.WriteSnapshot(self.HeaderSnapshotPath)
+            self._snapshot_header_height = len(self._header_index) - 1
+        except OSError as e:
+            logger.info("Could not write header snapshot: %s " % e)
+
     @property
     def BlockCacheCount(self):
         return len(self._block_cache)
@@ -636,9 +783,15 @@ class LevelDBBlockchain(Blockchain):
 
         to_dispatch = []
 
-        with self._db.write_batch() as wb:
+        # everything the block changes goes into this one batch, which is only written when the
+        # block was processed completely, as a single atomic write
+        with self._db.write_batch(transaction=True) as wb:
 
-            wb.put(DBPrefix.DATA_Block + block.Hash.ToBytes(), amount_sysfee_bytes + block.Trim())
+            hash = block.Hash.ToBytes()
+            header, hashes = SplitTrimmedBlock(binascii.unhexlify(block.Trim()))
+            wb.put(DBPrefix.DATA_SysFee + hash, amount_sysfee_bytes)
+            wb.put(DBPrefix.DATA_Header + hash, header)
+            wb.put(DBPrefix.DATA_BlockTransactions + hash, hashes)
 
             for tx in block.Transactions:
 
@@ -785,11 +938,20 @@ class LevelDBBlockchain(Blockchain):
             sn.close()
 
             wb.put(DBPrefix.SYS_CurrentBlock, block.Hash.ToBytes() + block.IndexBytes())
-            self._current_block_height = block.Index
-            self._persisting_block = None
 
-            for event in to_dispatch:
-                events.emit(event.event_type, event)
+        # only once the batch is written, so neither the state in memory nor the dispatched events
+        # can get ahead of the database
+        self._current_block_height = block.Index
+        self._persisting_block = None
+
+        if block.Index == len(self._sysfee_amounts):
+            self._sysfee_amounts.append(amount_sysfee)
+
+        for event in to_dispatch:
+            events.emit(event.event_type, event)
+
+        if block.Index - self._snapshot_sysfee_height >= self.SYSFEE_SNAPSHOT_INTERVAL:
+            self.WriteSysFeeSnapshot()
 
     def PersistBlocks(self):
         #        logger.info("PERRRRRSISST:: Hheight, b height, cache: %s/%s %s  --%s %s" % (self.Height, self.HeaderHeight, len(self._block_cache), self.CurrentHeaderHash, self.BlockSearchTries))
@@ -817,5 +979,9 @@ class LevelDBBlockchain(Blockchain):
                 raise e
 
     def Dispose(self):
+        if len(self._header_index) - 1 > self._snapshot_header_height:
+            self.WriteHeaderSnapshot()
+        if len(self._sysfee_amounts) - 1 > self._snapshot_sysfee_height:
+            self.WriteSysFeeSnapshot()
         self._db.close()
         self._disposed = True
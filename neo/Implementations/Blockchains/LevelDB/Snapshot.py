@@ -0,0 +1,65 @@
+import os
+import mmap
+import zlib
+from struct import Struct
+
+# follows the content of a snapshot file: its length, its crc32 and the magic of its kind
+SNAPSHOT_TRAILER = Struct('<QI8s')
+
+
+def WriteSnapshot(path, magic, parts):
+    """
+    Write a snapshot file, replacing it once complete.
+
+    Args:
+        path (str): path of the snapshot file.
+        magic (bytes): 8 bytes identifying the kind of snapshot.
+        parts (list): of bytes-like objects, written one after the other.
+    """
+    length = 0
+    checksum = 0
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        for part in parts:
+            with memoryview(part) as view:
+                f.write(view)
+                length += view.nbytes
+                checksum = zlib.crc32(view.cast('B'), checksum)
+        f.write(SNAPSHOT_TRAILER.pack(length, checksum, magic))
+
+    os.replace(temp_path, path)
+
+
+def ReadSnapshot(path, magic, read):
+    """
+    Read a snapshot file through a memory map.
+
+    Args:
+        path (str): path of the snapshot file.
+        magic (bytes): 8 bytes identifying the kind of snapshot.
+        read (function): called with a memoryview of the content, valid only during the call.
+
+    Returns:
+        the result of `read`, None if there is no snapshot or it is not complete.
+    """
+    try:
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if len(mm) < SNAPSHOT_TRAILER.size:
+                    return None
+
+                length, checksum, found = SNAPSHOT_TRAILER.unpack_from(mm, len(mm) - SNAPSHOT_TRAILER.size)
+                if found != magic or length + SNAPSHOT_TRAILER.size != len(mm):
+                    return None
+
+                with memoryview(mm) as view:
+                    content = view[:length]
+                    try:
+                        if zlib.crc32(content) != checksum:
+                            return None
+                        return read(content)
+                    finally:
+                        content.release()
+    except (OSError, ValueError):
+        return None
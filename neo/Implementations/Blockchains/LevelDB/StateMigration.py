@@ -0,0 +1,160 @@
+import binascii
+
+from logzero import logger
+
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.TrimmedBlock import SplitTrimmedBlock
+
+# database version written before state records were stored as raw bytes
+HEX_STATE_VERSION = b'/NEO:2.0.1/'
+
+# database version written before blocks were split into header, system fee and transaction
+# hashes records
+BINARY_STATE_VERSION = b'/NEO:2.0.1/binary-state/'
+
+# prefixes holding state records serialized through `DBCollection`
+STATE_PREFIXES = [
+    DBPrefix.ST_Account,
+    DBPrefix.ST_Coin,
+    DBPrefix.ST_SpentCoin,
+    DBPrefix.ST_Validator,
+    DBPrefix.ST_Asset,
+    DBPrefix.ST_Contract,
+    DBPrefix.ST_Storage,
+]
+
+# last key converted by an interrupted migration
+MIGRATION_PROGRESS_KEY = DBPrefix.SYS_Version + b'migration'
+
+
+def NeedsMigration(version):
+    """
+    Check if a database with the given `SYS_Version` stores hex encoded state records.
+
+    Args:
+        version (bytes): the stored version, or None for an empty database.
+
+    Returns:
+        bool: True if the database has to be migrated.
+    """
+    return version == HEX_STATE_VERSION
+
+
+def NeedsBlockMigration(version):
+    """
+    Check if a database with the given `SYS_Version` stores blocks as `DATA_Block` records.
+
+    Args:
+        version (bytes): the stored version, or None for an empty database.
+
+    Returns:
+        bool: True if the blocks of the database have to be migrated.
+    """
+    return version in (HEX_STATE_VERSION, BINARY_STATE_VERSION)
+
+
+def MigrateHexStateToBinary(db, new_version, batch_size=10000):
+    """
+    Rewrite all hex encoded state records of a chain database as raw bytes, and set `SYS_Version`
+    to `new_version` once done.
+
+    Records are converted in write batches of `batch_size` keys. Every batch also stores the last
+    key it converted, so an interrupted migration continues where it stopped instead of decoding
+    the already converted records a second time.
+
+    Args:
+        db (plyvel.DB): opened chain database, not used by anything else while migrating.
+        new_version (bytes): version to record for the binary state format.
+        batch_size (int): number of records per write batch.
+
+    Returns:
+        int: number of converted records.
+    """
+    resume_after = db.get(MIGRATION_PROGRESS_KEY)
+    converted = 0
+
+    for prefix in STATE_PREFIXES:
+        if resume_after is not None and resume_after[:1] > prefix:
+            continue
+
+        start = resume_after if resume_after is not None and resume_after[:1] == prefix else None
+        pending = 0
+        wb = db.write_batch()
+
+        for key, value in db.iterator(prefix=prefix):
+            if start is not None and key <= start:
+                continue
+
+            wb.put(key, binascii.unhexlify(value))
+            wb.put(MIGRATION_PROGRESS_KEY, key)
+            pending += 1
+
+            if pending >= batch_size:
+                wb.write()
+                converted += pending
+                pending = 0
+                wb = db.write_batch()
+                logger.info("Migrated %s state records" % converted)
+
+        if pending:
+            wb.write()
+            converted += pending
+
+    with db.write_batch() as wb:
+        wb.delete(MIGRATION_PROGRESS_KEY)
+        wb.put(DBPrefix.SYS_Version, new_version)
+
+    logger.info("Migrated %s state records to binary encoding" % converted)
+
+    return converted
+
+
+def MigrateBlocks(db, new_version, batch_size=10000):
+    """
+    Split the `DATA_Block` records of a chain database, each a system fee amount and a hex encoded
+    trimmed block, into raw `DATA_SysFee`, `DATA_Header` and `DATA_BlockTransactions` records, and
+    set `SYS_Version` to `new_version` once done.
+
+    Records are converted in write batches of `batch_size` keys, which also delete the converted
+    `DATA_Block` records, so an interrupted migration continues with the records left.
+
+    Args:
+        db (plyvel.DB): opened chain database, not used by anything else while migrating.
+        new_version (bytes): version to record for the split block format.
+        batch_size (int): number of records per write batch.
+
+    Returns:
+        int: number of converted records.
+    """
+    converted = 0
+    pending = 0
+    wb = db.write_batch()
+
+    for key, value in db.iterator(prefix=DBPrefix.DATA_Block):
+        hash = key[len(DBPrefix.DATA_Block):]
+        header, hashes = SplitTrimmedBlock(binascii.unhexlify(value[8:]))
+
+        wb.put(DBPrefix.DATA_SysFee + hash, value[:8])
+        wb.put(DBPrefix.DATA_Header + hash, header)
+        # headers stored before their block have no transaction hashes
+        if hashes != b'\x00':
+            wb.put(DBPrefix.DATA_BlockTransactions + hash, hashes)
+        wb.delete(key)
+        pending += 1
+
+        if pending >= batch_size:
+            wb.write()
+            converted += pending
+            pending = 0
+            wb = db.write_batch()
+            logger.info("Migrated %s blocks" % converted)
+
+    if pending:
+        wb.write()
+        converted += pending
+
+    db.put(DBPrefix.SYS_Version, new_version)
+
+    logger.info("Migrated %s blocks to separate header, system fee and transaction hashes records" % converted)
+
+    return converted
@@ -0,0 +1,35 @@
+# size of the unsigned part of a block header, up to its witness: version, previous hash, merkle
+# root, timestamp, index, consensus data and next consensus, then the witness marker byte
+UNSIGNED_HEADER_SIZE = 105
+
+# sizes of the length of a var-bytes value, by its prefix byte
+VAR_INT_SIZES = {0xfd: 2, 0xfe: 4, 0xff: 8}
+
+
+def _VarBytesEnd(data, offset):
+    prefix = data[offset]
+    if prefix < 0xfd:
+        return offset + 1 + prefix
+
+    size = VAR_INT_SIZES[prefix]
+    length = int.from_bytes(data[offset + 1:offset + 1 + size], 'little')
+    return offset + 1 + size + length
+
+
+def SplitTrimmedBlock(data):
+    """
+    Split a trimmed block, as returned by `Block.Trim()`, into its header and its transaction
+    hashes, without deserializing it.
+
+    Args:
+        data (bytes): the raw trimmed block.
+
+    Returns:
+        tuple: the header, as read by `Header.FromTrimmedData`, and the transaction hashes, as
+        written by `BinaryWriter.WriteHashes`.
+    """
+    # the witness is an invocation script and a verification script
+    size = _VarBytesEnd(data, _VarBytesEnd(data, UNSIGNED_HEADER_SIZE))
+    if size > len(data):
+        raise ValueError('trimmed block is truncated')
+    return data[:size], data[size:]
@@ -0,0 +1,117 @@
+import shutil
+import tempfile
+
+import plyvel
+
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Core.State.StorageItem import StorageItem
+
+
+class DBCollectionTestCase(NeoTestCase):
+
+    def setUp(self):
+        self._path = tempfile.mkdtemp()
+        self._db = plyvel.DB(self._path, create_if_missing=True)
+
+    def tearDown(self):
+        self._db.close()
+        shutil.rmtree(self._path)
+
+    def _collection(self):
+        return DBCollection(self._db, self._db.snapshot(), DBPrefix.ST_Storage, StorageItem)
+
+    def test_changed_keys_keep_insertion_order(self):
+        storages = self._collection()
+        keys = [b'c', b'a', b'b', b'a', b'c']
+        for key in keys:
+            storages.GetAndChange(key, StorageItem(value=bytearray(key)))
+
+        self.assertEqual(list(storages.Changed), [b'c', b'a', b'b'])
+
+    def test_commit_and_remove(self):
+        storages = self._collection()
+        storages.Add(b'keep', StorageItem(value=bytearray(b'1')))
+        storages.Add(b'drop', StorageItem(value=bytearray(b'2')))
+        with self._db.write_batch() as wb:
+            storages.Commit(wb)
+
+        storages = self._collection()
+        self.assertEqual(storages.TryGet(b'drop').Value, b'2')
+        storages.Remove(b'drop')
+        storages.Remove(b'drop')
+        self.assertEqual(storages.Deleted, {b'drop'})
+        self.assertIsNone(storages.TryGet(b'drop'))
+        with self._db.write_batch() as wb:
+            storages.Commit(wb)
+
+        storages = self._collection()
+        self.assertEqual(storages.TryGet(b'keep').Value, b'1')
+        self.assertIsNone(storages.TryGet(b'drop'))
+
+    def test_get_or_add_undeletes(self):
+        storages = self._collection()
+        storages.Remove(b'key')
+        storages.GetOrAdd(b'key', StorageItem(value=bytearray(b'3')))
+
+        self.assertEqual(storages.Deleted, set())
+        self.assertEqual(storages.TryGet(b'key').Value, b'3')
+
+    def test_commit_writes_into_batch(self):
+        storages = self._collection()
+        storages.Add(b'key', StorageItem(value=bytearray(b'4')))
+        with self._db.write_batch() as wb:
+            storages.Commit(wb, destroy=False)
+            self.assertIsNone(self._db.get(DBPrefix.ST_Storage + b'key'))
+
+        self.assertIsNotNone(self._db.get(DBPrefix.ST_Storage + b'key'))
+
+    def test_deleted_item_stays_deleted_until_batch_is_written(self):
+        storages = self._collection()
+        storages.Add(b'key', StorageItem(value=bytearray(b'5')))
+        with self._db.write_batch() as wb:
+            storages.Commit(wb)
+
+        storages = self._collection()
+        storages.TryGet(b'key')
+        with self._db.write_batch() as wb:
+            storages.Remove(b'key')
+            storages.Commit(wb, destroy=False)
+            self.assertIsNone(storages.TryGet(b'key'))
+
+            storages.GetAndChange(b'key', StorageItem(value=bytearray(b'6')))
+            storages.Commit(wb, destroy=False)
+
+        self.assertEqual(self._collection().TryGet(b'key').Value, b'6')
+
+    def test_items_are_stored_as_raw_bytes(self):
+        storages = self._collection()
+        item = StorageItem(value=bytearray(b'7'))
+        storages.Add(b'key', item)
+        storages.Commit(None)
+
+        self.assertEqual(self._db.get(DBPrefix.ST_Storage + b'key'), item.ToBytes())
+        self.assertEqual(self._collection().TryGet(b'key').Value, b'7')
+
+    def test_find_sees_items_not_written_yet(self):
+        storages = self._collection()
+        storages.Add(b'kept', StorageItem(value=bytearray(b'1')))
+        storages.Add(b'kdrop', StorageItem(value=bytearray(b'2')))
+        storages.Add(b'other', StorageItem(value=bytearray(b'3')))
+        storages.Commit(None)
+
+        storages = self._collection()
+        with self._db.write_batch() as wb:
+            storages.Remove(b'kdrop')
+            storages.Add(b'knew', StorageItem(value=bytearray(b'4')))
+            storages.Commit(wb, destroy=False)
+            storages.Add(b'kpending', StorageItem(value=bytearray(b'5')))
+
+            found = storages.Find(b'k')
+            self.assertEqual([list(pair.keys())[0] for pair in found],
+                             [DBPrefix.ST_Storage + key for key in [b'kept', b'knew', b'kpending']])
+            self.assertEqual(StorageItem.DeserializeFromDB(list(found[1].values())[0]).Value, b'4')
+
+            storages.Remove(b'kpending')
+            self.assertEqual(len(storages.Find(b'k')), 2)
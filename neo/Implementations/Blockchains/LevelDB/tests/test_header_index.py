@@ -0,0 +1,160 @@
+import os
+import shutil
+import hashlib
+import binascii
+import tempfile
+
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.HeaderIndex import HeaderIndex
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.IO.MemoryStream import StreamManager
+from neocore.IO.BinaryWriter import BinaryWriter
+from neo.Core.Blockchain import Blockchain
+from neo.Core.Header import Header
+
+
+class HeaderIndexTestCase(NeoTestCase):
+
+    def setUp(self):
+        self._path = tempfile.mkdtemp()
+        self._blockchain = LevelDBBlockchain(self._path)
+
+    def tearDown(self):
+        self._blockchain.Dispose()
+        shutil.rmtree(self._path)
+
+    def new_headers(self, count):
+        genesis = Blockchain.GenesisBlock()
+        headers = []
+        prevhash = genesis.Hash
+        for index in range(1, count + 1):
+            header = Header(prevhash, genesis.MerkleRoot, genesis.Timestamp + index, index,
+                            genesis.ConsensusData, genesis.NextConsensus, genesis.Script)
+            headers.append(header)
+            prevhash = header.Hash
+        return headers
+
+    def assertIndexed(self, blockchain, headers):
+        self.assertEqual(blockchain.HeaderHeight, len(headers))
+
+        for header in headers:
+            hash = header.Hash.ToBytes()
+            self.assertEqual(blockchain._header_index.IndexOf(hash), header.Index)
+            self.assertEqual(blockchain.GetHeaderHash(header.Index), hash)
+
+    def test_add_headers(self):
+        headers = self.new_headers(2100)
+        self._blockchain.AddHeaders(headers[:1000])
+        self._blockchain.AddHeaders(headers[500:])
+        self._blockchain.AddHeader(headers[-1])
+
+        self.assertIndexed(self._blockchain, headers)
+        self.assertEqual(self._blockchain.GetHeaderBy(headers[-1].Hash.ToString()).Index, 2100)
+        self.assertIsNone(self._blockchain.GetHeaderBy('ab' * 32))
+
+        genesis = Blockchain.GenesisBlock().Hash.ToString()
+        self.assertEqual(self._blockchain.GetBlock(genesis).Index, 0)
+        self.assertEqual(self._blockchain.GetBlock('0x' + genesis).Index, 0)
+        self.assertIsNone(self._blockchain.GetBlock('ab' * 32))
+
+        # reloaded from the header snapshot written when disposed
+        self._blockchain.Dispose()
+        self._blockchain = LevelDBBlockchain(self._path)
+        self.assertIndexed(self._blockchain, headers)
+        self.assertEqual(self._blockchain._stored_header_count, 2000)
+
+        # or from the stored header hash lists, holding the first 2000 hashes
+        self._blockchain.Dispose()
+        with open(self._blockchain.HeaderSnapshotPath, 'r+b') as f:
+            f.write(b'corrupted')
+        self._blockchain = LevelDBBlockchain(self._path)
+        self.assertIndexed(self._blockchain, headers[:1999])
+
+    def test_header_snapshot(self):
+        headers = self.new_headers(2100)
+        self._blockchain.HEADER_SNAPSHOT_INTERVAL = 1000
+        self._blockchain.AddHeaders(headers[:1200])
+        self.assertEqual(self._blockchain._snapshot_header_height, 1200)
+
+        # the hashes after the snapshot come from the stored header hash lists
+        self._blockchain.AddHeaders(headers[1200:2100])
+        self._blockchain._db.close()
+        self._blockchain = LevelDBBlockchain(self._path)
+        self.assertEqual(self._blockchain._snapshot_header_height, 1200)
+        self.assertIndexed(self._blockchain, headers[:1999])
+
+        # ignored when the header of its top height is not stored
+        self._blockchain._db.delete(DBPrefix.DATA_Header + headers[1199].Hash.ToBytes())
+        self._blockchain._db.close()
+        self._blockchain = LevelDBBlockchain(self._path)
+        self.assertEqual(self._blockchain._snapshot_header_height, 0)
+        self.assertIndexed(self._blockchain, headers[:1999])
+
+    def test_sysfee_amounts(self):
+        headers = self.new_headers(10)
+        self._blockchain.AddHeaders(headers)
+
+        def store_blocks(amounts):
+            with self._blockchain._db.write_batch() as wb:
+                for header, amount in zip(headers, amounts):
+                    wb.put(DBPrefix.DATA_SysFee + header.Hash.ToBytes(), amount.to_bytes(8, 'little'))
+                wb.put(DBPrefix.SYS_CurrentBlock, headers[-1].Hash.ToBytes() + headers[-1].IndexBytes())
+
+        def reload():
+            self._blockchain.Dispose()
+            self._blockchain = LevelDBBlockchain(self._path)
+            return [self._blockchain.GetSysFeeAmountByHeight(height) for height in range(12)]
+
+        # read from the stored blocks
+        store_blocks([header.Index * 100 for header in headers])
+        self.assertEqual(reload(), [height * 100 for height in range(11)] + [0])
+
+        # then from the snapshot written when disposed
+        store_blocks([header.Index * 200 for header in headers[:9]])
+        self.assertEqual(reload(), [height * 100 for height in range(11)] + [0])
+        self.assertEqual(self._blockchain._snapshot_sysfee_height, 10)
+
+        # unless its top amount is not the stored one
+        store_blocks([header.Index * 200 for header in headers])
+        self.assertEqual(reload(), [height * 200 for height in range(11)] + [0])
+
+    def test_header_index(self):
+        hashes = [hashlib.sha256(bytes([i % 256, i // 256])).hexdigest().encode('utf-8') for i in range(3000)]
+        index = HeaderIndex()
+        index.append(hashes[0])
+        index.extend(hashes[1:2500])
+
+        # as written in IX_HeaderHashList records
+        ms = StreamManager.GetStream()
+        BinaryWriter(ms).Write2000256List(hashes[2500:])
+        index.ExtendRaw(binascii.unhexlify(ms.ToArray()))
+        StreamManager.ReleaseStream(ms)
+
+        self.assertEqual(len(index), 3000)
+        self.assertEqual(list(index), hashes)
+        self.assertEqual(index[-1], hashes[-1])
+        self.assertEqual(index[10:20], hashes[10:20])
+        self.assertEqual(index.GetRaw(5), binascii.unhexlify(hashes[5])[::-1])
+        with self.assertRaises(IndexError):
+            index[3000]
+
+        for height, hash in enumerate(hashes):
+            self.assertEqual(index.IndexOf(hash), height)
+        self.assertEqual(index.IndexOf(b'ab' * 32), -1)
+        self.assertEqual(index.IndexOf(b'not a hash'), -1)
+        self.assertNotIn(b'ab' * 32, index)
+        self.assertIn(hashes[2999], index)
+
+        with self.assertRaises(ValueError):
+            index.ExtendRaw(b'\x00' * 31)
+
+        path = self._path + '.snapshot'
+        self.assertIsNone(HeaderIndex.LoadSnapshot(path))
+        index.WriteSnapshot(path)
+        loaded = HeaderIndex.LoadSnapshot(path)
+        os.remove(path)
+        self.assertEqual(list(loaded), hashes)
+        self.assertEqual(loaded.IndexOf(hashes[1234]), 1234)
+        loaded.append(b'ab' * 32)
+        self.assertEqual(loaded.IndexOf(b'ab' * 32), 3000)
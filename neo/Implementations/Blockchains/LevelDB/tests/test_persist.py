@@ -0,0 +1,71 @@
+import shutil
+import tempfile
+
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Core.Blockchain import Blockchain
+from neo.Core.Block import Block
+
+
+class FailingWriteBatch():
+    """ A write batch failing to be written """
+
+    def __init__(self, wb):
+        self._wb = wb
+
+    def __getattr__(self, name):
+        return getattr(self._wb, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            raise IOError('write failed')
+
+
+class FailingDB():
+    """ A database whose transactional write batches fail """
+
+    def __init__(self, db):
+        self._db = db
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    def write_batch(self, transaction=False, **kwargs):
+        wb = self._db.write_batch(transaction=transaction, **kwargs)
+        return FailingWriteBatch(wb) if transaction else wb
+
+
+class PersistTestCase(NeoTestCase):
+
+    def setUp(self):
+        self._path = tempfile.mkdtemp()
+        self._blockchain = LevelDBBlockchain(self._path)
+
+    def tearDown(self):
+        self._blockchain.Dispose()
+        shutil.rmtree(self._path)
+
+    def test_failed_write_changes_nothing(self):
+        genesis = Blockchain.GenesisBlock()
+        block = Block(genesis.Hash, genesis.Timestamp + 1, 1, genesis.ConsensusData, genesis.NextConsensus,
+                      genesis.Script, [genesis.Transactions[0]], True)
+
+        db = self._blockchain._db
+        self._blockchain._db = FailingDB(db)
+        with self.assertRaises(IOError):
+            self._blockchain.Persist(block)
+        self._blockchain._db = db
+
+        self.assertEqual(self._blockchain.Height, 0)
+        self.assertEqual(len(self._blockchain._sysfee_amounts), 1)
+        self.assertIsNone(self._blockchain.GetHeader(block.Hash.ToBytes()))
+        self.assertEqual(db.get(DBPrefix.SYS_CurrentBlock)[-4:], bytes(4))
+
+        self._blockchain.Persist(block)
+        self.assertEqual(self._blockchain.Height, 1)
+        self.assertEqual(len(self._blockchain._sysfee_amounts), 2)
+        self.assertEqual(self._blockchain.GetHeader(block.Hash.ToBytes()).Index, 1)
@@ -0,0 +1,165 @@
+import shutil
+import binascii
+import tempfile
+
+import plyvel
+
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB import StateMigration
+from neo.Core.State.StorageItem import StorageItem
+from neo.Core.Blockchain import Blockchain
+from neo.Core.Block import Block
+from neo.Core.Header import Header
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+
+import migrate_chain
+
+
+class StateMigrationTestCase(NeoTestCase):
+
+    NEW_VERSION = b'/test/binary-state/'
+
+    def setUp(self):
+        self._path = tempfile.mkdtemp()
+        self._db = plyvel.DB(self._path, create_if_missing=True)
+
+        self._db.put(DBPrefix.SYS_Version, StateMigration.HEX_STATE_VERSION)
+        self._db.put(DBPrefix.DATA_Block + b'block', b'00ff')
+        for i in range(25):
+            item = StorageItem(value=bytearray([i]))
+            self._db.put(DBPrefix.ST_Storage + bytes([i]), item.ToByteArray())
+            self._db.put(DBPrefix.ST_Contract + bytes([i]), item.ToByteArray())
+
+    def tearDown(self):
+        self._db.close()
+        shutil.rmtree(self._path)
+
+    def assertMigrated(self):
+        self.assertEqual(self._db.get(DBPrefix.SYS_Version), self.NEW_VERSION)
+        self.assertIsNone(self._db.get(StateMigration.MIGRATION_PROGRESS_KEY))
+        self.assertEqual(self._db.get(DBPrefix.DATA_Block + b'block'), b'00ff')
+
+        for prefix in [DBPrefix.ST_Storage, DBPrefix.ST_Contract]:
+            items = DBCollection(self._db, None, prefix, StorageItem)
+            for i in range(25):
+                self.assertEqual(items.TryGet(bytes([i])).Value, bytearray([i]))
+
+    def test_needs_migration(self):
+        self.assertTrue(StateMigration.NeedsMigration(StateMigration.HEX_STATE_VERSION))
+        self.assertFalse(StateMigration.NeedsMigration(self.NEW_VERSION))
+        self.assertFalse(StateMigration.NeedsMigration(None))
+
+    def test_needs_block_migration(self):
+        self.assertTrue(StateMigration.NeedsBlockMigration(StateMigration.HEX_STATE_VERSION))
+        self.assertTrue(StateMigration.NeedsBlockMigration(StateMigration.BINARY_STATE_VERSION))
+        self.assertFalse(StateMigration.NeedsBlockMigration(self.NEW_VERSION))
+        self.assertFalse(StateMigration.NeedsBlockMigration(None))
+
+    def test_migrate_blocks(self):
+        self._db.delete(DBPrefix.DATA_Block + b'block')
+
+        # a persisted block and a header stored before its block
+        genesis = Blockchain.GenesisBlock()
+        header = Header(genesis.Hash, genesis.MerkleRoot, genesis.Timestamp + 1, 1,
+                        genesis.ConsensusData, genesis.NextConsensus, genesis.Script)
+        block_hash = genesis.Hash.ToBytes()
+        header_hash = header.Hash.ToBytes()
+        self._db.put(DBPrefix.DATA_Block + block_hash, (1234).to_bytes(8, 'little') + genesis.Trim())
+        self._db.put(DBPrefix.DATA_Block + header_hash, bytes(8) + header.ToArray())
+
+        converted = StateMigration.MigrateBlocks(self._db, self.NEW_VERSION, batch_size=1)
+
+        self.assertEqual(converted, 2)
+        self.assertEqual(self._db.get(DBPrefix.SYS_Version), self.NEW_VERSION)
+        self.assertEqual(list(self._db.iterator(prefix=DBPrefix.DATA_Block)), [])
+
+        self.assertEqual(self._db.get(DBPrefix.DATA_SysFee + block_hash), (1234).to_bytes(8, 'little'))
+        trimmed = self._db.get(DBPrefix.DATA_Header + block_hash) + self._db.get(DBPrefix.DATA_BlockTransactions + block_hash)
+        self.assertEqual(binascii.hexlify(trimmed), genesis.Trim())
+        block = Block.FromTrimmedData(trimmed, 0)
+        self.assertEqual(block.Hash, genesis.Hash)
+        self.assertEqual(block.Transactions, [tx.Hash.ToString() for tx in genesis.Transactions])
+
+        self.assertEqual(self._db.get(DBPrefix.DATA_SysFee + header_hash), bytes(8))
+        self.assertIsNone(self._db.get(DBPrefix.DATA_BlockTransactions + header_hash))
+        self.assertEqual(Header.FromTrimmedData(self._db.get(DBPrefix.DATA_Header + header_hash), 0).Hash, header.Hash)
+
+    def test_migrate(self):
+        converted = StateMigration.MigrateHexStateToBinary(self._db, self.NEW_VERSION, batch_size=10)
+
+        self.assertEqual(converted, 50)
+        self.assertMigrated()
+
+    def test_resume_interrupted_migration(self):
+        # as if a run stopped after converting all contracts and the first 5 storage records
+        for i in range(25):
+            self._db.put(DBPrefix.ST_Contract + bytes([i]), StorageItem(value=bytearray([i])).ToBytes())
+        for i in range(5):
+            self._db.put(DBPrefix.ST_Storage + bytes([i]), StorageItem(value=bytearray([i])).ToBytes())
+        self._db.put(StateMigration.MIGRATION_PROGRESS_KEY, DBPrefix.ST_Storage + bytes([4]))
+
+        converted = StateMigration.MigrateHexStateToBinary(self._db, self.NEW_VERSION, batch_size=10)
+
+        self.assertEqual(converted, 20)
+        self.assertMigrated()
+
+
+class MigrateChainTestCase(NeoTestCase):
+
+    def setUp(self):
+        self._path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._path)
+
+    def write_hex_state_chain(self):
+        # a chain with the genesis block, written as before both migrations
+        LevelDBBlockchain(self._path).Dispose()
+
+        db = plyvel.DB(self._path)
+        with db.write_batch() as wb:
+            for prefix in StateMigration.STATE_PREFIXES:
+                for key, value in db.iterator(prefix=prefix):
+                    wb.put(key, binascii.hexlify(value))
+
+            for key, header in db.iterator(prefix=DBPrefix.DATA_Header):
+                hash = key[1:]
+                trimmed = header + db.get(DBPrefix.DATA_BlockTransactions + hash, b'\x00')
+                wb.put(DBPrefix.DATA_Block + hash, db.get(DBPrefix.DATA_SysFee + hash) + binascii.hexlify(trimmed))
+                for prefix in [DBPrefix.DATA_Header, DBPrefix.DATA_SysFee, DBPrefix.DATA_BlockTransactions]:
+                    wb.delete(prefix + hash)
+
+            wb.put(DBPrefix.SYS_Version, StateMigration.HEX_STATE_VERSION)
+        db.close()
+
+    def test_migrate_hex_state_chain(self):
+        self.write_hex_state_chain()
+
+        self.assertEqual(migrate_chain.main(self._path, 10), 0)
+
+        blockchain = LevelDBBlockchain(self._path)
+        try:
+            self.assertEqual(blockchain._db.get(DBPrefix.SYS_Version), LevelDBBlockchain._sysversion)
+            self.assertEqual(list(blockchain._db.iterator(prefix=DBPrefix.DATA_Block)), [])
+
+            genesis = Blockchain.GenesisBlock()
+            self.assertEqual(blockchain.GetBlock('0').Hash, genesis.Hash)
+            self.assertEqual(blockchain.GetHeader(genesis.Hash.ToBytes()).Hash, genesis.Hash)
+            self.assertEqual(blockchain.GetSysFeeAmount(genesis.Hash), 0)
+
+            asset = blockchain.GetAssetState(Blockchain.SystemShare().Hash.ToBytes())
+            self.assertEqual(asset.AssetId, Blockchain.SystemShare().Hash)
+        finally:
+            blockchain.Dispose()
+
+        # and is already migrated
+        self.assertEqual(migrate_chain.main(self._path, 10), 0)
+
+    def test_unknown_version(self):
+        db = plyvel.DB(self._path, create_if_missing=True)
+        db.put(DBPrefix.SYS_Version, b'/unknown/')
+        db.close()
+
+        self.assertEqual(migrate_chain.main(self._path, 10), 1)
@@ -51,6 +51,12 @@ class Coin(ModelBase):
     State = IntegerField()
     Address = ForeignKeyField(Address)
 
+    class Meta:
+        # coins are looked up, updated and deleted by reference
+        indexes = (
+            (('TxId', 'Index'), False),
+        )
+
 
 class Contract(ModelBase):
     Id = PrimaryKeyField()
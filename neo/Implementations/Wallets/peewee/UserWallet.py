@@ -1,5 +1,7 @@
 #!/usr/bin/env python
 import binascii
+import operator
+from functools import reduce
 
 from logzero import logger
 from playhouse.migrate import SqliteMigrator, BooleanField, migrate
@@ -27,6 +29,16 @@ from neo.Implementations.Wallets.peewee.Models import Account, Address, Coin, \
 import json
 
 
+# rows / conditions per bulk statement, keeps below the SQLite limits on variables and expression depth
+BULK_CHUNK_SIZE = 100
+
+
+def chunks(items, size=BULK_CHUNK_SIZE):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
 class UserWallet(Wallet):
     Version = None
 
@@ -90,6 +102,8 @@ class UserWallet(Wallet):
         try:
             self._db.create_tables([Account, Address, Coin, Contract, Key, NEP5Token, VINHold,
                                     Transaction, TransactionInfo, NamedAddress], safe=True)
+            # the coin table of wallets created before its index existed is not recreated
+            self._db.execute_sql('CREATE INDEX IF NOT EXISTS "coin_TxId_Index" ON "coin" ("TxId", "Index")')
         except Exception as e:
             logger.error("Could not build database %s " % e)
 
@@ -106,10 +120,9 @@ class UserWallet(Wallet):
     def Rebuild(self):
         super(UserWallet, self).Rebuild()
 
-        for c in Coin.select():
-            c.delete_instance()
-        for tx in Transaction.select():
-            tx.delete_instance()
+        with self._db.atomic():
+            Coin.delete().execute()
+            Transaction.delete().execute()
 
         logger.debug("wallet rebuild: deleted coins and transactions %s %s " %
                      (Coin.select().count(), Transaction.select().count()))
@@ -361,83 +374,131 @@ class UserWallet(Wallet):
 
         k.save()
 
+    def ProcessBlocks(self, block_limit=1000):
+        # one transaction per batch of blocks, SQLite would otherwise commit (and sync) every statement
+        with self._db.atomic():
+            super(UserWallet, self).ProcessBlocks(block_limit)
+
     def OnProcessNewBlock(self, block, added, changed, deleted):
-        for tx in block.FullTransactions:
+        wallet_txs = [tx for tx in block.FullTransactions if self.IsWalletTransaction(tx)]
+
+        if wallet_txs:
+            hashes = [tx.Hash.ToBytes() for tx in wallet_txs]
+            existing = set()
+            for hashes_chunk in chunks(hashes):
+                for db_tx in Transaction.select(Transaction.Hash).where(Transaction.Hash << hashes_chunk):
+                    # hex hashes, read back as str or bytes depending on the peewee version
+                    existing.add(db_tx.Hash if type(db_tx.Hash) is bytes else db_tx.Hash.encode('utf-8'))
 
-            if self.IsWalletTransaction(tx):
-                db_tx = None
-                try:
-                    db_tx = Transaction.get(Hash=tx.Hash.ToBytes())
-                except Exception as e:
-                    pass
+            for hashes_chunk in chunks(existing):
+                Transaction.update(Height=block.Index).where(Transaction.Hash << hashes_chunk).execute()
+
+            rows = []
+            for tx, hash in zip(wallet_txs, hashes):
+                if hash in existing:
+                    continue
+                existing.add(hash)
 
                 ttype = tx.Type
                 if type(ttype) is bytes:
                     ttype = int.from_bytes(tx.Type, 'little')
 
-                if not db_tx:
-                    db_tx = Transaction.create(
-                        Hash=tx.Hash.ToBytes(),
-                        TransactionType=ttype,
-                        RawData=tx.ToArray(),
-                        Height=block.Index,
-                        DateTime=block.Timestamp
-                    )
-                else:
-                    db_tx.Height = block.Index
+                rows.append({
+                    'Hash': hash,
+                    'TransactionType': ttype,
+                    'RawData': tx.ToArray(),
+                    'Height': block.Index,
+                    'DateTime': block.Timestamp
+                })
 
-                db_tx.save()
+            for rows_chunk in chunks(rows):
+                Transaction.insert_many(rows_chunk).execute()
 
         self.OnCoinsChanged(added, changed, deleted)
 
     def OnSaveTransaction(self, tx, added, changed, deleted):
         self.OnCoinsChanged(added, changed, deleted)
 
-    def OnCoinsChanged(self, added, changed, deleted):
-
-        for coin in added:
-            addr_hash = bytes(coin.Output.ScriptHash.Data)
-
-            try:
-                address = Address.get(ScriptHash=addr_hash)
-
-                c = Coin(
-                    TxId=bytes(coin.Reference.PrevHash.Data),
-                    Index=coin.Reference.PrevIndex,
-                    AssetId=bytes(coin.Output.AssetId.Data),
-                    Value=coin.Output.Value.value,
-                    ScriptHash=bytes(coin.Output.ScriptHash.Data),
-                    State=coin.State,
-                    Address=address
-                )
-                c.save()
-                logger.debug("saved coin %s " % c)
-            except Exception as e:
-                logger.error("COULDN'T SAVE!!!! %s " % e)
+    @staticmethod
+    def _CoinsWhere(coins):
+        """ Get the condition matching the database rows of `coins` """
+        return reduce(operator.or_, [(Coin.TxId == bytes(coin.Reference.PrevHash.Data)) & (Coin.Index == coin.Reference.PrevIndex)
+                                     for coin in coins])
+
+    def _DeleteCoins(self, coins):
+        """ Delete the database rows of `coins`, returns the number of rows deleted """
+        count = 0
+        for coins_chunk in chunks(coins):
+            count += Coin.delete().where(self._CoinsWhere(coins_chunk)).execute()
+        return count
 
-        for coin in changed:
-            for hold in self._holds:
-                if hold.Reference == coin.Reference and coin.State & CoinState.Spent > 0:
-                    hold.IsComplete = True
-                    hold.save()
-            try:
-                c = Coin.get(TxId=bytes(coin.Reference.PrevHash.Data), Index=coin.Reference.PrevIndex)
-                c.State = coin.State
-                c.save()
-            except Exception as e:
-                logger.error("Coulndn't change coin %s %s (coin to change not found)" % (coin, e))
+    def OnCoinsChanged(self, added, changed, deleted):
+        with self._db.atomic():
+            self._OnCoinsChanged(added, changed, deleted)
 
-        for coin in deleted:
+    def _OnCoinsChanged(self, added, changed, deleted):
+        holds = {}
+        if (changed or deleted) and self._holds:
             for hold in self._holds:
-                if hold.Reference == coin.Reference:
+                holds.setdefault(hold.Reference, []).append(hold)
+
+        if added:
+            # the coins of a block belong to a few wallet addresses
+            addresses = {}
+            rows = []
+            for coin in added:
+                addr_hash = bytes(coin.Output.ScriptHash.Data)
+                if addr_hash not in addresses:
+                    try:
+                        addresses[addr_hash] = Address.get(ScriptHash=addr_hash)
+                    except Exception as e:
+                        logger.error("COULDN'T SAVE!!!! %s " % e)
+                        addresses[addr_hash] = None
+
+                address = addresses[addr_hash]
+                if address is None:
+                    continue
+
+                rows.append({
+                    'TxId': bytes(coin.Reference.PrevHash.Data),
+                    'Index': coin.Reference.PrevIndex,
+                    'AssetId': bytes(coin.Output.AssetId.Data),
+                    'Value': coin.Output.Value.value,
+                    'ScriptHash': addr_hash,
+                    'State': coin.State,
+                    'Address': address.Id
+                })
+
+            for rows_chunk in chunks(rows):
+                Coin.insert_many(rows_chunk).execute()
+
+        if changed:
+            by_state = {}
+            for coin in changed:
+                for hold in holds.get(coin.Reference, []):
+                    if coin.State & CoinState.Spent > 0:
+                        hold.IsComplete = True
+                        hold.save()
+
+                by_state.setdefault(coin.State, []).append(coin)
+
+            count = 0
+            for state, coins in by_state.items():
+                for coins_chunk in chunks(coins):
+                    count += Coin.update(State=state).where(self._CoinsWhere(coins_chunk)).execute()
+
+            if count < len(changed):
+                logger.error("Coulndn't change %s of %s coins (coins to change not found)" % (len(changed) - count, len(changed)))
+
+        if deleted:
+            for coin in deleted:
+                for hold in holds.get(coin.Reference, []):
                     hold.IsComplete = True
                     hold.save()
-            try:
-                c = Coin.get(TxId=bytes(coin.Reference.PrevHash.Data), Index=coin.Reference.PrevIndex)
-                c.delete_instance()
 
-            except Exception as e:
-                logger.error("could not delete coin %s %s " % (coin, e))
+            count = self._DeleteCoins(deleted)
+            if count < len(deleted):
+                logger.error("could not delete %s of %s coins" % (len(deleted) - count, len(deleted)))
 
     @property
     def Addresses(self):
@@ -488,12 +549,12 @@ class UserWallet(Wallet):
     def DeleteAddress(self, script_hash):
         success, coins_toremove = super(UserWallet, self).DeleteAddress(script_hash)
 
-        for coin in coins_toremove:
+        if coins_toremove:
             try:
-                c = Coin.get(TxId=bytes(coin.Reference.PrevHash.Data), Index=coin.Reference.PrevIndex)
-                c.delete_instance()
+                with self._db.atomic():
+                    self._DeleteCoins(coins_toremove)
             except Exception as e:
-                logger.error("Could not delete coin %s %s " % (coin, e))
+                logger.error("Could not delete coins %s " % e)
 
         todelete = bytes(script_hash.ToArray())
 
@@ -0,0 +1,43 @@
+import os
+import shutil
+import tempfile
+
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Wallets.peewee.UserWallet import UserWallet
+
+
+class BuildDatabaseTestCase(NeoTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'wallet.db3')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def build(self):
+        wallet = UserWallet.__new__(UserWallet)
+        wallet._path = self.path
+        wallet.BuildDatabase()
+        return wallet
+
+    def coin_indexes(self, wallet):
+        cursor = wallet.DB().execute_sql("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'coin'")
+        return [row[0] for row in cursor.fetchall() if not row[0].startswith('sqlite_autoindex')]
+
+    def test_reference_index_created(self):
+        wallet = self.build()
+        self.assertIn('coin_TxId_Index', self.coin_indexes(wallet))
+        wallet.Close()
+
+    def test_reference_index_added_to_existing_wallet(self):
+        wallet = self.build()
+        wallet.DB().execute_sql('DROP INDEX "coin_TxId_Index"')
+        wallet.Close()
+
+        wallet = self.build()
+        indexes = self.coin_indexes(wallet)
+        wallet.Close()
+
+        self.assertIn('coin_TxId_Index', indexes)
+        self.assertEqual(len([name for name in indexes if 'TxId' in name]), 1)
@@ -1,4 +1,5 @@
 import ctypes
+import struct
 from neocore.IO.Mixins import SerializableMixin
 from neo.Settings import settings
 from neo.Core.Helper import Helper
@@ -13,6 +14,10 @@ class Message(SerializableMixin):
     PayloadMaxSize = b'\x02000000'
     PayloadMaxSizeInt = int.from_bytes(PayloadMaxSize, 'big')
 
+    # magic, command, payload length, checksum
+    HeaderSize = 24
+    HeaderFormat = struct.Struct('<I12sII')
+
     Magic = None
 
     Command = None
@@ -73,11 +78,50 @@ class Message(SerializableMixin):
         self.Checksum = reader.ReadUInt32()
         self.Payload = reader.ReadBytes(self.Length)
 
-        checksum = Message.GetChecksum(self.Payload)
+        self.VerifyChecksum()
+
+    def DeserializeFromBuffer(self, buffer):
+        """
+        Deserialize full object from a buffer holding exactly one message, without going through a stream.
+
+        Args:
+            buffer (bytes, bytearray, memoryview): the message. Only the payload is copied out of it.
+        """
+        self.Magic, command, self.Length, self.Checksum = self.HeaderFormat.unpack_from(buffer)
+        self.Command = command.rstrip(b'\x00').decode('utf-8')
+
+        if self.Length > self.PayloadMaxSizeInt:
+            raise Exception("invalid format- payload too large")
+
+        if len(buffer) < self.HeaderSize + self.Length:
+            raise Exception("invalid format- message shorter than its payload length")
+
+        self.Payload = bytes(buffer[self.HeaderSize:self.HeaderSize + self.Length])
 
-        if checksum != self.Checksum:
+        self.VerifyChecksum()
+
+    def VerifyChecksum(self):
+        """
+        Raises:
+            ChecksumException: if the checksum doesn't match the payload.
+        """
+        if Message.GetChecksum(self.Payload) != self.Checksum:
             raise ChecksumException("checksum mismatch")
 
+    @staticmethod
+    def PeekPayloadLength(buffer, offset=0):
+        """
+        Get the payload length from the header of a message in a buffer.
+
+        Args:
+            buffer (bytes, bytearray, memoryview): holds at least `HeaderSize` bytes from `offset` on.
+            offset (int): position of the message in the buffer.
+
+        Returns:
+            int: the payload length.
+        """
+        return struct.unpack_from('<I', buffer, offset + 16)[0]
+
     @staticmethod
     def GetChecksum(value):
         """
@@ -1,12 +1,11 @@
 import binascii
 import random
+from collections import deque
 from logzero import logger
 from twisted.internet.protocol import Protocol
 from twisted.internet import reactor
 from neo.Core.Blockchain import Blockchain as BC
-from neocore.IO.BinaryReader import BinaryReader
 from neo.Network.Message import Message
-from neo.IO.MemoryStream import StreamManager
 from neo.IO.Helper import Helper as IOHelper
 from neo.Core.Helper import Helper
 from .Payloads.GetBlocksPayload import GetBlocksPayload
@@ -34,6 +33,8 @@ class NeoNode(Protocol):
         self.remote_nodeid = random.randint(1294967200, 4294967200)
         self.endpoint = ''
         self.buffer_in = bytearray()
+        self.messages_in = deque()
+        self.processing_messages = False
         self.myblockrequests = set()
         self.bytes_in = 0
         self.bytes_out = 0
@@ -111,72 +112,64 @@ class NeoNode(Protocol):
     def dataReceived(self, data):
         """ Called from Twisted whenever data is received. """
         self.bytes_in += (len(data))
-        self.buffer_in = self.buffer_in + data
+        self.buffer_in.extend(data)
         self.CheckDataReceived()
 
     def CheckDataReceived(self):
-        """Tries to extract a Message from the data buffer and process it."""
-        currentLength = len(self.buffer_in)
-        if currentLength < 24:
-            return
+        """
+        Extract all complete Messages from the data buffer and process them.
 
-        # Extract the message header from the buffer, and return if not enough
-        # buffer to fully deserialize the message object.
-        try:
-            # Construct message
-            mstart = self.buffer_in[:24]
-            ms = StreamManager.GetStream(mstart)
-            reader = BinaryReader(ms)
-            m = Message()
-
-            # Extract message metadata
-            m.Magic = reader.ReadUInt32()
-            m.Command = reader.ReadFixedString(12).decode('utf-8')
-            m.Length = reader.ReadUInt32()
-            m.Checksum = reader.ReadUInt32()
-
-            # Return if not enough buffer to fully deserialize object.
-            messageExpectedLength = 24 + m.Length
-            # percentcomplete = int(100 * (currentLength / messageExpectedLength))
-            # self.Log("Receiving %s data: %s percent complete" % (m.Command, percentcomplete))
-            if currentLength < messageExpectedLength:
-                return
-
-        except Exception as e:
-            self.Log('Error: Could not read initial bytes %s ' % e)
+        Messages are read in place through a memoryview, and the consumed bytes are only removed
+        from the front of the buffer once all complete messages were read. The view is released
+        before the messages are processed, so handlers may add data to the buffer. Messages read
+        while processing are queued behind the ones already read.
+        """
+        buffer = self.buffer_in
+        offset = 0
+
+        with memoryview(buffer) as view:
+            while len(buffer) - offset >= Message.HeaderSize:
+                payloadLength = Message.PeekPayloadLength(view, offset)
+                if payloadLength > Message.PayloadMaxSizeInt:
+                    self.Log("Error: Message payload of %s bytes is too large, disconnecting" % payloadLength)
+                    offset = len(buffer)
+                    self.Disconnect()
+                    break
+
+                # Stop if not enough buffer to fully deserialize the message
+                messageExpectedLength = Message.HeaderSize + payloadLength
+                if len(buffer) - offset < messageExpectedLength:
+                    break
+
+                try:
+                    with view[offset:offset + messageExpectedLength] as mdata:
+                        message = Message()
+                        message.DeserializeFromBuffer(mdata)
+                    self.messages_in.append(message)
+
+                except Exception as e:
+                    self.Log('Error: Could not extract message: %s ' % e)
+
+                finally:
+                    offset += messageExpectedLength
+
+        if offset:
+            del buffer[:offset]
+
+        if self.processing_messages:
             return
 
-        finally:
-            StreamManager.ReleaseStream(ms)
-            del reader
-
-        # The message header was successfully extracted, and we have enough enough buffer
-        # to extract the full payload
+        self.processing_messages = True
         try:
-            # Extract message bytes from buffer and truncate buffer
-            mdata = self.buffer_in[:messageExpectedLength]
-            self.buffer_in = self.buffer_in[messageExpectedLength:]
-
-            # Deserialize message with payload
-            stream = StreamManager.GetStream(mdata)
-            reader = BinaryReader(stream)
-            message = Message()
-            message.Deserialize(reader)
-
-            # Propagate new message
-            self.MessageReceived(message)
-
-        except Exception as e:
-            self.Log('Error: Could not extract message: %s ' % e)
-            return
+            while self.messages_in:
+                try:
+                    # Propagate new message
+                    self.MessageReceived(self.messages_in.popleft())
 
+                except Exception as e:
+                    self.Log('Error: Could not process message: %s ' % e)
         finally:
-            StreamManager.ReleaseStream(stream)
-
-        # Finally, after a message has been fully deserialized and propagated,
-        # check if another message can be extracted with the current buffer:
-        if len(self.buffer_in) >= 24:
-            self.CheckDataReceived()
+            self.processing_messages = False
 
     def MessageReceived(self, m):
         """
@@ -358,7 +351,8 @@ class NeoNode(Protocol):
         if blockhash in self.myblockrequests:
             self.myblockrequests.remove(blockhash)
 
-        self.leader.InventoryReceived(block)
+        d = self.leader.InventoryReceived(block)
+        d.addErrback(lambda failure: self.Log("Could not add block %s: %s" % (blockhash, failure.getErrorMessage())))
 
         if len(self.myblockrequests) < self.leader.NREQMAX:
             self.DoAskForMoreBlocks()
@@ -1,4 +1,5 @@
 import random
+from collections import deque
 from logzero import logger
 from neo.Core.Block import Block
 from neo.Core.Blockchain import Blockchain as BC
@@ -6,10 +7,11 @@ from neo.Implementations.Blockchains.LevelDB.TestLevelDBBlockchain import TestLe
 from neo.Core.TX.Transaction import Transaction
 from neo.Core.TX.MinerTransaction import MinerTransaction
 from neo.Network.NeoNode import NeoNode
+from neo.Network.SignatureVerifier import SignatureVerifier
 from neo.Settings import settings
 from twisted.internet.protocol import Factory
 from twisted.application.internet import ClientService
-from twisted.internet import reactor, task
+from twisted.internet import reactor, task, defer
 from twisted.internet.endpoints import clientFromString
 from twisted.application.internet import backoffPolicy
 
@@ -37,6 +39,9 @@ class NodeLeader():
     MemPool = {}
     RelayCache = {}
 
+    # inventories waiting for their signatures to be verified, in the order they were received
+    _verifying = None
+
     @staticmethod
     def Instance():
         """
@@ -67,6 +72,7 @@ class NodeLeader():
         self.UnconnectedPeers = []
         self.ADDRS = []
         self.NodeId = random.randint(1294967200, 4294967200)
+        self._verifying = deque()
 
     def Restart(self):
         if len(self.Peers) == 0:
@@ -107,6 +113,8 @@ class NodeLeader():
         for p in self.Peers:
             p.Disconnect()
 
+        SignatureVerifier.Default().Shutdown()
+
     def AddConnectedPeer(self, peer):
         """
         Add a new connect peer to the known peers list.
@@ -147,27 +155,24 @@ class NodeLeader():
             inventory (neo.Network.Inventory): expect a Block type.
 
         Returns:
-            bool: True if processed and verified. False otherwise.
+            Deferred: firing with True if processed and verified. False otherwise.
         """
         if inventory.Hash.ToBytes() in self._MissedBlocks:
             self._MissedBlocks.remove(inventory.Hash.ToBytes())
 
         if inventory is MinerTransaction:
-            return False
+            return defer.succeed(False)
 
         if type(inventory) is Block:
             if BC.Default() is None:
-                return False
+                return defer.succeed(False)
 
             if BC.Default().ContainsBlock(inventory.Index):
-                return False
+                return defer.succeed(False)
 
-            if not BC.Default().AddBlock(inventory):
-                return False
+            return self.AddBlockDeferred(inventory)
 
-        else:
-            if not inventory.Verify():
-                return False
+        return self._VerifyInOrder([inventory], inventory.Verify)
 
     def RelayDirectly(self, inventory):
         """
@@ -253,3 +258,76 @@ class NodeLeader():
         self.MemPool[tx.Hash.ToBytes()] = tx
 
         return True
+
+    def AddTransactionDeferred(self, tx):
+        """
+        Add a transaction to the memory pool, with its signatures verified on the worker processes
+        of the `SignatureVerifier` first.
+
+        Args:
+            tx (neo.Core.TX.Transaction): instance.
+
+        Returns:
+            Deferred: firing with True if successfully added. False otherwise.
+        """
+        return self._VerifyInOrder([tx], lambda: self.AddTransaction(tx))
+
+    def AddBlockDeferred(self, block):
+        """
+        Add a block to the chain, with the signatures of the block verified on the worker
+        processes of the `SignatureVerifier` first, if the chain verifies it.
+
+        `AddBlock` only verifies blocks when `VerifyBlocks` is set, and only blocks it does not
+        have the header of yet, and `Block.Verify` does not check the witnesses of transactions.
+        Nothing else is sent to the workers, and the block is added right away if it is not
+        waiting for blocks or transactions received before it.
+
+        Args:
+            block (neo.Core.Block): instance.
+
+        Returns:
+            Deferred: firing with True if successfully added. False otherwise.
+        """
+        chain = BC.Default()
+        verifiables = []
+        if chain is not None and chain.VerifyBlocks and block.Index == chain.HeaderHeight + 1:
+            verifiables = [block]
+
+        return self._VerifyInOrder(verifiables, lambda: BC.Default() is not None and BC.Default().AddBlock(block))
+
+    def _VerifyInOrder(self, verifiables, add):
+        """
+        Verify the signatures of `verifiables` on the worker processes of the `SignatureVerifier`,
+        then call `add`, which does all the checks and hits the cache for the signatures verified.
+
+        `add` is called in the order of the calls to this method, whatever order the workers
+        finish in, so blocks and transactions are added as received. With nothing to verify, `add`
+        is called right away, unless earlier calls are still waiting.
+
+        Args:
+            verifiables (list): of neo.Core.Mixins.VerifiableMixin, transactions or blocks.
+            add (function): adding the verifiables, returning True if successfully added.
+
+        Returns:
+            Deferred: firing with the result of `add`.
+        """
+        entry = [False, add, defer.Deferred()]
+        self._verifying.append(entry)
+
+        def verified(result):
+            # failures of the pool are verified again by `add`
+            entry[0] = True
+            while self._verifying and self._verifying[0][0]:
+                done, add, d = self._verifying.popleft()
+                try:
+                    added = add()
+                except Exception:
+                    d.errback()
+                else:
+                    d.callback(added)
+
+        if verifiables:
+            defer.maybeDeferred(SignatureVerifier.Default().Verify, verifiables).addBoth(verified)
+        else:
+            verified(True)
+        return entry[2]
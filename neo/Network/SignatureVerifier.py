@@ -0,0 +1,180 @@
+import os
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from logzero import logger
+from twisted.internet import defer, reactor
+
+from neo.Core.VerificationCache import VerificationCache, IsPureScript, VerifySingleSignature
+from neo.SmartContract.ApplicationEngine import ApplicationEngine
+from neo.SmartContract.StateReader import StateReader
+from neo.SmartContract import TriggerType
+from neocore.Fixed8 import Fixed8
+
+
+class SignedMessage():
+    """ Script container of a witness verified in a worker process, only providing the signed message """
+    Hash = None
+
+    def __init__(self, message):
+        self.message = message
+
+    def GetMessage(self):
+        return self.message
+
+
+def VerifyWitness(message, verification, invocation):
+    """
+    Verify a pure witness (see `IsPureScript`), run in the worker processes.
+
+    Standard single signature witnesses are checked with `Crypto.VerifySignature` directly,
+    other ones run in the VM, without emitting any event.
+
+    Args:
+        message (bytes): the signed message.
+        verification (bytes): the verification script.
+        invocation (bytes): the invocation script.
+
+    Returns:
+        bool: True if the witness is valid. False otherwise.
+    """
+    result = VerifySingleSignature(message, verification, invocation)
+    if result is not None:
+        return result
+
+    engine = ApplicationEngine(TriggerType.Verification, SignedMessage(message), None, StateReader(), Fixed8.Zero())
+    engine.LoadScript(verification, False)
+    engine.LoadScript(invocation, True)
+
+    try:
+        engine.Execute()
+    except Exception as e:
+        logger.error("Could not verify witness: %s " % e)
+
+    return engine.EvaluationStack.Count == 1 and engine.EvaluationStack.Pop().GetBoolean()
+
+
+class SignatureVerifier():
+    """
+    Verifies the signatures of transactions and blocks on a pool of worker processes.
+
+    The pure witnesses of the verifiables (standard single and multi signature ones, see
+    `IsPureScript`) are verified in parallel and their results stored in the `VerificationCache`,
+    so the `Verify()` of the transactions and blocks that follows on the reactor thread only
+    has to check the witnesses depending on the chain state.
+    """
+    max_workers = None
+
+    _default = None
+
+    def __init__(self, max_workers=None, cache=None):
+        """
+        Create an instance.
+
+        Args:
+            max_workers (int): number of worker processes, the CPU count by default.
+            cache (VerificationCache): where results are stored, the default cache by default.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._cache = cache or VerificationCache.Default()
+        self._executor = None
+
+    @staticmethod
+    def Default():
+        """
+        Get the verifier shared by the node.
+
+        Returns:
+            SignatureVerifier:
+        """
+        if SignatureVerifier._default is None:
+            SignatureVerifier._default = SignatureVerifier()
+        return SignatureVerifier._default
+
+    def Submit(self, verifiables):
+        """
+        Start verifying the pure witnesses of `verifiables` not in the cache yet.
+
+        Args:
+            verifiables (list): of neo.Core.Mixins.VerifiableMixin, transactions or blocks.
+
+        Returns:
+            list: of `concurrent.futures.Future`, each storing the result of a witness in the
+                  cache and returning it once done.
+        """
+        futures = []
+        submitted = set()
+
+        for verifiable in verifiables:
+            message = None
+
+            for witness in verifiable.Scripts:
+                verification = witness.VerificationScript
+                invocation = witness.InvocationScript
+
+                if len(verification) == 0 or not IsPureScript(verification, checks=True) or not IsPureScript(invocation):
+                    continue
+
+                if message is None:
+                    message = verifiable.GetMessage()
+
+                key = VerificationCache.GetKey(verification, invocation, message)
+                if key in submitted or self._cache.Get(key) is not None:
+                    continue
+
+                submitted.add(key)
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+                future = self._executor.submit(VerifyWitness, message, key[0], key[1])
+                futures.append(self._StoreResult(key, future))
+
+        return futures
+
+    def _StoreResult(self, key, future):
+        # waiters of a future are woken up before its callbacks run, so the future returned
+        # only completes once the result is in the cache
+        stored = Future()
+
+        def store(future):
+            if future.exception() is not None:
+                stored.set_exception(future.exception())
+            else:
+                self._cache.Add(key, future.result())
+                stored.set_result(future.result())
+
+        future.add_done_callback(store)
+        return stored
+
+    def Verify(self, verifiables):
+        """
+        Verify the pure witnesses of `verifiables` in the worker processes.
+
+        Args:
+            verifiables (list): of neo.Core.Mixins.VerifiableMixin, transactions or blocks.
+
+        Returns:
+            Deferred: firing on the reactor thread once all results are in the cache, with
+                      False if any of the witnesses is invalid, True otherwise.
+        """
+        deferreds = []
+        for future in self.Submit(verifiables):
+            d = defer.Deferred()
+            future.add_done_callback(lambda future, d=d: reactor.callFromThread(self._FireResult, d, future))
+            deferreds.append(d)
+
+        d = defer.gatherResults(deferreds, consumeErrors=True)
+        d.addCallback(all)
+        return d
+
+    @staticmethod
+    def _FireResult(d, future):
+        if future.exception() is not None:
+            d.errback(future.exception())
+        else:
+            d.callback(future.result())
+
+    def Shutdown(self):
+        """ Stop the worker processes """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
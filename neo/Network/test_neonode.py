@@ -0,0 +1,100 @@
+import binascii
+from collections import deque
+
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Network.NeoNode import NeoNode
+from neo.Network.Message import Message
+from neo.IO.MemoryStream import StreamManager
+from neocore.IO.BinaryWriter import BinaryWriter
+
+
+class FramingNeoNode(NeoNode):
+    """ NeoNode without a leader or transport, which records the messages it receives """
+
+    def __init__(self):
+        self.buffer_in = bytearray()
+        self.messages_in = deque()
+        self.processing_messages = False
+        self.bytes_in = 0
+        self.received = []
+
+    def MessageReceived(self, m):
+        self.received.append(m)
+
+    def Log(self, msg):
+        pass
+
+
+class NeoNodeTestCase(NeoTestCase):
+
+    def serialize(self, message):
+        ms = StreamManager.GetStream()
+        writer = BinaryWriter(ms)
+        message.Serialize(writer)
+        data = binascii.unhexlify(ms.ToArray())
+        StreamManager.ReleaseStream(ms)
+        return data
+
+    def messages(self, count):
+        out = []
+        for i in range(count):
+            message = Message('block')
+            message.Payload = bytes([0x80 + i]) * (i * 37)
+            message.Checksum = Message.GetChecksum(message.Payload)
+            out.append(message)
+        return out
+
+    def test_messages_split_across_chunks(self):
+        node = FramingNeoNode()
+        messages = self.messages(50)
+        data = b''.join(self.serialize(m) for m in messages)
+
+        for i in range(0, len(data), 1000):
+            node.dataReceived(data[i:i + 1000])
+
+        self.assertEqual(len(node.received), 50)
+        for sent, received in zip(messages, node.received):
+            self.assertEqual(received.Command, 'block')
+            self.assertEqual(received.Payload, sent.Payload)
+        self.assertEqual(node.buffer_in, bytearray())
+        self.assertEqual(node.bytes_in, len(data))
+
+    def test_partial_message_stays_buffered(self):
+        node = FramingNeoNode()
+        data = self.serialize(self.messages(3)[2])
+
+        node.dataReceived(data[:10])
+        node.dataReceived(data[10:-1])
+        self.assertEqual(node.received, [])
+        self.assertEqual(len(node.buffer_in), len(data) - 1)
+
+        node.dataReceived(data[-1:])
+        self.assertEqual(len(node.received), 1)
+        self.assertEqual(node.buffer_in, bytearray())
+
+    def test_bad_checksum_is_skipped(self):
+        node = FramingNeoNode()
+        bad, good = self.messages(3)[1:]
+        bad.Checksum += 1
+
+        node.dataReceived(self.serialize(bad) + self.serialize(good))
+
+        self.assertEqual(len(node.received), 1)
+        self.assertEqual(node.received[0].Payload, good.Payload)
+
+    def test_handler_receives_data(self):
+        node = FramingNeoNode()
+        messages = self.messages(4)[1:]
+        first, second, third = [self.serialize(m) for m in messages]
+
+        # the handler of the first message receives more data, as a re-entrant transport may
+        def MessageReceived(m):
+            node.received.append(m)
+            if len(node.received) == 1:
+                node.dataReceived(third[10:])
+
+        node.MessageReceived = MessageReceived
+        node.dataReceived(first + second + third[:10])
+
+        self.assertEqual([m.Payload for m in node.received], [m.Payload for m in messages])
+        self.assertEqual(node.buffer_in, bytearray())
@@ -0,0 +1,149 @@
+from twisted.internet import defer
+
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Core.Blockchain import Blockchain
+from neo.Network.NodeLeader import NodeLeader
+from neo.Network.SignatureVerifier import SignatureVerifier
+from neocore.UInt256 import UInt256
+
+
+class PendingVerifier(SignatureVerifier):
+    """ Verifier whose results are given by the test """
+
+    def __init__(self):
+        super(PendingVerifier, self).__init__(max_workers=1)
+        self.pending = []
+        self.verified = []
+
+    def Verify(self, verifiables):
+        d = defer.Deferred()
+        self.pending.append(d)
+        self.verified.append(verifiables)
+        return d
+
+
+class RecordingChain():
+
+    def __init__(self, added):
+        self.added = added
+        self.height = -1
+        self.VerifyBlocks = True
+        self.HeaderHeight = -1
+
+    def ContainsBlock(self, index):
+        return index <= self.height
+
+    def AddBlock(self, block):
+        self.added.append(block)
+        return True
+
+
+class Inventory():
+
+    def __init__(self, number, added, valid=True):
+        self.Hash = UInt256(data=bytearray([number]) * 32)
+        self.added = added
+        self.valid = valid
+
+    def Verify(self):
+        self.added.append(self)
+        return self.valid
+
+
+class NodeLeaderTestCase(NeoTestCase):
+
+    def setUp(self):
+        self.added = []
+        self.verifier = PendingVerifier()
+        self._default_verifier = SignatureVerifier._default
+        SignatureVerifier._default = self.verifier
+
+        self._default_chain = Blockchain.Default()
+        Blockchain.DeregisterBlockchain()
+        Blockchain.RegisterBlockchain(RecordingChain(self.added))
+
+        self.leader = NodeLeader()
+
+    def tearDown(self):
+        SignatureVerifier._default = self._default_verifier
+        Blockchain.DeregisterBlockchain()
+        if self._default_chain is not None:
+            Blockchain.RegisterBlockchain(self._default_chain)
+
+    def test_inventory_added_in_order_received(self):
+        block = Blockchain.GenesisBlock()
+        inventories = [Inventory(1, self.added), Inventory(2, self.added, valid=False)]
+
+        results = []
+        for inventory in [block] + inventories:
+            self.leader.InventoryReceived(inventory).addCallback(results.append)
+
+        # only the witnesses of the block itself are checked by AddBlock
+        self.assertEqual(self.verifier.verified, [[block], [inventories[0]], [inventories[1]]])
+
+        # verified out of order, the later inventories wait for the block
+        self.verifier.pending[2].callback(True)
+        self.verifier.pending[1].callback(True)
+        self.assertEqual(self.added, [])
+        self.assertEqual(results, [])
+
+        self.verifier.pending[0].callback(True)
+        self.assertEqual(self.added, [block] + inventories)
+        self.assertEqual(results, [True, True, False])
+
+    def test_pool_failure_verified_again(self):
+        inventory = Inventory(1, self.added)
+        results = []
+        self.leader.InventoryReceived(inventory).addCallback(results.append)
+
+        self.verifier.pending[0].errback(RuntimeError('pool broken'))
+        self.assertEqual(self.added, [inventory])
+        self.assertEqual(results, [True])
+
+    def test_known_block_not_verified(self):
+        results = []
+        Blockchain.Default().height = 0
+        self.leader.InventoryReceived(Blockchain.GenesisBlock()).addCallback(results.append)
+
+        self.assertEqual(self.verifier.pending, [])
+        self.assertEqual(results, [False])
+
+    def test_failure_of_add(self):
+        failing = Inventory(1, self.added)
+        failing.Verify = lambda: 1 / 0
+        inventory = Inventory(2, self.added)
+
+        failures = []
+        results = []
+        self.leader.InventoryReceived(failing).addErrback(failures.append)
+        self.leader.InventoryReceived(inventory).addCallback(results.append)
+        for d in self.verifier.pending:
+            d.callback(True)
+
+        self.assertEqual(len(failures), 1)
+        self.assertTrue(failures[0].check(ZeroDivisionError))
+        self.assertEqual(results, [True])
+
+    def test_block_not_verified_added_right_away(self):
+        Blockchain.Default().VerifyBlocks = False
+        block = Blockchain.GenesisBlock()
+
+        results = []
+        self.leader.InventoryReceived(block).addCallback(results.append)
+
+        self.assertEqual(self.verifier.verified, [])
+        self.assertEqual(self.added, [block])
+        self.assertEqual(results, [True])
+
+    def test_block_with_known_header_waits_for_earlier_inventory(self):
+        Blockchain.Default().HeaderHeight = 0
+        inventory = Inventory(1, self.added)
+        block = Blockchain.GenesisBlock()
+
+        self.leader.InventoryReceived(inventory)
+        self.leader.InventoryReceived(block)
+        self.assertEqual(self.verifier.verified, [[inventory]])
+        self.assertEqual(self.added, [])
+
+        self.verifier.pending[0].callback(True)
+        self.assertEqual(self.added, [inventory, block])
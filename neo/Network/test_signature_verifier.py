@@ -0,0 +1,78 @@
+import binascii
+import time
+
+from concurrent.futures import wait
+from twisted.internet import reactor
+
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Core.Witness import Witness
+from neo.Core.VerificationCache import VerificationCache
+from neo.Network.SignatureVerifier import SignatureVerifier, VerifyWitness
+from neocore.Cryptography.Crypto import Crypto
+from neocore.KeyPair import KeyPair
+
+
+class Verifiable():
+
+    def __init__(self, message, scripts):
+        self.message = message
+        self.Scripts = scripts
+
+    def GetMessage(self):
+        return self.message
+
+
+class SignatureVerifierTestCase(NeoTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.keys = [KeyPair(bytes([i]) * 32) for i in (1, 2)]
+        cls.points = [binascii.unhexlify(key.PublicKey.encode_point(True)) for key in cls.keys]
+        cls.message = binascii.hexlify(b'signature verifier test')
+        cls.signatures = [b'\x40' + bytes(Crypto.Sign(cls.message, key.PrivateKey)) for key in cls.keys]
+
+    def setUp(self):
+        self.cache = VerificationCache()
+        self.verifier = SignatureVerifier(max_workers=2, cache=self.cache)
+
+    def tearDown(self):
+        self.verifier.Shutdown()
+
+    def test_verify_witness(self):
+        single_sig = b'\x21' + self.points[0] + b'\xac'
+        multi_sig = b'\x52' + b''.join(b'\x21' + point for point in self.points) + b'\x52\xae'
+
+        self.assertTrue(VerifyWitness(self.message, single_sig, self.signatures[0]))
+        self.assertFalse(VerifyWitness(self.message, single_sig, self.signatures[1]))
+        self.assertTrue(VerifyWitness(self.message, multi_sig, self.signatures[0] + self.signatures[1]))
+        self.assertFalse(VerifyWitness(self.message, multi_sig, self.signatures[1] + self.signatures[1]))
+
+    def test_submit(self):
+        good = Witness(self.signatures[0], b'\x21' + self.points[0] + b'\xac')
+        bad = Witness(self.signatures[0], b'\x21' + self.points[1] + b'\xac')
+        # depends on the chain state, left to the VM
+        syscall = Witness(b'', b'\x68\x04test')
+
+        futures = self.verifier.Submit([Verifiable(self.message, [good, bad, syscall]), Verifiable(self.message, [good])])
+        self.assertEqual(len(futures), 2)
+        wait(futures)
+
+        self.assertEqual([future.result() for future in futures], [True, False])
+        self.assertTrue(self.cache.Get(VerificationCache.GetKey(good.VerificationScript, good.InvocationScript, self.message)))
+        self.assertFalse(self.cache.Get(VerificationCache.GetKey(bad.VerificationScript, bad.InvocationScript, self.message)))
+
+        # cached results are not verified again
+        self.assertEqual(self.verifier.Submit([Verifiable(self.message, [good, bad])]), [])
+
+    def test_verify_deferred(self):
+        results = []
+        witness = Witness(self.signatures[1], b'\x21' + self.points[1] + b'\xac')
+        d = self.verifier.Verify([Verifiable(self.message, [witness])])
+        d.addCallback(results.append)
+
+        timeout = time.time() + 30
+        while not results and time.time() < timeout:
+            reactor.runUntilCurrent()
+            time.sleep(0.01)
+
+        self.assertEqual(results, [True])
@@ -3,6 +3,7 @@ from logzero import logger
 from neo.VM.ExecutionEngine import ExecutionEngine
 from neo.VM.OpCode import *
 from neo.VM import VMState
+from neo.VM.InteropService import SysCalls
 from neocore.Cryptography.Crypto import Crypto
 from neocore.Fixed8 import Fixed8
 
@@ -24,349 +25,382 @@ from neocore.UInt160 import UInt160
 from neocore.UInt256 import UInt256
 
 
-class ApplicationEngine(ExecutionEngine):
+PUSHDATA4_INT = PUSHDATA4[0]
+UNPACK_INT = UNPACK[0]
+SYSCALL_INT = SYSCALL[0]
 
-    ratio = 100000
-    gas_free = 10 * 100000000
-    gas_amount = 0
-    gas_consumed = 0
-    testMode = False
 
-    Trigger = None
+def _BuildOpPrices():
+    """
+    Returns:
+        list: the static price of each opcode integer, None for SYSCALL and CHECKMULTISIG,
+              whose price depends on the syscall and the evaluation stack.
+    """
+    prices = [1] * 256
 
-    def GasConsumed(self):
-        return Fixed8(self.gas_consumed)
+    for op in range(PUSH16[0] + 1):
+        prices[op] = 0
 
-    def __init__(self, trigger_type, container, table, service, gas, testMode=False):
+    static_prices = {
+        NOP: 0,
+        APPCALL: 10,
+        TAILCALL: 10,
+        SHA1: 10,
+        SHA256: 10,
+        HASH160: 20,
+        HASH256: 20,
+        CHECKSIG: 100,
+        SYSCALL: None,
+        CHECKMULTISIG: None,
+    }
+    for opcode, price in static_prices.items():
+        prices[opcode[0]] = price
 
-        super(ApplicationEngine, self).__init__(container=container, crypto=Crypto.Default(), table=table, service=service)
+    return prices
 
-        self.Trigger = trigger_type
-        self.gas_amount = self.gas_free + gas.value
-        self.testMode = testMode
 
-    def CheckArraySize(self):
+OP_PRICES = _BuildOpPrices()
 
-        maxArraySize = 1024
 
-        if self.CurrentContext.InstructionPointer >= len(self.CurrentContext.Script):
-            return True
+def _ValidatorRegisterPrice(engine):
+    return int(1000 * 100000000 / engine.ratio)
 
-        opcode = self.CurrentContext.NextInstruction
 
-        if opcode in [PACK, NEWARRAY, NEWSTRUCT]:
+def _AssetCreatePrice(engine):
+    return int(5000 * 100000000 / engine.ratio)
 
-            size = self.EvaluationStack.Peek().GetBigInteger()
 
-            if size > maxArraySize:
-                logger.error("ARRAY SIZE TOO BIG!!!")
-                return False
+def _AssetRenewPrice(engine):
+    return int(engine.EvaluationStack.Peek(1).GetBigInteger() * 5000 * 100000000 / engine.ratio)
 
-            return True
 
-        return True
+def _ContractCreatePrice(engine):
 
-    def CheckInvocationStack(self):
+    fee = int(100 * 100000000 / engine.ratio)  # 100 gas for contract with no storage no dynamic invoke
 
-        maxInvocationStackSize = 1024
+    contract_properties = engine.EvaluationStack.Peek(3).GetBigInteger()
 
-        if self.CurrentContext.InstructionPointer >= len(self.CurrentContext.Script):
-            return True
+    if contract_properties & ContractPropertyState.HasStorage > 0:
+        fee += int(400 * 100000000 / engine.ratio)  # if contract has storage, we add 400 gas
 
-        opcode = self.CurrentContext.NextInstruction
+    if contract_properties & ContractPropertyState.HasDynamicInvoke > 0:
+        fee += int(500 * 100000000 / engine.ratio)  # if it has dynamic invoke, add extra 500 gas
 
-        if opcode == CALL or opcode == APPCALL:
-            if self.InvocationStack.Count >= maxInvocationStackSize:
-                logger.error("INVOCATION STACK TOO BIG, RETURN FALSE")
-                return False
+    return fee
 
-            return True
 
-        return True
+def _StoragePutPrice(engine):
+    l1 = len(engine.EvaluationStack.Peek(1).GetByteArray())
+    l2 = len(engine.EvaluationStack.Peek(2).GetByteArray())
+    return (int((l1 + l2 - 1) / 1024) + 1) * 1000
 
-    def CheckItemSize(self):
 
-        maxItemSize = 1024 * 1024
+# price of the syscalls which cost more than 1, or the function computing it from the engine
+SYSCALL_PRICES = {
+    "Neo.Runtime.CheckWitness": 200,
+    "Neo.Blockchain.GetHeader": 100,
+    "Neo.Blockchain.GetBlock": 200,
+    "Neo.Runtime.GetTime": 100,
+    "Neo.Blockchain.GetTransaction": 100,
+    "Neo.Blockchain.GetAccount": 100,
+    "Neo.Blockchain.GetValidators": 200,
+    "Neo.Blockchain.GetAsset": 100,
+    "Neo.Blockchain.GetContract": 100,
+    "Neo.Transaction.GetReferences": 200,
+    "Neo.Transaction.GetUnspentCoins": 200,
+    "Neo.Account.SetVotes": 1000,
+    "Neo.Validator.Register": _ValidatorRegisterPrice,
+    "Neo.Asset.Create": _AssetCreatePrice,
+    "Neo.Asset.Renew": _AssetRenewPrice,
+    "Neo.Contract.Create": _ContractCreatePrice,
+    "Neo.Contract.Migrate": _ContractCreatePrice,
+    "Neo.Storage.Get": 100,
+    "Neo.Storage.Put": _StoragePutPrice,
+    "Neo.Storage.Delete": 100,
+}
 
-        if self.CurrentContext.InstructionPointer >= len(self.CurrentContext.Script):
-            return True
+for name in SYSCALL_PRICES:
+    SysCalls.GetId(name)
 
-        opcode = self.CurrentContext.NextInstruction
+# SYSCALL_PRICES indexed by `SysCalls` id, extended as names get interned
+_SYSCALL_PRICES_BY_ID = []
 
-        if opcode == PUSHDATA4:
 
-            if self.CurrentContext.InstructionPointer + 4 >= len(self.CurrentContext.Script):
-                return False
+def GetSysCallPriceById(id):
+    """
+    Get the price of a syscall by the id of its name.
 
-            # TODO this should be double checked.  it has been
-            # double checked and seems to work, but could possibly not work
-            position = self.CurrentContext.InstructionPointer + 1
-            lengthpointer = self.CurrentContext.Script[position:position + 4]
-            length = int.from_bytes(lengthpointer, 'little')
+    Returns:
+        int or function: the price, or the function computing it from the engine.
+    """
+    prices = _SYSCALL_PRICES_BY_ID
+    while id >= len(prices):
+        name = SysCalls.GetName(len(prices))
+        prices.append(SYSCALL_PRICES.get(name.replace('Antshares.', 'Neo.'), 1))
+    return prices[id]
 
-            if length > maxItemSize:
-                logger.error("ITEM IS GREATER THAN MAX ITEM SIZE!")
-                return False
 
-            return True
-
-        elif opcode == CAT:
-
-            if self.EvaluationStack.Count < 2:
-                logger.error("NOT ENOUGH ITEMS TO CONCAT")
-                return False
-
-            length = 0
-
-            try:
-                length = len(self.EvaluationStack.Peek(0).GetByteArray()) + len(self.EvaluationStack.Peek(1).GetByteArray())
-            except Exception as e:
-                logger.error("COULD NOT GET STR LENGTH!")
-                raise e
-
-            if length > maxItemSize:
-                logger.error("ITEM IS GREATER THAN MAX SIZE!!!")
-                return False
-
-            return True
-
-        return True
-
-    def CheckStackSize(self):
+class ApplicationEngine(ExecutionEngine):
 
-        maxStackSize = 2 * 1024
+    ratio = 100000
+    gas_free = 10 * 100000000
+    gas_amount = 0
+    gas_consumed = 0
+    testMode = False
 
-        if self.CurrentContext.InstructionPointer >= len(self.CurrentContext.Script):
-            return True
+    Trigger = None
 
-        size = 0
+    # checks per opcode integer, see _BuildOpGuards
+    _OpGuards = None
 
-        opcode = self.CurrentContext.NextInstruction
+    def GasConsumed(self):
+        return Fixed8(self.gas_consumed)
 
-        if opcode < PUSH16:
-            size = 1
+    def __init__(self, trigger_type, container, table, service, gas, testMode=False):
 
-        else:
+        super(ApplicationEngine, self).__init__(container=container, crypto=Crypto.Default(), table=table, service=service)
 
-            if opcode in [DEPTH, DUP, OVER, TUCK]:
-                size = 1
+        self.Trigger = trigger_type
+        self.gas_amount = self.gas_free + gas.value
+        self.testMode = testMode
 
-            elif opcode == UNPACK:
+    maxArraySize = 1024
+    maxInvocationStackSize = 1024
+    maxItemSize = 1024 * 1024
+    maxStackSize = 2 * 1024
 
-                item = self.EvaluationStack.Peek()
+    def CheckArraySize(self, context, script, ip):
 
-                if not item.IsArray:
-                    logger.error("ITEM NOT ARRAY:")
-                    return False
+        size = self.EvaluationStack.Peek().GetBigInteger()
 
-                size = len(item.GetArray())
+        if size > self.maxArraySize:
+            logger.error("ARRAY SIZE TOO BIG!!!")
+            return False
 
-        if size == 0:
-            return True
+        return True
 
-        size += self.EvaluationStack.Count + self.AltStack.Count
+    def CheckInvocationStack(self, context, script, ip):
 
-        if size > maxStackSize:
-            logger.error("SIZE IS OVER MAX STACK SIZE!!!!")
+        if self.InvocationStack.Count >= self.maxInvocationStackSize:
+            logger.error("INVOCATION STACK TOO BIG, RETURN FALSE")
             return False
 
         return True
 
-    def CheckDynamicInvoke(self):
+    def CheckItemSize(self, context, script, ip):
 
-        if self.CurrentContext.InstructionPointer >= len(self.CurrentContext.Script):
-            return True
+        if script[ip] == PUSHDATA4_INT:
 
-        opcode = self.CurrentContext.NextInstruction
+            if ip + 4 >= len(script):
+                return False
 
-        if opcode == APPCALL:
+            # TODO this should be double checked.  it has been
+            # double checked and seems to work, but could possibly not work
+            position = ip + 1
+            lengthpointer = script[position:position + 4]
+            length = int.from_bytes(lengthpointer, 'little')
 
-            # read the current position of the stream
-            start_pos = self.CurrentContext.OpReader.stream.tell()
+            if length > self.maxItemSize:
+                logger.error("ITEM IS GREATER THAN MAX ITEM SIZE!")
+                return False
 
-            # normal app calls are stored in the op reader
-            # we read ahead past the next instruction 1 the next 20 bytes
-            script_hash = self.CurrentContext.OpReader.ReadBytes(21)[1:]
+            return True
 
-            # then reset the position
-            self.CurrentContext.OpReader.stream.seek(start_pos)
+        # CAT
+        if self.EvaluationStack.Count < 2:
+            logger.error("NOT ENOUGH ITEMS TO CONCAT")
+            return False
 
-            for b in script_hash:
-                # if any of the bytes are greater than 0, this is a normal app call
-                if b > 0:
-                    return True
+        length = 0
 
-            # if this is a dynamic app call, we will arrive here
-            # get the current executing script hash
-            current = UInt160(data=self.CurrentContext.ScriptHash())
-            current_contract_state = self._Table.GetContractState(current.ToBytes())
+        try:
+            length = len(self.EvaluationStack.Peek(0).GetByteArray()) + len(self.EvaluationStack.Peek(1).GetByteArray())
+        except Exception as e:
+            logger.error("COULD NOT GET STR LENGTH!")
+            raise e
 
-            # if current contract state cant do dynamic calls, return False
-            return current_contract_state.HasDynamicInvoke
+        if length > self.maxItemSize:
+            logger.error("ITEM IS GREATER THAN MAX SIZE!!!")
+            return False
 
         return True
 
-    def Execute(self):
+    def CheckStackSize(self, context, script, ip):
 
-        while self._VMState & VMState.HALT == 0 and self._VMState & VMState.FAULT == 0:
+        size = 1
 
-            try:
+        if script[ip] == UNPACK_INT:
 
-                self.gas_consumed = self.gas_consumed + (self.GetPrice() * self.ratio)
-#                print("gas consumeb: %s " % self.gas_consumed)
-            except Exception as e:
-                logger.error("Exception calculating gas consumed %s " % e)
-                return False
+            item = self.EvaluationStack.Peek()
 
-            if not self.testMode and self.gas_consumed > self.gas_amount:
-                logger.error("NOT ENOUGH GAS")
+            if not item.IsArray:
+                logger.error("ITEM NOT ARRAY:")
                 return False
 
-            if not self.CheckItemSize():
-                logger.error("ITEM SIZE TOO BIG")
-                return False
+            size = len(item.GetArray())
 
-            if not self.CheckStackSize():
-                logger.error("STACK SIZE TOO BIG")
-                return False
+            if size == 0:
+                return True
 
-            if not self.CheckArraySize():
-                logger.error("ARRAY SIZE TOO BIG")
-                return False
+        size += self.EvaluationStack.Count + self.AltStack.Count
 
-            if not self.CheckInvocationStack():
-                logger.error("INVOCATION SIZE TO BIIG")
-                return False
+        if size > self.maxStackSize:
+            logger.error("SIZE IS OVER MAX STACK SIZE!!!!")
+            return False
 
-            if not self.CheckDynamicInvoke():
-                logger.error("Dynamic invoke without proper contract")
-                return False
+        return True
 
-            self.StepInto()
+    def CheckDynamicInvoke(self, context, script, ip):
 
-        return not self._VMState & VMState.FAULT > 0
+        # normal app calls are stored in the script,
+        # in the 20 bytes after the next instruction
+        script_hash = script[ip + 1:ip + 21]
 
-    def GetPrice(self):
+        for b in script_hash:
+            # if any of the bytes are greater than 0, this is a normal app call
+            if b > 0:
+                return True
 
-        if self.CurrentContext.InstructionPointer >= len(self.CurrentContext.Script):
-            return 0
+        # if this is a dynamic app call, we will arrive here
+        # get the current executing script hash
+        current = UInt160(data=context.ScriptHash())
+        current_contract_state = self._Table.GetContractState(current.ToBytes())
 
-        opcode = self.CurrentContext.NextInstruction
+        # if current contract state cant do dynamic calls, return False
+        return current_contract_state.HasDynamicInvoke
 
-        if opcode <= PUSH16:
-            return 0
+    @classmethod
+    def _BuildOpGuards(cls):
+        """
+        Build the checks to run before each opcode.
 
-        if opcode == NOP:
-            return 0
-        elif opcode == APPCALL or opcode == TAILCALL:
-            return 10
-        elif opcode == SYSCALL:
-            return self.GetPriceForSysCall()
-        elif opcode == SHA1 or opcode == SHA256:
-            return 10
-        elif opcode == HASH160 or opcode == HASH256:
-            return 20
-        elif opcode == CHECKSIG:
-            return 100
-        elif opcode == CHECKMULTISIG:
-            if self.EvaluationStack.Count == 0:
-                return 1
-            n = self.EvaluationStack.Peek().GetBigInteger()
+        Returns:
+            list: per opcode integer, a tuple of (check, error message) pairs, or None if the opcode needs no check.
+        """
+        guards = [[] for op in range(256)]
 
-            if n < 1:
-                return 1
+        for opcode in [PUSHDATA4, CAT]:
+            guards[opcode[0]].append((cls.CheckItemSize, "ITEM SIZE TOO BIG"))
 
-            return 100 * n
+        for op in range(PUSH16[0]):
+            guards[op].append((cls.CheckStackSize, "STACK SIZE TOO BIG"))
+        for opcode in [DEPTH, DUP, OVER, TUCK, UNPACK]:
+            guards[opcode[0]].append((cls.CheckStackSize, "STACK SIZE TOO BIG"))
 
-        return 1
+        for opcode in [PACK, NEWARRAY, NEWSTRUCT]:
+            guards[opcode[0]].append((cls.CheckArraySize, "ARRAY SIZE TOO BIG"))
 
-    def GetPriceForSysCall(self):
+        for opcode in [CALL, APPCALL]:
+            guards[opcode[0]].append((cls.CheckInvocationStack, "INVOCATION SIZE TO BIIG"))
 
-        if self.CurrentContext.InstructionPointer >= len(self.CurrentContext.Script) - 3:
-            return 1
+        guards[APPCALL[0]].append((cls.CheckDynamicInvoke, "Dynamic invoke without proper contract"))
 
-        length = self.CurrentContext.Script[self.CurrentContext.InstructionPointer + 1]
+        return [tuple(checks) if checks else None for checks in guards]
 
-        if self.CurrentContext.InstructionPointer > len(self.CurrentContext.Script) - length - 2:
-            return 1
+    def __init_subclass__(cls, **kwargs):
+        super(ApplicationEngine, cls).__init_subclass__(**kwargs)
+        cls._OpGuards = cls._BuildOpGuards()
+
+    def Execute(self):
+
+        guards = self._OpGuards
 
-        strbytes = self.CurrentContext.Script[self.CurrentContext.InstructionPointer + 2:length + self.CurrentContext.InstructionPointer + 2]
+        while self._VMState & VMState.HALT == 0 and self._VMState & VMState.FAULT == 0:
+
+            # decode the next instruction once for the price and all checks
+            context = self.CurrentContext
+            script = context.Script
+            ip = context.InstructionPointer
 
-        api_name = strbytes.decode('utf-8')
+            if ip < len(script):
 
-        api = api_name.replace('Antshares.', 'Neo.')
+                opcode = script[ip]
 
-        if api == "Neo.Runtime.CheckWitness":
-            return 200
+                try:
+                    price = OP_PRICES[opcode]
+                    if price is None:
+                        price = self.GetDynamicPrice(opcode)
+                    self.gas_consumed = self.gas_consumed + (price * self.ratio)
+                except Exception as e:
+                    logger.error("Exception calculating gas consumed %s " % e)
+                    return False
 
-        elif api == "Neo.Blockchain.GetHeader":
-            return 100
+                if not self.testMode and self.gas_consumed > self.gas_amount:
+                    logger.error("NOT ENOUGH GAS")
+                    return False
 
-        elif api == "Neo.Blockchain.GetBlock":
-            return 200
+                checks = guards[opcode]
+                if checks is not None:
+                    for check, error in checks:
+                        if not check(self, context, script, ip):
+                            logger.error(error)
+                            return False
 
-        elif api == "Neo.Runtime.GetTime":
-            return 100
+            self.StepInto()
 
-        elif api == "Neo.Blockchain.GetTransaction":
-            return 100
+        return not self._VMState & VMState.FAULT > 0
 
-        elif api == "Neo.Blockchain.GetAccount":
-            return 100
+    def GetPrice(self):
 
-        elif api == "Neo.Blockchain.GetValidators":
-            return 200
+        if self.CurrentContext.InstructionPointer >= len(self.CurrentContext.Script):
+            return 0
 
-        elif api == "Neo.Blockchain.GetAsset":
-            return 100
+        opcode = self.CurrentContext.Script[self.CurrentContext.InstructionPointer]
 
-        elif api == "Neo.Blockchain.GetContract":
-            return 100
+        price = OP_PRICES[opcode]
+        if price is None:
+            return self.GetDynamicPrice(opcode)
 
-        elif api == "Neo.Transaction.GetReferences":
-            return 200
+        return price
 
-        elif api == "Neo.Transaction.GetUnspentCoins":
-            return 200
+    def GetDynamicPrice(self, opcode):
+        """
+        Get the price of an opcode which depends on the evaluation stack or the syscall, see `OP_PRICES`.
+        """
+        if opcode == SYSCALL_INT:
+            return self.GetPriceForSysCall()
 
-        elif api == "Neo.Account.SetVotes":
-            return 1000
+        # CHECKMULTISIG
+        if self.EvaluationStack.Count == 0:
+            return 1
+        n = self.EvaluationStack.Peek().GetBigInteger()
 
-        elif api == "Neo.Validator.Register":
-            return int(1000 * 100000000 / self.ratio)
+        if n < 1:
+            return 1
 
-        elif api == "Neo.Asset.Create":
-            return int(5000 * 100000000 / self.ratio)
+        return 100 * n
 
-        elif api == "Neo.Asset.Renew":
-            return int(self.EvaluationStack.Peek(1).GetBigInteger() * 5000 * 100000000 / self.ratio)
+    def GetPriceForSysCall(self):
 
-        elif api == "Neo.Contract.Create" or api == "Neo.Contract.Migrate":
+        context = self.CurrentContext
+        script = context.Script
+        ip = context.InstructionPointer
 
-            fee = int(100 * 100000000 / self.ratio)  # 100 gas for contract with no storage no dynamic invoke
+        if ip >= len(script) - 3:
+            return 1
 
-            contract_properties = self.EvaluationStack.Peek(3).GetBigInteger()
+        length = script[ip + 1]
 
-            if contract_properties & ContractPropertyState.HasStorage > 0:
-                fee += int(400 * 100000000 / self.ratio)  # if contract has storage, we add 400 gas
+        if ip > len(script) - length - 2:
+            return 1
 
-            if contract_properties & ContractPropertyState.HasDynamicInvoke > 0:
-                fee += int(500 * 100000000 / self.ratio)  # if it has dynamic invoke, add extra 500 gas
+        instruction = context.GetInstruction(ip)
 
-            return fee
+        if instruction.Error is None and length < 0xfd and type(instruction.Operand) is int:
+            # the decoded name is exactly the `length` bytes after the length
+            price = GetSysCallPriceById(instruction.Operand)
+        else:
+            strbytes = script[ip + 2:length + ip + 2]
 
-        elif api == "Neo.Storage.Get":
-            return 100
+            api_name = strbytes.decode('utf-8')
 
-        elif api == "Neo.Storage.Put":
-            l1 = len(self.EvaluationStack.Peek(1).GetByteArray())
-            l2 = len(self.EvaluationStack.Peek(2).GetByteArray())
-            return (int((l1 + l2 - 1) / 1024) + 1) * 1000
+            api = api_name.replace('Antshares.', 'Neo.')
 
-        elif api == "Neo.Storage.Delete":
-            return 100
+            price = SYSCALL_PRICES.get(api, 1)
 
-        return 1
+        if type(price) is int:
+            return price
+        return price(self)
 
     @staticmethod
     def Run(script, container=None):
@@ -420,3 +454,6 @@ class ApplicationEngine(ExecutionEngine):
             events.emit(event.event_type, event)
 
         return engine
+
+
+ApplicationEngine._OpGuards = ApplicationEngine._BuildOpGuards()
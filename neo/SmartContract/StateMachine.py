@@ -46,27 +46,32 @@ class StateMachine(StateReader):
         self._storages = storages
         self._wb = wb
 
-        self.Register("Neo.Account.SetVotes", self.Account_SetVotes)
-        self.Register("Neo.Validator.Register", self.Validator_Register)
-        self.Register("Neo.Asset.Create", self.Asset_Create)
-        self.Register("Neo.Asset.Renew", self.Asset_Renew)
-        self.Register("Neo.Contract.Create", self.Contract_Create)
-        self.Register("Neo.Contract.Migrate", self.Contract_Migrate)
-        self.Register("Neo.Contract.GetStorageContext", self.Contract_GetStorageContext)
-        self.Register("Neo.Contract.Destroy", self.Contract_Destroy)
-        self.Register("Neo.Storage.Put", self.Storage_Put)
-        self.Register("Neo.Storage.Delete", self.Storage_Delete)
-
-        self.Register("AntShares.Account.SetVotes", self.Account_SetVotes)
-        self.Register("AntShares.Validator.Register", self.Validator_Register)
-        self.Register("AntShares.Asset.Create", self.Asset_Create)
-        self.Register("AntShares.Asset.Renew", self.Asset_Renew)
-        self.Register("AntShares.Contract.Create", self.Contract_Create)
-        self.Register("AntShares.Contract.Migrate", self.Contract_Migrate)
-        self.Register("AntShares.Contract.GetStorageContext", self.Contract_GetStorageContext)
-        self.Register("AntShares.Contract.Destroy", self.Contract_Destroy)
-        self.Register("AntShares.Storage.Put", self.Storage_Put)
-        self.Register("AntShares.Storage.Delete", self.Storage_Delete)
+    @classmethod
+    def _RegisterMethods(cls, register):
+
+        super()._RegisterMethods(register)
+
+        register("Neo.Account.SetVotes", cls.Account_SetVotes)
+        register("Neo.Validator.Register", cls.Validator_Register)
+        register("Neo.Asset.Create", cls.Asset_Create)
+        register("Neo.Asset.Renew", cls.Asset_Renew)
+        register("Neo.Contract.Create", cls.Contract_Create)
+        register("Neo.Contract.Migrate", cls.Contract_Migrate)
+        register("Neo.Contract.GetStorageContext", cls.Contract_GetStorageContext)
+        register("Neo.Contract.Destroy", cls.Contract_Destroy)
+        register("Neo.Storage.Put", cls.Storage_Put)
+        register("Neo.Storage.Delete", cls.Storage_Delete)
+
+        register("AntShares.Account.SetVotes", cls.Account_SetVotes)
+        register("AntShares.Validator.Register", cls.Validator_Register)
+        register("AntShares.Asset.Create", cls.Asset_Create)
+        register("AntShares.Asset.Renew", cls.Asset_Renew)
+        register("AntShares.Contract.Create", cls.Contract_Create)
+        register("AntShares.Contract.Migrate", cls.Contract_Migrate)
+        register("AntShares.Contract.GetStorageContext", cls.Contract_GetStorageContext)
+        register("AntShares.Contract.Destroy", cls.Contract_Destroy)
+        register("AntShares.Storage.Put", cls.Storage_Put)
+        register("AntShares.Storage.Delete", cls.Storage_Delete)
 
     def CheckStorageContext(self, context):
         if context is None:
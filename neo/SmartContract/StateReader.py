@@ -46,132 +46,137 @@ class StateReader(InteropService):
         self.notifications = []
         self.events_to_dispatch = []
 
-        self.Register("Neo.Runtime.GetTrigger", self.Runtime_GetTrigger)
-        self.Register("Neo.Runtime.CheckWitness", self.Runtime_CheckWitness)
-        self.Register("Neo.Runtime.Notify", self.Runtime_Notify)
-        self.Register("Neo.Runtime.Log", self.Runtime_Log)
-        self.Register("Neo.Runtime.GetTime", self.Runtime_GetCurrentTime)
-
-        self.Register("Neo.Blockchain.GetHeight", self.Blockchain_GetHeight)
-        self.Register("Neo.Blockchain.GetHeader", self.Blockchain_GetHeader)
-        self.Register("Neo.Blockchain.GetBlock", self.Blockchain_GetBlock)
-        self.Register("Neo.Blockchain.GetTransaction", self.Blockchain_GetTransaction)
-        self.Register("Neo.Blockchain.GetAccount", self.Blockchain_GetAccount)
-        self.Register("Neo.Blockchain.GetValidators", self.Blockchain_GetValidators)
-        self.Register("Neo.Blockchain.GetAsset", self.Blockchain_GetAsset)
-        self.Register("Neo.Blockchain.GetContract", self.Blockchain_GetContract)
-
-        self.Register("Neo.Header.GetIndex", self.Header_GetIndex)
-        self.Register("Neo.Header.GetHash", self.Header_GetHash)
-        self.Register("Neo.Header.GetVersion", self.Header_GetVersion)
-        self.Register("Neo.Header.GetPrevHash", self.Header_GetPrevHash)
-        self.Register("Neo.Header.GetMerkleRoot", self.Header_GetMerkleRoot)
-        self.Register("Neo.Header.GetTimestamp", self.Header_GetTimestamp)
-        self.Register("Neo.Header.GetConsensusData", self.Header_GetConsensusData)
-        self.Register("Neo.Header.GetNextConsensus", self.Header_GetNextConsensus)
-
-        self.Register("Neo.Block.GetTransactionCount", self.Block_GetTransactionCount)
-        self.Register("Neo.Block.GetTransactions", self.Block_GetTransactions)
-        self.Register("Neo.Block.GetTransaction", self.Block_GetTransaction)
-
-        self.Register("Neo.Transaction.GetHash", self.Transaction_GetHash)
-        self.Register("Neo.Transaction.GetType", self.Transaction_GetType)
-        self.Register("Neo.Transaction.GetAttributes", self.Transaction_GetAttributes)
-        self.Register("Neo.Transaction.GetInputs", self.Transaction_GetInputs)
-        self.Register("Neo.Transaction.GetOutputs", self.Transaction_GetOutputs)
-        self.Register("Neo.Transaction.GetReferences", self.Transaction_GetReferences)
-        self.Register("Neo.Transaction.GetUnspentCoins", self.Transaction_GetUnspentCoins)
-
-        self.Register("Neo.Attribute.GetData", self.Attribute_GetData)
-        self.Register("Neo.Attribute.GetUsage", self.Attribute_GetUsage)
-
-        self.Register("Neo.Input.GetHash", self.Input_GetHash)
-        self.Register("Neo.Input.GetIndex", self.Input_GetIndex)
-
-        self.Register("Neo.Output.GetAssetId", self.Output_GetAssetId)
-        self.Register("Neo.Output.GetValue", self.Output_GetValue)
-        self.Register("Neo.Output.GetScriptHash", self.Output_GetScriptHash)
-
-        self.Register("Neo.Account.GetVotes", self.Account_GetVotes)
-        self.Register("Neo.Account.GetBalance", self.Account_GetBalance)
-        self.Register("Neo.Account.GetScriptHash", self.Account_GetScriptHash)
-
-        self.Register("Neo.Asset.GetAssetId", self.Asset_GetAssetId)
-        self.Register("Neo.Asset.GetAssetType", self.Asset_GetAssetType)
-        self.Register("Neo.Asset.GetAmount", self.Asset_GetAmount)
-        self.Register("Neo.Asset.GetAvailable", self.Asset_GetAvailable)
-        self.Register("Neo.Asset.GetPrecision", self.Asset_GetPrecision)
-        self.Register("Neo.Asset.GetOwner", self.Asset_GetOwner)
-        self.Register("Neo.Asset.GetAdmin", self.Asset_GetAdmin)
-        self.Register("Neo.Asset.GetIssuer", self.Asset_GetIssuer)
-
-        self.Register("Neo.Contract.GetScript", self.Contract_GetScript)
-
-        self.Register("Neo.Storage.GetContext", self.Storage_GetContext)
-        self.Register("Neo.Storage.Get", self.Storage_Get)
+    @classmethod
+    def _RegisterMethods(cls, register):
+
+        super()._RegisterMethods(register)
+
+        register("Neo.Runtime.GetTrigger", cls.Runtime_GetTrigger)
+        register("Neo.Runtime.CheckWitness", cls.Runtime_CheckWitness)
+        register("Neo.Runtime.Notify", cls.Runtime_Notify)
+        register("Neo.Runtime.Log", cls.Runtime_Log)
+        register("Neo.Runtime.GetTime", cls.Runtime_GetCurrentTime)
+
+        register("Neo.Blockchain.GetHeight", cls.Blockchain_GetHeight)
+        register("Neo.Blockchain.GetHeader", cls.Blockchain_GetHeader)
+        register("Neo.Blockchain.GetBlock", cls.Blockchain_GetBlock)
+        register("Neo.Blockchain.GetTransaction", cls.Blockchain_GetTransaction)
+        register("Neo.Blockchain.GetAccount", cls.Blockchain_GetAccount)
+        register("Neo.Blockchain.GetValidators", cls.Blockchain_GetValidators)
+        register("Neo.Blockchain.GetAsset", cls.Blockchain_GetAsset)
+        register("Neo.Blockchain.GetContract", cls.Blockchain_GetContract)
+
+        register("Neo.Header.GetIndex", cls.Header_GetIndex)
+        register("Neo.Header.GetHash", cls.Header_GetHash)
+        register("Neo.Header.GetVersion", cls.Header_GetVersion)
+        register("Neo.Header.GetPrevHash", cls.Header_GetPrevHash)
+        register("Neo.Header.GetMerkleRoot", cls.Header_GetMerkleRoot)
+        register("Neo.Header.GetTimestamp", cls.Header_GetTimestamp)
+        register("Neo.Header.GetConsensusData", cls.Header_GetConsensusData)
+        register("Neo.Header.GetNextConsensus", cls.Header_GetNextConsensus)
+
+        register("Neo.Block.GetTransactionCount", cls.Block_GetTransactionCount)
+        register("Neo.Block.GetTransactions", cls.Block_GetTransactions)
+        register("Neo.Block.GetTransaction", cls.Block_GetTransaction)
+
+        register("Neo.Transaction.GetHash", cls.Transaction_GetHash)
+        register("Neo.Transaction.GetType", cls.Transaction_GetType)
+        register("Neo.Transaction.GetAttributes", cls.Transaction_GetAttributes)
+        register("Neo.Transaction.GetInputs", cls.Transaction_GetInputs)
+        register("Neo.Transaction.GetOutputs", cls.Transaction_GetOutputs)
+        register("Neo.Transaction.GetReferences", cls.Transaction_GetReferences)
+        register("Neo.Transaction.GetUnspentCoins", cls.Transaction_GetUnspentCoins)
+
+        register("Neo.Attribute.GetData", cls.Attribute_GetData)
+        register("Neo.Attribute.GetUsage", cls.Attribute_GetUsage)
+
+        register("Neo.Input.GetHash", cls.Input_GetHash)
+        register("Neo.Input.GetIndex", cls.Input_GetIndex)
+
+        register("Neo.Output.GetAssetId", cls.Output_GetAssetId)
+        register("Neo.Output.GetValue", cls.Output_GetValue)
+        register("Neo.Output.GetScriptHash", cls.Output_GetScriptHash)
+
+        register("Neo.Account.GetVotes", cls.Account_GetVotes)
+        register("Neo.Account.GetBalance", cls.Account_GetBalance)
+        register("Neo.Account.GetScriptHash", cls.Account_GetScriptHash)
+
+        register("Neo.Asset.GetAssetId", cls.Asset_GetAssetId)
+        register("Neo.Asset.GetAssetType", cls.Asset_GetAssetType)
+        register("Neo.Asset.GetAmount", cls.Asset_GetAmount)
+        register("Neo.Asset.GetAvailable", cls.Asset_GetAvailable)
+        register("Neo.Asset.GetPrecision", cls.Asset_GetPrecision)
+        register("Neo.Asset.GetOwner", cls.Asset_GetOwner)
+        register("Neo.Asset.GetAdmin", cls.Asset_GetAdmin)
+        register("Neo.Asset.GetIssuer", cls.Asset_GetIssuer)
+
+        register("Neo.Contract.GetScript", cls.Contract_GetScript)
+
+        register("Neo.Storage.GetContext", cls.Storage_GetContext)
+        register("Neo.Storage.Get", cls.Storage_Get)
 
         # OLD API
 
-        self.Register("AntShares.Runtime.GetTrigger", self.Runtime_GetTrigger)
-        self.Register("AntShares.Runtime.CheckWitness", self.Runtime_CheckWitness)
-        self.Register("AntShares.Runtime.Notify", self.Runtime_Notify)
-        self.Register("AntShares.Runtime.Log", self.Runtime_Log)
-
-        self.Register("AntShares.Blockchain.GetHeight", self.Blockchain_GetHeight)
-        self.Register("AntShares.Blockchain.GetHeader", self.Blockchain_GetHeader)
-        self.Register("AntShares.Blockchain.GetBlock", self.Blockchain_GetBlock)
-        self.Register("AntShares.Blockchain.GetTransaction", self.Blockchain_GetTransaction)
-        self.Register("AntShares.Blockchain.GetAccount", self.Blockchain_GetAccount)
-        self.Register("AntShares.Blockchain.GetValidators", self.Blockchain_GetValidators)
-        self.Register("AntShares.Blockchain.GetAsset", self.Blockchain_GetAsset)
-        self.Register("AntShares.Blockchain.GetContract", self.Blockchain_GetContract)
-
-        self.Register("AntShares.Header.GetHash", self.Header_GetHash)
-        self.Register("AntShares.Header.GetVersion", self.Header_GetVersion)
-        self.Register("AntShares.Header.GetPrevHash", self.Header_GetPrevHash)
-        self.Register("AntShares.Header.GetMerkleRoot", self.Header_GetMerkleRoot)
-        self.Register("AntShares.Header.GetTimestamp", self.Header_GetTimestamp)
-        self.Register("AntShares.Header.GetConsensusData", self.Header_GetConsensusData)
-        self.Register("AntShares.Header.GetNextConsensus", self.Header_GetNextConsensus)
-
-        self.Register("AntShares.Block.GetTransactionCount", self.Block_GetTransactionCount)
-        self.Register("AntShares.Block.GetTransactions", self.Block_GetTransactions)
-        self.Register("AntShares.Block.GetTransaction", self.Block_GetTransaction)
-
-        self.Register("AntShares.Transaction.GetHash", self.Transaction_GetHash)
-        self.Register("AntShares.Transaction.GetType", self.Transaction_GetType)
-        self.Register("AntShares.Transaction.GetAttributes", self.Transaction_GetAttributes)
-        self.Register("AntShares.Transaction.GetInputs", self.Transaction_GetInputs)
-        self.Register("AntShares.Transaction.GetOutpus", self.Transaction_GetOutputs)
-        self.Register("AntShares.Transaction.GetReferences", self.Transaction_GetReferences)
-
-        self.Register("AntShares.Attribute.GetData", self.Attribute_GetData)
-        self.Register("AntShares.Attribute.GetUsage", self.Attribute_GetUsage)
-
-        self.Register("AntShares.Input.GetHash", self.Input_GetHash)
-        self.Register("AntShares.Input.GetIndex", self.Input_GetIndex)
-
-        self.Register("AntShares.Output.GetAssetId", self.Output_GetAssetId)
-        self.Register("AntShares.Output.GetValue", self.Output_GetValue)
-        self.Register("AntShares.Output.GetScriptHash", self.Output_GetScriptHash)
-
-        self.Register("AntShares.Account.GetVotes", self.Account_GetVotes)
-        self.Register("AntShares.Account.GetBalance", self.Account_GetBalance)
-        self.Register("AntShares.Account.GetScriptHash", self.Account_GetScriptHash)
-
-        self.Register("AntShares.Asset.GetAssetId", self.Asset_GetAssetId)
-        self.Register("AntShares.Asset.GetAssetType", self.Asset_GetAssetType)
-        self.Register("AntShares.Asset.GetAmount", self.Asset_GetAmount)
-        self.Register("AntShares.Asset.GetAvailable", self.Asset_GetAvailable)
-        self.Register("AntShares.Asset.GetPrecision", self.Asset_GetPrecision)
-        self.Register("AntShares.Asset.GetOwner", self.Asset_GetOwner)
-        self.Register("AntShares.Asset.GetAdmin", self.Asset_GetAdmin)
-        self.Register("AntShares.Asset.GetIssuer", self.Asset_GetIssuer)
-
-        self.Register("AntShares.Contract.GetScript", self.Contract_GetScript)
-
-        self.Register("AntShares.Storage.GetContext", self.Storage_GetContext)
-        self.Register("AntShares.Storage.Get", self.Storage_Get)
+        register("AntShares.Runtime.GetTrigger", cls.Runtime_GetTrigger)
+        register("AntShares.Runtime.CheckWitness", cls.Runtime_CheckWitness)
+        register("AntShares.Runtime.Notify", cls.Runtime_Notify)
+        register("AntShares.Runtime.Log", cls.Runtime_Log)
+
+        register("AntShares.Blockchain.GetHeight", cls.Blockchain_GetHeight)
+        register("AntShares.Blockchain.GetHeader", cls.Blockchain_GetHeader)
+        register("AntShares.Blockchain.GetBlock", cls.Blockchain_GetBlock)
+        register("AntShares.Blockchain.GetTransaction", cls.Blockchain_GetTransaction)
+        register("AntShares.Blockchain.GetAccount", cls.Blockchain_GetAccount)
+        register("AntShares.Blockchain.GetValidators", cls.Blockchain_GetValidators)
+        register("AntShares.Blockchain.GetAsset", cls.Blockchain_GetAsset)
+        register("AntShares.Blockchain.GetContract", cls.Blockchain_GetContract)
+
+        register("AntShares.Header.GetHash", cls.Header_GetHash)
+        register("AntShares.Header.GetVersion", cls.Header_GetVersion)
+        register("AntShares.Header.GetPrevHash", cls.Header_GetPrevHash)
+        register("AntShares.Header.GetMerkleRoot", cls.Header_GetMerkleRoot)
+        register("AntShares.Header.GetTimestamp", cls.Header_GetTimestamp)
+        register("AntShares.Header.GetConsensusData", cls.Header_GetConsensusData)
+        register("AntShares.Header.GetNextConsensus", cls.Header_GetNextConsensus)
+
+        register("AntShares.Block.GetTransactionCount", cls.Block_GetTransactionCount)
+        register("AntShares.Block.GetTransactions", cls.Block_GetTransactions)
+        register("AntShares.Block.GetTransaction", cls.Block_GetTransaction)
+
+        register("AntShares.Transaction.GetHash", cls.Transaction_GetHash)
+        register("AntShares.Transaction.GetType", cls.Transaction_GetType)
+        register("AntShares.Transaction.GetAttributes", cls.Transaction_GetAttributes)
+        register("AntShares.Transaction.GetInputs", cls.Transaction_GetInputs)
+        register("AntShares.Transaction.GetOutpus", cls.Transaction_GetOutputs)
+        register("AntShares.Transaction.GetReferences", cls.Transaction_GetReferences)
+
+        register("AntShares.Attribute.GetData", cls.Attribute_GetData)
+        register("AntShares.Attribute.GetUsage", cls.Attribute_GetUsage)
+
+        register("AntShares.Input.GetHash", cls.Input_GetHash)
+        register("AntShares.Input.GetIndex", cls.Input_GetIndex)
+
+        register("AntShares.Output.GetAssetId", cls.Output_GetAssetId)
+        register("AntShares.Output.GetValue", cls.Output_GetValue)
+        register("AntShares.Output.GetScriptHash", cls.Output_GetScriptHash)
+
+        register("AntShares.Account.GetVotes", cls.Account_GetVotes)
+        register("AntShares.Account.GetBalance", cls.Account_GetBalance)
+        register("AntShares.Account.GetScriptHash", cls.Account_GetScriptHash)
+
+        register("AntShares.Asset.GetAssetId", cls.Asset_GetAssetId)
+        register("AntShares.Asset.GetAssetType", cls.Asset_GetAssetType)
+        register("AntShares.Asset.GetAmount", cls.Asset_GetAmount)
+        register("AntShares.Asset.GetAvailable", cls.Asset_GetAvailable)
+        register("AntShares.Asset.GetPrecision", cls.Asset_GetPrecision)
+        register("AntShares.Asset.GetOwner", cls.Asset_GetOwner)
+        register("AntShares.Asset.GetAdmin", cls.Asset_GetAdmin)
+        register("AntShares.Asset.GetIssuer", cls.Asset_GetIssuer)
+
+        register("AntShares.Contract.GetScript", cls.Contract_GetScript)
+
+        register("AntShares.Storage.GetContext", cls.Storage_GetContext)
+        register("AntShares.Storage.Get", cls.Storage_Get)
 
     def ExecutionCompleted(self, engine, success, error=None):
 
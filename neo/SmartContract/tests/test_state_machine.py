@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+
+import plyvel
+
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Core.Blockchain import Blockchain
+from neo.Core.State.AccountState import AccountState
+from neo.Core.State.AssetState import AssetState
+from neo.Core.State.ContractState import ContractState, ContractPropertyState
+from neo.Core.State.StorageItem import StorageItem
+from neo.Core.State.ValidatorState import ValidatorState
+from neo.Core.FunctionCode import FunctionCode
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.SmartContract.StateMachine import StateMachine
+from neo.SmartContract.StorageContext import StorageContext
+from neo.VM.InteropService import StackItem
+from neo.VM.RandomAccessStack import RandomAccessStack
+
+
+class StubChain():
+    Height = 1
+
+
+class Engine():
+    """ The parts of an engine used by the storage and contract services """
+
+    def __init__(self, *items):
+        self.EvaluationStack = RandomAccessStack()
+        for item in items:
+            self.EvaluationStack.PushT(item)
+        self.ScriptContainer = None
+        self.testMode = False
+
+
+class StateMachineTestCase(NeoTestCase):
+
+    def setUp(self):
+        self._path = tempfile.mkdtemp()
+        self._db = plyvel.DB(self._path, create_if_missing=True)
+
+        self._default_chain = Blockchain.Default()
+        Blockchain.DeregisterBlockchain()
+        Blockchain.RegisterBlockchain(StubChain())
+
+        code = FunctionCode(script=b'\x51\x66', param_list=bytearray(b'\x07\x10'), return_type=5)
+        self.contract = ContractState(code=code, contract_properties=ContractPropertyState.HasStorage,
+                                      name='test', version='1', author='neo', email='', description='')
+        self.script_hash = code.ScriptHash()
+        self.contracts = self._collection(DBPrefix.ST_Contract, ContractState)
+        self.contracts.Add(self.script_hash.ToBytes(), self.contract)
+        self.contracts.Commit(None, destroy=False)
+
+    def tearDown(self):
+        Blockchain.DeregisterBlockchain()
+        if self._default_chain is not None:
+            Blockchain.RegisterBlockchain(self._default_chain)
+        self._db.close()
+        shutil.rmtree(self._path)
+
+    def _collection(self, prefix, class_ref):
+        return DBCollection(self._db, self._db.snapshot(), prefix, class_ref)
+
+    def test_later_transaction_reads_earlier_writes_of_block(self):
+        # the collections of one block, as set up by LevelDBBlockchain.Persist
+        accounts = self._collection(DBPrefix.ST_Account, AccountState)
+        validators = self._collection(DBPrefix.ST_Validator, ValidatorState)
+        assets = self._collection(DBPrefix.ST_Asset, AssetState)
+        storages = self._collection(DBPrefix.ST_Storage, StorageItem)
+        context = StackItem.FromInterface(StorageContext(script_hash=self.script_hash))
+
+        with self._db.write_batch(transaction=True) as wb:
+            first = StateMachine(accounts, validators, assets, self.contracts, storages, wb)
+            self.assertTrue(first.Storage_Put(Engine(b'value', b'key', context)))
+            first.Commit()
+
+            second = StateMachine(accounts, validators, assets, self.contracts, storages, wb)
+            engine = Engine(b'key', context)
+            self.assertTrue(second.Storage_Get(engine))
+            self.assertEqual(engine.EvaluationStack.Pop().GetByteArray(), b'value')
+
+            engine = Engine(self.script_hash.Data)
+            self.assertTrue(second.Blockchain_GetContract(engine))
+            self.assertIs(engine.EvaluationStack.Pop().GetInterface(), self.contract)
+
+            # nothing reaches the database before the block is written
+            self.assertEqual(list(self._db.iterator(prefix=DBPrefix.ST_Storage)), [])
+
+        engine = Engine(b'key', context)
+        storages = self._collection(DBPrefix.ST_Storage, StorageItem)
+        StateMachine(accounts, validators, assets, self.contracts, storages, None).Storage_Get(engine)
+        self.assertEqual(engine.EvaluationStack.Pop().GetByteArray(), b'value')
@@ -1,5 +1,4 @@
-from neo.IO.MemoryStream import MemoryStream, StreamManager
-from neocore.IO.BinaryReader import BinaryReader
+from neo.VM.InstructionCache import InstructionCache, DecodedScript
 
 
 class ExecutionContext():
@@ -10,15 +9,13 @@ class ExecutionContext():
 
     PushOnly = False
 
-    __OpReader = None
-
-    __mstream = None
+    CurrentInstruction = None
 
     __Breakpoints = None
 
-    @property
-    def OpReader(self):
-        return self.__OpReader
+    _code = None
+
+    _ip = 0
 
     @property
     def Breakpoints(self):
@@ -26,14 +23,40 @@ class ExecutionContext():
 
     @property
     def InstructionPointer(self):
-        return self.__OpReader.stream.tell()
+        return self._ip
 
     def SetInstructionPointer(self, value):
-        self.__OpReader.stream.seek(value)
+        self._ip = value
 
     @property
     def NextInstruction(self):
-        return self.Script[self.__OpReader.stream.tell()].to_bytes(1, 'little')
+        return self.Script[self._ip].to_bytes(1, 'little')
+
+    @property
+    def Operand(self):
+        """
+        Get the operand of the instruction last read by `ReadInstruction`.
+
+        Raises:
+            Exception: the error of reading an operand truncated by the end of the script.
+        """
+        instruction = self.CurrentInstruction
+        if instruction.Error is not None:
+            raise instruction.Error
+        return instruction.Operand
+
+    @property
+    def JumpTarget(self):
+        """
+        Get the absolute offset the jump or CALL last read by `ReadInstruction` branches to.
+
+        Raises:
+            Exception: the error of reading an offset truncated by the end of the script.
+        """
+        instruction = self.CurrentInstruction
+        if instruction.Error is not None:
+            raise instruction.Error
+        return instruction.Target
 
     _script_hash = None
 
@@ -42,21 +65,48 @@ class ExecutionContext():
             self._script_hash = self._Engine.Crypto.Hash160(self.Script)
         return self._script_hash
 
-    def __init__(self, engine=None, script=None, push_only=False, break_points=set()):
+    def __init__(self, engine=None, script=None, push_only=False, break_points=set(), code=None):
         self._Engine = engine
         self.Script = script
         self.PushOnly = push_only
         self.__Breakpoints = break_points
-        self.__mstream = StreamManager.GetStream(self.Script)
-        self.__OpReader = BinaryReader(self.__mstream)
+
+        if code is None:
+            if engine is not None and engine.Crypto is not None:
+                code = InstructionCache.Default().Get(self.ScriptHash(), script)
+            else:
+                code = DecodedScript(script)
+        self._code = code
+
+    def ReadInstruction(self):
+        """
+        Read the instruction at the instruction pointer and move the pointer past its operand.
+
+        Returns:
+            bytes: the opcode. The decoded instruction is available as `CurrentInstruction`.
+        """
+        instruction = self._code.GetInstruction(self._ip)
+        self.CurrentInstruction = instruction
+        self._ip = instruction.NextOffset
+        return instruction.OpCode
+
+    def GetInstruction(self, offset):
+        """
+        Get the decoded instruction at `offset`, lower than the script length.
+
+        Returns:
+            Instruction:
+        """
+        return self._code.GetInstruction(offset)
 
     def Clone(self):
 
-        context = ExecutionContext(self._Engine, self.Script, self.PushOnly, self.__Breakpoints)
+        context = ExecutionContext(self._Engine, self.Script, self.PushOnly, self.__Breakpoints, self._code)
+        context._script_hash = self._script_hash
+        context.CurrentInstruction = self.CurrentInstruction
         context.SetInstructionPointer(self.InstructionPointer)
 
         return context
 
     def Dispose(self):
-        self.__OpReader = None
-        StreamManager.ReleaseStream(self.__mstream)
+        self._code = None
@@ -1,4 +1,5 @@
 import hashlib
+import operator
 import sys
 import os
 import traceback
@@ -15,6 +16,10 @@ from neocore.BigInteger import BigInteger
 from neo.VM.InteropService import Array, Struct, StackItem
 from neocore.UInt160 import UInt160
 
+PUSH1_INT = PUSH1[0]
+PUSH16_INT = PUSH16[0]
+RET_INT = RET[0]
+
 
 class ExecutionEngine():
 
@@ -32,6 +37,9 @@ class ExecutionEngine():
 
     _ExecutedScriptHashes = None
 
+    # handler per opcode integer, see _BuildOpTable
+    _OpTable = None
+
     ops_processed = 0
 
     @property
@@ -102,686 +110,687 @@ class ExecutionEngine():
             self.StepInto()
 
     def ExecuteOp(self, opcode, context):
-        estack = self._EvaluationStack
-        istack = self._InvocationStack
-        astack = self._AltStack
+        op = opcode[0]
 
-        if opcode > PUSH16 and opcode != RET and context.PushOnly:
+        if op > PUSH16_INT and op != RET_INT and context.PushOnly:
             self._VMState |= VMState.FAULT
 
-        if opcode >= PUSHBYTES1 and opcode <= PUSHBYTES75:
-            bytestoread = context.OpReader.ReadBytes(int.from_bytes(opcode, 'little'))
-            estack.PushT(bytestoread)
-        else:
-
-            # push values
-            pushops = [PUSHM1, PUSH1, PUSH2, PUSH3, PUSH4, PUSH5, PUSH6, PUSH7, PUSH8,
-                       PUSH9, PUSH10, PUSH11, PUSH12, PUSH13, PUSH14, PUSH15, PUSH16]
-
-            if opcode == PUSH0:
-                estack.PushT(bytearray(0))
-
-            elif opcode == PUSHDATA1:
-                lenngth = context.OpReader.ReadByte()
-                estack.PushT(bytearray(context.OpReader.ReadBytes(lenngth)))
-            elif opcode == PUSHDATA2:
-                estack.PushT(context.OpReader.ReadBytes(context.OpReader.ReadUInt16()))
-            elif opcode == PUSHDATA4:
-                estack.PushT(context.OpReader.ReadBytes(context.OpReader.ReadUInt32()))
-            elif opcode in pushops:
-                # EvaluationStack.Push((int)opcode - (int)OpCode.PUSH1 + 1);
-                topush = int.from_bytes(opcode, 'little') - int.from_bytes(PUSH1, 'little') + 1
-                estack.PushT(topush)
-
-            # control
-            elif opcode == NOP:
-                pass
-            elif opcode in [JMP, JMPIF, JMPIFNOT]:
-                offset_b = context.OpReader.ReadInt16()
-                offset = context.InstructionPointer + offset_b - 3
-
-                if offset < 0 or offset > len(context.Script):
-                    self._VMState |= VMState.FAULT
-                    return
-
-                fValue = True
-                if opcode > JMP:
-                    fValue = estack.Pop().GetBoolean()
-                    if opcode == JMPIFNOT:
-                        fValue = not fValue
-                if fValue:
-                    context.SetInstructionPointer(offset)
-
-            elif opcode == CALL:
-                istack.PushT(context.Clone())
-                context.SetInstructionPointer(context.InstructionPointer + 2)
-
-                self.ExecuteOp(JMP, self.CurrentContext)
-
-            elif opcode == RET:
-                istack.Pop().Dispose()
-                if istack.Count == 0:
-                    self._VMState |= VMState.HALT
-
-            elif opcode == APPCALL or opcode == TAILCALL:
-                if self._Table is None:
-                    self._VMState |= VMState.FAULT
-                    return
-
-                script_hash = context.OpReader.ReadBytes(20)
-
-                is_normal_call = False
-                for b in script_hash:
-                    if b > 0:
-                        is_normal_call = True
-
-                if not is_normal_call:
-                    script_hash = self.EvaluationStack.Pop().GetByteArray()
-
-                script = self._Table.GetScript(UInt160(data=script_hash).ToBytes())
-
-                if script is None:
-                    logger.error("Could not find script from script table: %s " % script_hash)
-                    self._VMState |= VMState.FAULT
-                    return
-
-                if opcode == TAILCALL:
-                    istack.Pop().Dispose()
-
-                self.LoadScript(script)
-
-            elif opcode == SYSCALL:
-                call = context.OpReader.ReadVarBytes(252).decode('ascii')
-                if not self._Service.Invoke(call, self):
-                    self._VMState |= VMState.FAULT
-
-            # stack operations
-            elif opcode == DUPFROMALTSTACK:
-                estack.PushT(astack.Peek())
-
-            elif opcode == TOALTSTACK:
-                astack.PushT(estack.Pop())
-
-            elif opcode == FROMALTSTACK:
-                estack.PushT(astack.Pop())
-
-            elif opcode == XDROP:
-                n = estack.Pop().GetBigInteger()
-                if n < 0:
-                    self._VMState |= VMState.FAULT
-                    return
-                estack.Remove(n)
-
-            elif opcode == XSWAP:
-                n = estack.Pop().GetBigInteger()
-
-                if n < 0:
-                    self._VMState |= VMState.FAULT
-                    return
-
-                # if n == 0 break, same as do x if n > 0
-                if n > 0:
-
-                    item = estack.Peek(n)
-                    estack.Set(n, estack.Peek())
-                    estack.Set(0, item)
-
-            elif opcode == XTUCK:
-                n = estack.Pop().GetBigInteger()
-
-                if n <= 0:
-                    self._VMState |= VMState.FAULT
-                    return
-
-                estack.Insert(n, estack.Peek())
-
-            elif opcode == DEPTH:
-                estack.PushT(estack.Count)
-
-            elif opcode == DROP:
-                estack.Pop()
-
-            elif opcode == DUP:
-                estack.PushT(estack.Peek())
-
-            elif opcode == NIP:
-                x2 = estack.Pop()
-                estack.Pop()
-                estack.PushT(x2)
-
-            elif opcode == OVER:
-
-                x2 = estack.Pop()
-                x1 = estack.Peek()
-                estack.PushT(x2)
-                estack.PushT(x1)
-
-            elif opcode == PICK:
-
-                n = estack.Pop().GetBigInteger()
-                if n < 0:
-                    self._VMState |= VMState.FAULT
-                    return
-
-                estack.PushT(estack.Peek(n))
-
-            elif opcode == ROLL:
-
-                n = estack.Pop().GetBigInteger()
-                if n < 0:
-                    self._VMState |= VMState.FAULT
-                    return
-
-                if n > 0:
-                    estack.PushT(estack.Remove(n))
-
-            elif opcode == ROT:
-                x3 = estack.Pop()
-                x2 = estack.Pop()
-                x1 = estack.Pop()
-
-                estack.PushT(x2)
-                estack.PushT(x3)
-                estack.PushT(x1)
-
-            elif opcode == SWAP:
-
-                x2 = estack.Pop()
-                x1 = estack.Pop()
-                estack.PushT(x2)
-                estack.PushT(x1)
-
-            elif opcode == TUCK:
-
-                x2 = estack.Pop()
-                x1 = estack.Pop()
-                estack.PushT(x2)
-                estack.PushT(x1)
-                estack.PushT(x2)
-
-            elif opcode == CAT:
-
-                x2 = estack.Pop().GetByteArray()
-                x1 = estack.Pop().GetByteArray()
-                estack.PushT(x1 + x2)
-
-            elif opcode == SUBSTR:
-
-                count = estack.Pop().GetBigInteger()
-                if count < 0:
-                    self._VMState |= VMState.FAULT
-                    return
-
-                index = estack.Pop().GetBigInteger()
-                if index < 0:
-                    self._VMState |= VMState.FAULT
-                    return
-
-                x = estack.Pop().GetByteArray()
-
-                estack.PushT(x[index:count + index])
-
-            elif opcode == LEFT:
-
-                count = estack.Pop().GetBigInteger()
-                if count < 0:
-                    self._VMState |= VMState.FAULT
-                    return
-
-                x = estack.Pop().GetByteArray()
-                estack.PushT(x[:count])
-
-            elif opcode == RIGHT:
-
-                count = estack.Pop().GetBigInteger()
-                if count < 0:
-                    self._VMState |= VMState.FAULT
-                    return
-
-                x = estack.Pop().GetByteArray()
-                if len(x) < count:
-                    self._VMState |= VMState.FAULT
-                    return
-
-                estack.PushT(x[-count:])
-
-            elif opcode == SIZE:
-
-                x = estack.Pop().GetByteArray()
-                estack.PushT(len(x))
-
-            elif opcode == INVERT:
-
-                x = estack.Pop().GetBigInteger()
-                estack.PushT(~x)
-
-            elif opcode == AND:
-
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
-                estack.PushT(x1 & x2)
-
-            elif opcode == OR:
-
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
-
-                estack.PushT(x1 | x2)
-
-            elif opcode == XOR:
-
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
-
-                estack.PushT(x1 ^ x2)
-
-            elif opcode == EQUAL:
-                x2 = estack.Pop()
-                x1 = estack.Pop()
-                estack.PushT(x1.Equals(x2))
-
-            # numeric
-
-            elif opcode == INC:
-
-                x = estack.Pop().GetBigInteger()
-                estack.PushT(x + 1)
-
-            elif opcode == DEC:
-
-                x = estack.Pop().GetBigInteger()
-                estack.PushT(x - 1)
-
-            elif opcode == SIGN:
-
-                # Make sure to implement sign for big integer
-                x = estack.Pop().GetBigInteger()
-                estack.PushT(x.Sign)
-
-            elif opcode == NEGATE:
-
-                x = estack.Pop().GetBigInteger()
-                estack.PushT(-x)
-
-            elif opcode == ABS:
-
-                x = estack.Pop().GetBigInteger()
-                estack.PushT(abs(x))
-
-            elif opcode == NOT:
-
-                x = estack.Pop().GetBigInteger()
-                estack.PushT(not x)
+        handler = self._OpTable[op]
+        if handler is None:
+            self._VMState |= VMState.FAULT
+            return
 
-            elif opcode == NZ:
+        handler(self, opcode, context)
 
-                x = estack.Pop().GetBigInteger()
-                estack.PushT(x is not 0)
+        if self._VMState & VMState.FAULT == 0 and self.InvocationStack.Count > 0:
 
-            elif opcode == ADD:
+            if self.CurrentContext.InstructionPointer in self.CurrentContext.Breakpoints:
+                self._VMState |= VMState.BREAK
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
-                estack.PushT(x1 + x2)
+    @classmethod
+    def _BuildOpTable(cls):
+        """
+        Build the dispatch table of the engine class, indexed by opcode integer.
+
+        Handlers are looked up by name on the class, so subclasses can override single opcodes.
+
+        Returns:
+            list: 256 entries of `handler(engine, opcode, context)`, or None for invalid opcodes.
+        """
+        table = [None] * 256
+
+        def register(opcodes, handler):
+            for opcode in opcodes:
+                table[opcode[0]] = handler
+
+        for op in range(PUSHBYTES1[0], PUSHBYTES75[0] + 1):
+            table[op] = cls._OpPushBytes
+        register([PUSHM1] + [bytes([op]) for op in range(PUSH1[0], PUSH16[0] + 1)], cls._OpPushNumber)
+
+        handlers = {
+            PUSH0: cls._OpPush0,
+            PUSHDATA1: cls._OpPushData1,
+            PUSHDATA2: cls._OpPushData2,
+            PUSHDATA4: cls._OpPushData4,
+
+            NOP: cls._OpNop,
+            JMP: cls._OpJmp,
+            JMPIF: cls._OpJmp,
+            JMPIFNOT: cls._OpJmp,
+            CALL: cls._OpCall,
+            RET: cls._OpRet,
+            APPCALL: cls._OpAppCall,
+            TAILCALL: cls._OpAppCall,
+            SYSCALL: cls._OpSysCall,
+
+            DUPFROMALTSTACK: cls._OpDupFromAltStack,
+            TOALTSTACK: cls._OpToAltStack,
+            FROMALTSTACK: cls._OpFromAltStack,
+            XDROP: cls._OpXDrop,
+            XSWAP: cls._OpXSwap,
+            XTUCK: cls._OpXTuck,
+            DEPTH: cls._OpDepth,
+            DROP: cls._OpDrop,
+            DUP: cls._OpDup,
+            NIP: cls._OpNip,
+            OVER: cls._OpOver,
+            PICK: cls._OpPick,
+            ROLL: cls._OpRoll,
+            ROT: cls._OpRot,
+            SWAP: cls._OpSwap,
+            TUCK: cls._OpTuck,
+
+            CAT: cls._OpCat,
+            SUBSTR: cls._OpSubStr,
+            LEFT: cls._OpLeft,
+            RIGHT: cls._OpRight,
+            SIZE: cls._OpSize,
+
+            EQUAL: cls._OpEqual,
+
+            SHA1: cls._OpSha1,
+            SHA256: cls._OpSha256,
+            HASH160: cls._OpHash160,
+            HASH256: cls._OpHash256,
+            CHECKSIG: cls._OpCheckSig,
+            CHECKMULTISIG: cls._OpCheckMultiSig,
+
+            ARRAYSIZE: cls._OpArraySize,
+            PACK: cls._OpPack,
+            UNPACK: cls._OpUnpack,
+            PICKITEM: cls._OpPickItem,
+            SETITEM: cls._OpSetItem,
+            NEWARRAY: cls._OpNewArray,
+            NEWSTRUCT: cls._OpNewStruct,
+            APPEND: cls._OpAppend,
+            REVERSE: cls._OpReverse,
+            REMOVE: cls._OpRemove,
+
+            THROW: cls._OpThrow,
+            THROWIFNOT: cls._OpThrowIfNot,
+            DEBUG: cls._OpDebug,
+        }
+
+        # x = estack.Pop().GetBigInteger(); estack.PushT(func(x))
+        unary_integer_ops = {
+            INVERT: operator.invert,
+            INC: lambda x: x + 1,
+            DEC: lambda x: x - 1,
+            SIGN: lambda x: x.Sign,
+            NEGATE: operator.neg,
+            ABS: abs,
+            NOT: operator.not_,
+            NZ: lambda x: x is not 0,
+        }
+
+        # x2 = estack.Pop().GetBigInteger(); x1 = estack.Pop().GetBigInteger(); estack.PushT(func(x1, x2))
+        binary_integer_ops = {
+            AND: operator.and_,
+            OR: operator.or_,
+            XOR: operator.xor,
+            ADD: operator.add,
+            SUB: operator.sub,
+            MUL: operator.mul,
+            DIV: operator.truediv,
+            MOD: operator.mod,
+            SHL: operator.lshift,
+            SHR: operator.rshift,
+            NUMEQUAL: lambda x1, x2: x2 == x1,
+            NUMNOTEQUAL: operator.ne,
+            LT: operator.lt,
+            GT: operator.gt,
+            LTE: operator.le,
+            GTE: operator.ge,
+            MIN: min,
+            MAX: max,
+        }
+
+        for opcode, handler in handlers.items():
+            register([opcode], handler)
+        for opcode, func in unary_integer_ops.items():
+            register([opcode], cls._UnaryIntegerOp(func))
+        for opcode, func in binary_integer_ops.items():
+            register([opcode], cls._BinaryIntegerOp(func))
+        register([BOOLAND], cls._BinaryBooleanOp(lambda x1, x2: x1 and x2))
+        register([BOOLOR], cls._BinaryBooleanOp(lambda x1, x2: x1 or x2))
+        register([WITHIN], cls._OpWithin)
+
+        return table
+
+    def __init_subclass__(cls, **kwargs):
+        super(ExecutionEngine, cls).__init_subclass__(**kwargs)
+        cls._OpTable = cls._BuildOpTable()
+
+    @staticmethod
+    def _UnaryIntegerOp(func):
+        def handler(self, opcode, context):
+            x = self._EvaluationStack.Pop().GetBigInteger()
+            self._EvaluationStack.PushT(func(x))
+        return handler
+
+    @staticmethod
+    def _BinaryIntegerOp(func):
+        def handler(self, opcode, context):
+            estack = self._EvaluationStack
+            x2 = estack.Pop().GetBigInteger()
+            x1 = estack.Pop().GetBigInteger()
+            estack.PushT(func(x1, x2))
+        return handler
+
+    @staticmethod
+    def _BinaryBooleanOp(func):
+        def handler(self, opcode, context):
+            estack = self._EvaluationStack
+            x2 = estack.Pop().GetBoolean()
+            x1 = estack.Pop().GetBoolean()
+            estack.PushT(func(x1, x2))
+        return handler
+
+    # push values
+
+    def _OpPushBytes(self, opcode, context):
+        self._EvaluationStack.PushT(context.Operand)
+
+    def _OpPush0(self, opcode, context):
+        self._EvaluationStack.PushT(bytearray(0))
+
+    def _OpPushData1(self, opcode, context):
+        self._EvaluationStack.PushT(bytearray(context.Operand))
+
+    def _OpPushData2(self, opcode, context):
+        self._EvaluationStack.PushT(context.Operand)
+
+    def _OpPushData4(self, opcode, context):
+        self._EvaluationStack.PushT(context.Operand)
+
+    def _OpPushNumber(self, opcode, context):
+        # EvaluationStack.Push((int)opcode - (int)OpCode.PUSH1 + 1);
+        self._EvaluationStack.PushT(opcode[0] - PUSH1_INT + 1)
+
+    # control
+
+    def _OpNop(self, opcode, context):
+        pass
+
+    def _OpJmp(self, opcode, context):
+        offset = context.JumpTarget
+
+        if offset < 0 or offset > len(context.Script):
+            self._VMState |= VMState.FAULT
+            return
 
-            elif opcode == SUB:
+        fValue = True
+        if opcode > JMP:
+            fValue = self._EvaluationStack.Pop().GetBoolean()
+            if opcode == JMPIFNOT:
+                fValue = not fValue
+        if fValue:
+            context.SetInstructionPointer(offset)
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    def _OpCall(self, opcode, context):
+        # the clone shares the decoded CALL, whose operand is the jump offset
+        self._InvocationStack.PushT(context.Clone())
 
-                estack.PushT(x1 - x2)
+        self.ExecuteOp(JMP, self.CurrentContext)
 
-            elif opcode == MUL:
+    def _OpRet(self, opcode, context):
+        istack = self._InvocationStack
+        istack.Pop().Dispose()
+        if istack.Count == 0:
+            self._VMState |= VMState.HALT
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    def _OpAppCall(self, opcode, context):
+        if self._Table is None:
+            self._VMState |= VMState.FAULT
+            return
 
-                estack.PushT(x1 * x2)
+        script_hash = context.Operand
 
-            elif opcode == DIV:
+        is_normal_call = False
+        for b in script_hash:
+            if b > 0:
+                is_normal_call = True
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+        if not is_normal_call:
+            script_hash = self.EvaluationStack.Pop().GetByteArray()
 
-                estack.PushT(x1 / x2)
+        script = self._Table.GetScript(UInt160(data=script_hash).ToBytes())
 
-            elif opcode == MOD:
+        if script is None:
+            logger.error("Could not find script from script table: %s " % script_hash)
+            self._VMState |= VMState.FAULT
+            return
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+        if opcode == TAILCALL:
+            self._InvocationStack.Pop().Dispose()
 
-                estack.PushT(x1 % x2)
+        self.LoadScript(script)
 
-            elif opcode == SHL:
+    def _OpSysCall(self, opcode, context):
+        call = context.Operand
+        if type(call) is int:
+            success = self._Service.InvokeById(call, self)
+        else:
+            success = self._Service.Invoke(call, self)
+        if not success:
+            self._VMState |= VMState.FAULT
 
-                n = estack.Pop().GetBigInteger()
-                x = estack.Pop().GetBigInteger()
+    # stack operations
 
-                estack.PushT(x << n)
+    def _OpDupFromAltStack(self, opcode, context):
+        self._EvaluationStack.Push(self._AltStack.Peek())
 
-            elif opcode == SHR:
+    def _OpToAltStack(self, opcode, context):
+        self._AltStack.Push(self._EvaluationStack.Pop())
 
-                n = estack.Pop().GetBigInteger()
-                x = estack.Pop().GetBigInteger()
+    def _OpFromAltStack(self, opcode, context):
+        self._EvaluationStack.Push(self._AltStack.Pop())
 
-                estack.PushT(x >> n)
+    def _OpXDrop(self, opcode, context):
+        estack = self._EvaluationStack
+        n = estack.Pop().GetBigInteger()
+        if n < 0:
+            self._VMState |= VMState.FAULT
+            return
+        estack.Remove(n)
 
-            elif opcode == BOOLAND:
+    def _OpXSwap(self, opcode, context):
+        estack = self._EvaluationStack
+        n = estack.Pop().GetBigInteger()
 
-                x2 = estack.Pop().GetBoolean()
-                x1 = estack.Pop().GetBoolean()
+        if n < 0:
+            self._VMState |= VMState.FAULT
+            return
 
-                estack.PushT(x1 and x2)
+        # if n == 0 break, same as do x if n > 0
+        if n > 0:
 
-            elif opcode == BOOLOR:
+            item = estack.Peek(n)
+            estack.Set(n, estack.Peek())
+            estack.Set(0, item)
 
-                x2 = estack.Pop().GetBoolean()
-                x1 = estack.Pop().GetBoolean()
+    def _OpXTuck(self, opcode, context):
+        estack = self._EvaluationStack
+        n = estack.Pop().GetBigInteger()
 
-                estack.PushT(x1 or x2)
+        if n <= 0:
+            self._VMState |= VMState.FAULT
+            return
 
-            elif opcode == NUMEQUAL:
+        estack.Insert(n, estack.Peek())
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    def _OpDepth(self, opcode, context):
+        estack = self._EvaluationStack
+        estack.PushT(estack.Count)
 
-                estack.PushT(x2 == x1)
+    def _OpDrop(self, opcode, context):
+        self._EvaluationStack.Pop()
 
-            elif opcode == NUMNOTEQUAL:
+    def _OpDup(self, opcode, context):
+        estack = self._EvaluationStack
+        estack.Push(estack.Peek())
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    def _OpNip(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop()
+        estack.Pop()
+        estack.Push(x2)
 
-                estack.PushT(x1 != x2)
+    def _OpOver(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop()
+        x1 = estack.Peek()
+        estack.Push(x2)
+        estack.Push(x1)
 
-            elif opcode == LT:
+    def _OpPick(self, opcode, context):
+        estack = self._EvaluationStack
+        n = estack.Pop().GetBigInteger()
+        if n < 0:
+            self._VMState |= VMState.FAULT
+            return
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+        estack.Push(estack.Peek(n))
 
-                estack.PushT(x1 < x2)
+    def _OpRoll(self, opcode, context):
+        estack = self._EvaluationStack
+        n = estack.Pop().GetBigInteger()
+        if n < 0:
+            self._VMState |= VMState.FAULT
+            return
 
-            elif opcode == GT:
+        if n > 0:
+            estack.Push(estack.Remove(n))
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    def _OpRot(self, opcode, context):
+        estack = self._EvaluationStack
+        x3 = estack.Pop()
+        x2 = estack.Pop()
+        x1 = estack.Pop()
 
-                estack.PushT(x1 > x2)
+        estack.Push(x2)
+        estack.Push(x3)
+        estack.Push(x1)
 
-            elif opcode == LTE:
+    def _OpSwap(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop()
+        x1 = estack.Pop()
+        estack.Push(x2)
+        estack.Push(x1)
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    def _OpTuck(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop()
+        x1 = estack.Pop()
+        estack.Push(x2)
+        estack.Push(x1)
+        estack.Push(x2)
 
-                estack.PushT(x1 <= x2)
+    # splice
 
-            elif opcode == GTE:
+    def _OpCat(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop().GetByteArray()
+        x1 = estack.Pop().GetByteArray()
+        estack.PushT(x1 + x2)
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+    def _OpSubStr(self, opcode, context):
+        estack = self._EvaluationStack
+        count = estack.Pop().GetBigInteger()
+        if count < 0:
+            self._VMState |= VMState.FAULT
+            return
 
-                estack.PushT(x1 >= x2)
+        index = estack.Pop().GetBigInteger()
+        if index < 0:
+            self._VMState |= VMState.FAULT
+            return
 
-            elif opcode == MIN:
+        x = estack.Pop().GetByteArray()
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
-                estack.PushT(min(x1, x2))
+        estack.PushT(x[index:count + index])
 
-            elif opcode == MAX:
+    def _OpLeft(self, opcode, context):
+        estack = self._EvaluationStack
+        count = estack.Pop().GetBigInteger()
+        if count < 0:
+            self._VMState |= VMState.FAULT
+            return
 
-                x2 = estack.Pop().GetBigInteger()
-                x1 = estack.Pop().GetBigInteger()
+        x = estack.Pop().GetByteArray()
+        estack.PushT(x[:count])
 
-                estack.PushT(max(x1, x2))
+    def _OpRight(self, opcode, context):
+        estack = self._EvaluationStack
+        count = estack.Pop().GetBigInteger()
+        if count < 0:
+            self._VMState |= VMState.FAULT
+            return
 
-            elif opcode == WITHIN:
+        x = estack.Pop().GetByteArray()
+        if len(x) < count:
+            self._VMState |= VMState.FAULT
+            return
 
-                b = estack.Pop().GetBigInteger()
-                a = estack.Pop().GetBigInteger()
-                x = estack.Pop().GetBigInteger()
+        estack.PushT(x[-count:])
 
-                estack.PushT(a <= x and x < b)
+    def _OpSize(self, opcode, context):
+        estack = self._EvaluationStack
+        x = estack.Pop().GetByteArray()
+        estack.PushT(len(x))
 
-            # CRyPTO
-            elif opcode == SHA1:
-                h = hashlib.sha1(estack.Pop().GetByteArray())
-                estack.PushT(h.digest())
+    def _OpEqual(self, opcode, context):
+        estack = self._EvaluationStack
+        x2 = estack.Pop()
+        x1 = estack.Pop()
+        estack.PushT(x1.Equals(x2))
 
-            elif opcode == SHA256:
-                h = hashlib.sha256(estack.Pop().GetByteArray())
-                estack.PushT(h.digest())
+    # numeric
 
-            elif opcode == HASH160:
+    def _OpWithin(self, opcode, context):
+        estack = self._EvaluationStack
+        b = estack.Pop().GetBigInteger()
+        a = estack.Pop().GetBigInteger()
+        x = estack.Pop().GetBigInteger()
 
-                estack.PushT(self.Crypto.Hash160(estack.Pop().GetByteArray()))
+        estack.PushT(a <= x and x < b)
 
-            elif opcode == HASH256:
+    # crypto
 
-                estack.PushT(self.Crypto.Hash256(estack.Pop().GetByteArray()))
+    def _OpSha1(self, opcode, context):
+        estack = self._EvaluationStack
+        h = hashlib.sha1(estack.Pop().GetByteArray())
+        estack.PushT(h.digest())
 
-            elif opcode == CHECKSIG:
+    def _OpSha256(self, opcode, context):
+        estack = self._EvaluationStack
+        h = hashlib.sha256(estack.Pop().GetByteArray())
+        estack.PushT(h.digest())
 
-                pubkey = estack.Pop().GetByteArray()
-                sig = estack.Pop().GetByteArray()
+    def _OpHash160(self, opcode, context):
+        estack = self._EvaluationStack
+        estack.PushT(self.Crypto.Hash160(estack.Pop().GetByteArray()))
 
-                try:
+    def _OpHash256(self, opcode, context):
+        estack = self._EvaluationStack
+        estack.PushT(self.Crypto.Hash256(estack.Pop().GetByteArray()))
 
-                    res = self.Crypto.VerifySignature(self.ScriptContainer.GetMessage(), sig, pubkey)
-                    estack.PushT(res)
+    def _OpCheckSig(self, opcode, context):
+        estack = self._EvaluationStack
+        pubkey = estack.Pop().GetByteArray()
+        sig = estack.Pop().GetByteArray()
 
-                except Exception as e:
-                    estack.PushT(False)
-                    logger.error("Could not checksig: %s " % e)
+        try:
 
-            elif opcode == CHECKMULTISIG:
+            res = self.Crypto.VerifySignature(self.ScriptContainer.GetMessage(), sig, pubkey)
+            estack.PushT(res)
 
-                n = estack.Pop().GetBigInteger()
+        except Exception as e:
+            estack.PushT(False)
+            logger.error("Could not checksig: %s " % e)
 
-                if n < 1:
-                    self._VMState |= VMState.FAULT
-                    return
+    def _OpCheckMultiSig(self, opcode, context):
+        estack = self._EvaluationStack
+        n = estack.Pop().GetBigInteger()
 
-                pubkeys = []
-                for i in range(0, n):
-                    pubkeys.append(estack.Pop().GetByteArray())
+        if n < 1:
+            self._VMState |= VMState.FAULT
+            return
 
-                m = estack.Pop().GetBigInteger()
+        pubkeys = []
+        for i in range(0, n):
+            pubkeys.append(estack.Pop().GetByteArray())
 
-                if m < 1 or m > n:
-                    self._VMState |= VMState.FAULT
-                    return
+        m = estack.Pop().GetBigInteger()
 
-                sigs = []
+        if m < 1 or m > n:
+            self._VMState |= VMState.FAULT
+            return
 
-                for i in range(0, m):
-                    sigs.append(estack.Pop().GetByteArray())
+        sigs = []
 
-                message = self.ScriptContainer.GetMessage() if self.ScriptContainer else ''
+        for i in range(0, m):
+            sigs.append(estack.Pop().GetByteArray())
 
-                fSuccess = True
+        message = self.ScriptContainer.GetMessage() if self.ScriptContainer else ''
 
-                try:
+        fSuccess = True
 
-                    i = 0
-                    j = 0
+        try:
 
-                    while fSuccess and i < m and j < n:
+            i = 0
+            j = 0
 
-                        if self.Crypto.VerifySignature(message, sigs[i], pubkeys[j]):
-                            i += 1
-                        j += 1
+            while fSuccess and i < m and j < n:
 
-                        if m - i > n - j:
-                            fSuccess = False
+                if self.Crypto.VerifySignature(message, sigs[i], pubkeys[j]):
+                    i += 1
+                j += 1
 
-                except Exception as e:
+                if m - i > n - j:
                     fSuccess = False
 
-                estack.PushT(fSuccess)
-
-            # lists
-            elif opcode == ARRAYSIZE:
-
-                item = estack.Pop()
-
-                if not item:
-                    self._VMState |= VMState.FAULT
-                    return
-
-                if not item.IsArray:
-                    estack.PushT(len(item.GetByteArray()))
-
-                else:
-                    estack.PushT(len(item.GetArray()))
-
-            elif opcode == PACK:
-
-                size = estack.Pop().GetBigInteger()
+        except Exception as e:
+            fSuccess = False
 
-                if size < 0 or size > estack.Count:
-                    self._VMState |= VMState.FAULT
-                    return
+        estack.PushT(fSuccess)
 
-                items = []
+    # lists
 
-                for i in range(0, size):
-                    topack = estack.Pop()
-                    items.append(topack)
+    def _OpArraySize(self, opcode, context):
+        estack = self._EvaluationStack
+        item = estack.Pop()
 
-                estack.PushT(items)
+        if not item:
+            self._VMState |= VMState.FAULT
+            return
 
-            elif opcode == UNPACK:
-                item = estack.Pop()
+        if not item.IsArray:
+            estack.PushT(len(item.GetByteArray()))
 
-                if not item.IsArray:
-                    self._VMState |= VMState.FAULT
-                    return
+        else:
+            estack.PushT(len(item.GetArray()))
 
-                items = item.GetArray()
-                items.reverse()
+    def _OpPack(self, opcode, context):
+        estack = self._EvaluationStack
+        size = estack.Pop().GetBigInteger()
 
-                [estack.PushT(i) for i in items]
+        if size < 0 or size > estack.Count:
+            self._VMState |= VMState.FAULT
+            return
 
-                estack.PushT(len(items))
+        items = []
 
-            elif opcode == PICKITEM:
+        for i in range(0, size):
+            topack = estack.Pop()
+            items.append(topack)
 
-                index = estack.Pop().GetBigInteger()
-                if index < 0:
-                    self._VMState |= VMState.FAULT
-                    return
+        estack.PushT(items)
 
-                item = estack.Pop()
+    def _OpUnpack(self, opcode, context):
+        estack = self._EvaluationStack
+        item = estack.Pop()
 
-                if not item.IsArray:
-                    self._VMState |= VMState.FAULT
-                    return
+        if not item.IsArray:
+            self._VMState |= VMState.FAULT
+            return
 
-                items = item.GetArray()
+        items = item.GetArray()
+        items.reverse()
 
-                if index >= len(items):
-                    self._VMState |= VMState.FAULT
-                    return
+        [estack.PushT(i) for i in items]
 
-                to_pick = items[index]
+        estack.PushT(len(items))
 
-                estack.PushT(to_pick)
+    def _OpPickItem(self, opcode, context):
+        estack = self._EvaluationStack
+        index = estack.Pop().GetBigInteger()
+        if index < 0:
+            self._VMState |= VMState.FAULT
+            return
 
-            elif opcode == SETITEM:
-                newItem = estack.Pop()
+        item = estack.Pop()
 
-                if issubclass(type(newItem), StackItem) and newItem.IsStruct:
-                    newItem = newItem.Clone()
+        if not item.IsArray:
+            self._VMState |= VMState.FAULT
+            return
 
-                index = estack.Pop().GetBigInteger()
+        items = item.GetArray()
 
-                arrItem = estack.Pop()
+        if index >= len(items):
+            self._VMState |= VMState.FAULT
+            return
 
-                if not issubclass(type(arrItem), StackItem) or not arrItem.IsArray:
-                    self._VMState |= VMState.FAULT
-                    return
+        to_pick = items[index]
 
-                items = arrItem.GetArray()
+        estack.PushT(to_pick)
 
-                if index < 0 or index >= len(items):
-                    self._VMState |= VMState.FAULT
-                    return
+    def _OpSetItem(self, opcode, context):
+        estack = self._EvaluationStack
+        newItem = estack.Pop()
 
-                items[index] = newItem
+        if issubclass(type(newItem), StackItem) and newItem.IsStruct:
+            newItem = newItem.Clone()
 
-            elif opcode == NEWARRAY:
+        index = estack.Pop().GetBigInteger()
 
-                count = estack.Pop().GetBigInteger()
-                items = [None for i in range(0, count)]
-                estack.PushT(Array(items))
+        arrItem = estack.Pop()
 
-            elif opcode == NEWSTRUCT:
+        if not issubclass(type(arrItem), StackItem) or not arrItem.IsArray:
+            self._VMState |= VMState.FAULT
+            return
 
-                count = estack.Pop().GetBigInteger()
+        items = arrItem.GetArray()
 
-                items = [None for i in range(0, count)]
+        if index < 0 or index >= len(items):
+            self._VMState |= VMState.FAULT
+            return
 
-                estack.PushT(Struct(items))
+        items[index] = newItem
 
-            elif opcode == APPEND:
-                newItem = estack.Pop()
+    def _OpNewArray(self, opcode, context):
+        estack = self._EvaluationStack
+        count = estack.Pop().GetBigInteger()
+        items = [None for i in range(0, count)]
+        estack.Push(Array(items))
 
-                if type(newItem) is Struct:
-                    newItem = newItem.Clone()
+    def _OpNewStruct(self, opcode, context):
+        estack = self._EvaluationStack
+        count = estack.Pop().GetBigInteger()
 
-                arrItem = estack.Pop()
+        items = [None for i in range(0, count)]
 
-                if not arrItem.IsArray:
-                    self._VMState |= VMState.FAULT
-                    return
+        estack.Push(Struct(items))
 
-                arr = arrItem.GetArray()
-                arr.append(newItem)
+    def _OpAppend(self, opcode, context):
+        estack = self._EvaluationStack
+        newItem = estack.Pop()
 
-            elif opcode == REVERSE:
+        if type(newItem) is Struct:
+            newItem = newItem.Clone()
 
-                arrItem = estack.Pop()
-                if not arrItem.IsArray:
-                    self._VMState |= VMState.FAULT
-                    return
-                arrItem.GetArray().reverse()
+        arrItem = estack.Pop()
 
-            elif opcode == REMOVE:
-                index = estack.Pop().GetBigInteger()
-                arrItem = estack.Pop()
-                if not arrItem.IsArray:
-                    self._VMState |= VMState.FAULT
-                    return
-                items = arrItem.GetArray()
+        if not arrItem.IsArray:
+            self._VMState |= VMState.FAULT
+            return
 
-                if index < 0 or index >= len(items):
-                    self._VMState |= VMState.FAULT
-                    return
-                del items[index]
+        arr = arrItem.GetArray()
+        arr.append(newItem)
 
-            elif opcode == THROW:
-                self._VMState |= VMState.FAULT
-                return
+    def _OpReverse(self, opcode, context):
+        arrItem = self._EvaluationStack.Pop()
+        if not arrItem.IsArray:
+            self._VMState |= VMState.FAULT
+            return
+        arrItem.GetArray().reverse()
 
-            elif opcode == THROWIFNOT:
-                if not estack.Pop().GetBoolean():
-                    self._VMState |= VMState.FAULT
-                    return
+    def _OpRemove(self, opcode, context):
+        estack = self._EvaluationStack
+        index = estack.Pop().GetBigInteger()
+        arrItem = estack.Pop()
+        if not arrItem.IsArray:
+            self._VMState |= VMState.FAULT
+            return
+        items = arrItem.GetArray()
 
-            elif opcode == DEBUG:
-                pdb.set_trace()
-                return
+        if index < 0 or index >= len(items):
+            self._VMState |= VMState.FAULT
+            return
+        del items[index]
 
-            else:
+    # exceptions
 
-                self._VMState |= VMState.FAULT
-                return
+    def _OpThrow(self, opcode, context):
+        self._VMState |= VMState.FAULT
 
-        if self._VMState & VMState.FAULT == 0 and self.InvocationStack.Count > 0:
+    def _OpThrowIfNot(self, opcode, context):
+        if not self._EvaluationStack.Pop().GetBoolean():
+            self._VMState |= VMState.FAULT
 
-            if self.CurrentContext.InstructionPointer in self.CurrentContext.Breakpoints:
-                self._VMState |= VMState.BREAK
+    def _OpDebug(self, opcode, context):
+        pdb.set_trace()
 
     def LoadScript(self, script, push_only=False):
 
@@ -806,11 +815,12 @@ class ExecutionEngine():
             return
 
         op = None
+        context = self.CurrentContext
 
-        if self.CurrentContext.InstructionPointer >= len(self.CurrentContext.Script):
+        if context.InstructionPointer >= len(context.Script):
             op = RET
         else:
-            op = self.CurrentContext.OpReader.ReadByte(do_ord=False)
+            op = context.ReadInstruction()
 
 #        opname = ToName(op)
 #        logger.info("____________________________________________________")
@@ -820,7 +830,7 @@ class ExecutionEngine():
         self.ops_processed += 1
 
         try:
-            self.ExecuteOp(op, self.CurrentContext)
+            self.ExecuteOp(op, context)
         except Exception as e:
             logger.error("COULD NOT EXECUTE OP: %s %s %s" % (e, op, ToName(op)))
             logger.exception(e)
@@ -849,3 +859,6 @@ class ExecutionEngine():
                 self._InvocationStack.Count > count:
 
             self.StepInto()
+
+
+ExecutionEngine._OpTable = ExecutionEngine._BuildOpTable()
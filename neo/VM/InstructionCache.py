@@ -0,0 +1,184 @@
+import threading
+
+from collections import OrderedDict
+from io import BytesIO
+
+from neocore.IO.BinaryReader import BinaryReader
+
+from neo.VM.InteropService import SysCalls
+from neo.VM.OpCode import PUSHBYTES1, PUSHBYTES75, PUSHDATA1, PUSHDATA2, PUSHDATA4, JMP, JMPIF, JMPIFNOT, CALL, \
+    APPCALL, TAILCALL, SYSCALL
+
+PUSHBYTES1_INT = PUSHBYTES1[0]
+PUSHBYTES75_INT = PUSHBYTES75[0]
+PUSHDATA1_INT = PUSHDATA1[0]
+PUSHDATA2_INT = PUSHDATA2[0]
+PUSHDATA4_INT = PUSHDATA4[0]
+JUMP_INTS = (JMP[0], JMPIF[0], JMPIFNOT[0], CALL[0])
+CALL_INTS = (APPCALL[0], TAILCALL[0])
+SYSCALL_INT = SYSCALL[0]
+
+
+class Instruction():
+    """
+    A decoded VM instruction.
+
+    `Operand` holds what the opcode reads from the script: the pushed bytes, the signed jump
+    offset, the script hash of an APPCALL / TAILCALL or the `SysCalls` id of a SYSCALL name (the
+    name itself if it has no id). `Target` is the absolute offset of a jump or CALL, and
+    `NextOffset` the offset right after the operand.
+
+    An operand running past the end of the script is decoded exactly like the stream reader
+    did, so `NextOffset` is where that read stopped and `Error` the exception it raised.
+    """
+    __slots__ = ('OpCode', 'Operand', 'Target', 'NextOffset', 'Error')
+
+    def __init__(self, opcode, operand, target, next_offset, error):
+        self.OpCode = opcode
+        self.Operand = operand
+        self.Target = target
+        self.NextOffset = next_offset
+        self.Error = error
+
+
+def DecodeInstruction(script, offset):
+    """
+    Decode the instruction starting at `offset` of `script`.
+
+    Args:
+        script (bytes): the script.
+        offset (int): offset of the opcode, lower than the script length.
+
+    Returns:
+        Instruction: the decoded instruction.
+    """
+    opcode = script[offset:offset + 1]
+    op = opcode[0]
+
+    reader = BinaryReader(BytesIO(script))
+    reader.stream.seek(offset + 1)
+
+    operand = None
+    target = None
+    error = None
+
+    try:
+        if PUSHBYTES1_INT <= op <= PUSHBYTES75_INT:
+            operand = reader.ReadBytes(op)
+        elif op == PUSHDATA1_INT:
+            operand = reader.ReadBytes(reader.ReadByte())
+        elif op == PUSHDATA2_INT:
+            operand = reader.ReadBytes(reader.ReadUInt16())
+        elif op == PUSHDATA4_INT:
+            operand = reader.ReadBytes(reader.ReadUInt32())
+        elif op in JUMP_INTS:
+            operand = reader.ReadInt16()
+            target = offset + operand
+        elif op in CALL_INTS:
+            operand = reader.ReadBytes(20)
+        elif op == SYSCALL_INT:
+            operand = reader.ReadVarBytes(252).decode('ascii')
+            id = SysCalls.Find(operand)
+            if id is not None:
+                operand = id
+    except Exception as e:
+        error = e
+
+    return Instruction(opcode, operand, target, reader.stream.tell(), error)
+
+
+class DecodedScript():
+    """
+    The instructions of a script, decoded on first execution and indexed by offset.
+
+    Instructions are decoded from the offset execution actually reaches rather than in one sweep
+    over the script, so jumps into the middle of an instruction behave as before.
+    """
+    Script = None
+
+    def __init__(self, script):
+        self.Script = script
+        self._instructions = {}
+
+    def GetInstruction(self, offset):
+        instruction = self._instructions.get(offset)
+        if instruction is None:
+            instruction = DecodeInstruction(self.Script, offset)
+            self._instructions[offset] = instruction
+        return instruction
+
+    def __len__(self):
+        return len(self._instructions)
+
+
+class InstructionCache():
+    """
+    Bounded LRU cache of decoded scripts, keyed by script hash.
+
+    Contracts are invoked over and over with the same bytecode, so their instructions are only
+    decoded once and shared by all execution contexts running them.
+    """
+    max_size = None
+    hits = 0
+    misses = 0
+
+    _default = None
+
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def Default():
+        """
+        Get the cache shared by all execution engines.
+
+        Returns:
+            InstructionCache:
+        """
+        if InstructionCache._default is None:
+            InstructionCache._default = InstructionCache()
+        return InstructionCache._default
+
+    def Get(self, script_hash, script):
+        """
+        Get the decoded instructions of a script.
+
+        Args:
+            script_hash (bytes): hash of the script.
+            script (bytes): the script, decoded if not cached yet.
+
+        Returns:
+            DecodedScript:
+        """
+        with self._lock:
+            decoded = self._items.get(script_hash)
+            if decoded is not None:
+                self._items.move_to_end(script_hash)
+                self.hits += 1
+                return decoded
+
+            self.misses += 1
+            decoded = DecodedScript(script)
+            self._items[script_hash] = decoded
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+            return decoded
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def ToJson(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0,
+            }
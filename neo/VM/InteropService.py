@@ -1,3 +1,4 @@
+import threading
 
 from logzero import logger
 
@@ -6,6 +7,7 @@ from neocore.BigInteger import BigInteger
 
 
 class StackItem(EquatableMixin):
+    __slots__ = ()
 
     @property
     def IsArray(self):
@@ -66,8 +68,7 @@ class StackItem(EquatableMixin):
 
 
 class Array(StackItem):
-
-    _array = []  # a list of stack items
+    __slots__ = ('_array',)  # a list of stack items
 
     @property
     def IsArray(self):
@@ -106,12 +107,11 @@ class Array(StackItem):
 
 
 class Boolean(StackItem):
+    __slots__ = ('_value',)
 
     TRUE = bytearray([1])
     FALSE = bytearray([0])
 
-    _value = None
-
     def __init__(self, value):
         self._value = value
 
@@ -140,8 +140,7 @@ class Boolean(StackItem):
 
 
 class ByteArray(StackItem):
-
-    _value = None
+    __slots__ = ('_value',)
 
     def __init__(self, value):
         self._value = value
@@ -177,8 +176,7 @@ class ByteArray(StackItem):
 
 
 class Integer(StackItem):
-
-    _value = None
+    __slots__ = ('_value',)
 
     def __init__(self, value):
         if type(value) is not BigInteger:
@@ -210,8 +208,7 @@ class Integer(StackItem):
 
 
 class InteropInterface(StackItem):
-
-    _object = None
+    __slots__ = ('_object',)
 
     def __init__(self, value):
         self._object = value
@@ -245,6 +242,7 @@ class InteropInterface(StackItem):
 
 
 class Struct(Array):
+    __slots__ = ()
 
     @property
     def IsStruct(self):
@@ -281,19 +279,114 @@ class Struct(Array):
         return "Struct: %s " % self._array
 
 
+class SysCalls():
+    """
+    Interned syscall names.
+
+    Names registered by an interop service or priced by the engine get a small integer id, so a
+    SYSCALL decoded once per script offset can index the handler and price tables by id instead
+    of comparing names. Names only found in scripts are not interned, as scripts can contain any.
+    """
+    _ids = {}
+    _names = []
+    _lock = threading.Lock()
+
+    @staticmethod
+    def GetId(name):
+        """
+        Args:
+            name (str): the syscall name, eg. 'Neo.Storage.Get'.
+
+        Returns:
+            int: the id of the name.
+        """
+        id = SysCalls._ids.get(name)
+        if id is None:
+            with SysCalls._lock:
+                id = SysCalls._ids.get(name)
+                if id is None:
+                    id = len(SysCalls._names)
+                    SysCalls._names.append(name)
+                    SysCalls._ids[name] = id
+        return id
+
+    @staticmethod
+    def Find(name):
+        """
+        Returns:
+            int: the id of the name, or None if it was never interned.
+        """
+        return SysCalls._ids.get(name)
+
+    @staticmethod
+    def GetName(id):
+        return SysCalls._names[id]
+
+
 class InteropService():
 
+    # syscall name -> handler(service, engine) of the class, built once per class, see _RegisterMethods
     _dictionary = {}
 
-    def __init__(self):
-        self._dictionary = {}
-        self.Register("System.ExecutionEngine.GetScriptContainer", self.GetScriptContainer)
-        self.Register("System.ExecutionEngine.GetExecutingScriptHash", self.GetExecutingScriptHash)
-        self.Register("System.ExecutionEngine.GetCallingScriptHash", self.GetCallingScriptHash)
-        self.Register("System.ExecutionEngine.GetEntryScriptHash", self.GetEntryScriptHash)
+    # the same handlers indexed by syscall id, None for names not registered
+    _handlers = []
+
+    @classmethod
+    def _RegisterMethods(cls, register):
+        """
+        Register the syscalls of the class, subclasses extend it to add their own.
+
+        Args:
+            register (function): called with the syscall name and the unbound method handling it.
+        """
+        register("System.ExecutionEngine.GetScriptContainer", cls.GetScriptContainer)
+        register("System.ExecutionEngine.GetExecutingScriptHash", cls.GetExecutingScriptHash)
+        register("System.ExecutionEngine.GetCallingScriptHash", cls.GetCallingScriptHash)
+        register("System.ExecutionEngine.GetEntryScriptHash", cls.GetEntryScriptHash)
+
+    @classmethod
+    def _BuildMethods(cls):
+        """
+        Build the handler tables shared by all instances of the class.
+        """
+        dictionary = {}
+        cls._RegisterMethods(dictionary.__setitem__)
+
+        handlers = []
+        for method, func in dictionary.items():
+            id = SysCalls.GetId(method)
+            if id >= len(handlers):
+                handlers.extend([None] * (id + 1 - len(handlers)))
+            handlers[id] = func
+
+        cls._dictionary = dictionary
+        cls._handlers = handlers
+
+    def __init_subclass__(cls, **kwargs):
+        super(InteropService, cls).__init_subclass__(**kwargs)
+        cls._BuildMethods()
 
     def Register(self, method, func):
-        self._dictionary[method] = func
+        """
+        Register a syscall on this instance only, on top of the ones of its class.
+
+        Args:
+            method (str): the syscall name.
+            func (function): called with the engine.
+        """
+        if self._dictionary is type(self)._dictionary:
+            self._dictionary = dict(self._dictionary)
+            self._handlers = list(self._handlers)
+
+        def handler(service, engine):
+            return func(engine)
+
+        self._dictionary[method] = handler
+
+        id = SysCalls.GetId(method)
+        if id >= len(self._handlers):
+            self._handlers.extend([None] * (id + 1 - len(self._handlers)))
+        self._handlers[id] = handler
 
     def Invoke(self, method, engine):
         if method not in self._dictionary.keys():
@@ -305,30 +398,41 @@ class InteropService():
 
         func = self._dictionary[method]
         # logger.info("[InteropService Method] %s " % func)
-        return func(engine)
+        return func(self, engine)
 
-    @staticmethod
-    def GetScriptContainer(engine):
+    def InvokeById(self, id, engine):
+        """
+        Invoke a syscall by the id of its name, see `SysCalls`.
+        """
+        handlers = self._handlers
+        if id < len(handlers):
+            func = handlers[id]
+            if func is not None:
+                return func(self, engine)
+
+        return self.Invoke(SysCalls.GetName(id), engine)
+
+    def GetScriptContainer(self, engine):
         engine.EvaluationStack.PushT(StackItem.FromInterface(engine.ScriptContainer))
         return True
 
-    @staticmethod
-    def GetExecutingScriptHash(engine):
+    def GetExecutingScriptHash(self, engine):
         engine.EvaluationStack.PushT(engine.CurrentContext.ScriptHash())
         return True
 
-    @staticmethod
-    def GetCallingScriptHash(engine):
+    def GetCallingScriptHash(self, engine):
         engine.EvaluationStack.PushT(engine.CallingContext.ScriptHash())
         return True
 
-    @staticmethod
-    def GetEntryScriptHash(engine):
+    def GetEntryScriptHash(self, engine):
 
         engine.EvaluationStack.PushT(engine.EntryContext.ScriptHash())
         return True
 
 
+InteropService._BuildMethods()
+
+
 def stack_item_to_py(stack_item):
     """
     Helper to convert a StackItem subclass to the specific Python object.
@@ -1,5 +1,6 @@
 
 class EquatableMixin():
+    __slots__ = ()
 
     def Equals(self, other):
         pass
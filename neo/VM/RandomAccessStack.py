@@ -34,18 +34,36 @@ class RandomAccessStack():
         self._list.insert(index, item)
 
     def Peek(self, index=0):
+        lst = self._list
+        if index == 0:
+            if not lst:
+                raise Exception("Invalid list operation")
+            return lst[-1]
+
         index = int(index)
-        if index >= self.Count:
+        if index >= len(lst):
             raise Exception("Invalid list operation")
 
-        return self._list[self.Count - 1 - index]
+        return lst[len(lst) - 1 - index]
 
     def Pop(self):
         #        self.PrintList("POPSTACK <- ")
-        return self.Remove(0)
+        lst = self._list
+        if not lst:
+            raise Exception("Invalid list operation")
+        return lst.pop()
+
+    def Push(self, item):
+        """
+        Push an item without converting it, for items taken from a stack.
+
+        Args:
+            item (StackItem): the item.
+        """
+        self._list.append(item)
 
     def PushT(self, item):
-        if not type(item) is StackItem and not issubclass(type(item), StackItem):
+        if not isinstance(item, StackItem):
             item = StackItem.New(item)
 
         self._list.append(item)
@@ -66,7 +84,7 @@ class RandomAccessStack():
         if index < 0 or index > self.Count:
             raise Exception("Invalid list operation")
 
-        if not type(item) is StackItem and not issubclass(type(item), StackItem):
+        if not isinstance(item, StackItem):
             item = StackItem.New(item)
 
         self._list[self.Count - index - 1] = item
@@ -0,0 +1,75 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.VM.ExecutionEngine import ExecutionEngine
+from neo.VM.InstructionCache import InstructionCache, DecodeInstruction
+from neo.VM.InteropService import InteropService, SysCalls
+from neo.VM import OpCode
+from neo.VM import VMState
+from neocore.Cryptography.Crypto import Crypto
+
+
+class InstructionCacheTestCase(NeoTestCase):
+
+    def test_decode_operands(self):
+        # registers the System.ExecutionEngine syscalls
+        InteropService()
+
+        script = OpCode.PUSHDATA1 + b'\x03abc' + OpCode.JMP + (-6).to_bytes(2, 'little', signed=True) + OpCode.SYSCALL + b'\x04Test'
+
+        push = DecodeInstruction(script, 0)
+        self.assertEqual(push.OpCode, OpCode.PUSHDATA1)
+        self.assertEqual(push.Operand, b'abc')
+        self.assertEqual(push.NextOffset, 5)
+
+        jump = DecodeInstruction(script, 5)
+        self.assertEqual(jump.Operand, -6)
+        self.assertEqual(jump.Target, -1)
+        self.assertEqual(jump.NextOffset, 8)
+
+        # names without an interned id are kept as is
+        syscall = DecodeInstruction(script, 8)
+        self.assertEqual(syscall.Operand, 'Test')
+        self.assertEqual(syscall.NextOffset, len(script))
+
+        name = b'System.ExecutionEngine.GetScriptContainer'
+        syscall = DecodeInstruction(OpCode.SYSCALL + bytes([len(name)]) + name, 0)
+        self.assertEqual(SysCalls.GetName(syscall.Operand), name.decode('ascii'))
+
+    def test_decode_truncated(self):
+        # PUSHBYTES reads what is left, a truncated jump offset raises on execution
+        push = DecodeInstruction(b'\x05ab', 0)
+        self.assertEqual(push.Operand, b'ab')
+        self.assertIsNone(push.Error)
+
+        jump = DecodeInstruction(OpCode.JMP + b'\x01', 0)
+        self.assertIsNotNone(jump.Error)
+        self.assertEqual(jump.NextOffset, 2)
+
+    def test_lru(self):
+        cache = InstructionCache(max_size=2)
+        first = cache.Get(b'a', b'\x51')
+        cache.Get(b'b', b'\x52')
+        self.assertIs(cache.Get(b'a', b'\x51'), first)
+        cache.Get(b'c', b'\x53')
+
+        self.assertIs(cache.Get(b'a', b'\x51'), first)
+        self.assertEqual(cache.ToJson()['size'], 2)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 3)
+
+        cache.Get(b'b', b'\x52')
+        self.assertEqual(cache.misses, 4)
+
+    def test_execute_shared_script(self):
+        # CALL into a subroutine, loop back through the cached instructions twice
+        script = OpCode.PUSH2 + OpCode.CALL + (4).to_bytes(2, 'little') + OpCode.RET + OpCode.PUSH3 + OpCode.ADD + OpCode.RET
+
+        for i in range(2):
+            engine = ExecutionEngine(crypto=Crypto)
+            engine.LoadScript(script)
+            engine.Execute()
+
+            self.assertEqual(engine.State, VMState.HALT)
+            self.assertEqual(engine.EvaluationStack.Pop().GetBigInteger(), 5)
+
+        decoded = InstructionCache.Default().Get(Crypto.Hash160(script), script)
+        self.assertEqual(len(decoded), 6)
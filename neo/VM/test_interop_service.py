@@ -0,0 +1,30 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.VM.InteropService import InteropService, SysCalls
+from neo.SmartContract.StateReader import StateReader
+from neo.SmartContract.StateMachine import StateMachine
+
+
+class InteropServiceTestCase(NeoTestCase):
+
+    def test_class_methods(self):
+        # built once per class, subclasses override the methods of their parents
+        self.assertIs(StateReader()._dictionary, StateReader()._dictionary)
+        self.assertIs(StateMachine._dictionary['Neo.Blockchain.GetAccount'], StateMachine.Blockchain_GetAccount)
+        self.assertIs(StateReader._dictionary['Neo.Blockchain.GetAccount'], StateReader.Blockchain_GetAccount)
+
+        self.assertIn('Neo.Storage.Put', StateMachine._dictionary)
+        self.assertNotIn('Neo.Storage.Put', StateReader._dictionary)
+        self.assertIn('System.ExecutionEngine.GetScriptContainer', StateMachine._dictionary)
+
+    def test_register_instance(self):
+        calls = []
+
+        service = InteropService()
+        service.Register("Test.Interop.Call", lambda engine: calls.append(engine) or True)
+
+        self.assertTrue(service.Invoke("Test.Interop.Call", 'engine'))
+        self.assertTrue(service.InvokeById(SysCalls.GetId("Test.Interop.Call"), 'engine'))
+        self.assertEqual(calls, ['engine', 'engine'])
+
+        self.assertFalse(InteropService().Invoke("Test.Interop.Call", 'engine'))
+        self.assertNotIn("Test.Interop.Call", InteropService._dictionary)
@@ -0,0 +1,45 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.VM.InteropService import StackItem, Array, Struct, Integer
+from neo.VM.RandomAccessStack import RandomAccessStack
+from neocore.BigInteger import BigInteger
+
+
+class StackItemsTestCase(NeoTestCase):
+
+    def test_items_not_shared(self):
+        self.assertIsNot(StackItem.New(True), StackItem.New(True))
+        self.assertIsNot(StackItem.New(1), StackItem.New(BigInteger(1)))
+        self.assertEqual(StackItem.New(255).GetBigInteger(), 255)
+
+    def test_slots(self):
+        item = Integer(BigInteger(3))
+        with self.assertRaises(AttributeError):
+            item.foo = 1
+
+    def test_equals(self):
+        one = StackItem.New(1)
+
+        # arrays and structs compare their elements by identity
+        for container in [Array, Struct]:
+            items = container([one])
+            self.assertTrue(items.Equals(items))
+            self.assertTrue(items.Equals(container([one])))
+            self.assertFalse(items.Equals(container([StackItem.New(1)])))
+            self.assertFalse(items.Equals(container([one, one])))
+
+        self.assertFalse(Array([one]).Equals(Struct([one])))
+        self.assertFalse(Struct([one]).Equals(Array([one])))
+
+    def test_stack(self):
+        stack = RandomAccessStack()
+        with self.assertRaises(Exception):
+            stack.Pop()
+        with self.assertRaises(Exception):
+            stack.Peek()
+
+        stack.PushT(1)
+        stack.Push(StackItem.New(b'\x02'))
+        self.assertEqual(stack.Peek().GetByteArray(), b'\x02')
+        self.assertEqual(stack.Peek(1).GetBigInteger(), 1)
+        self.assertEqual(stack.Pop().GetByteArray(), b'\x02')
+        self.assertEqual(stack.Count, 1)
@@ -17,6 +17,7 @@ class Coin(TrackableMixin):
 
     _address = None
     _state = CoinState.Unconfirmed
+    _store = None
 
     @staticmethod
     def CoinFromRef(coin_ref, tx_output, state=CoinState.Unconfirmed):
@@ -87,6 +88,10 @@ class Coin(TrackableMixin):
         """
         self._state = value
 
+        # keep the index of the wallet coin store in sync
+        if self._store is not None:
+            self._store.OnStateChanged(self)
+
     def Equals(self, other):
         """
         Compare `other` to self.
@@ -0,0 +1,181 @@
+# -*- coding:utf-8 -*-
+"""
+Description:
+    indexed store of the coins of a wallet
+Usage:
+    from neo.Wallets.CoinStore import CoinStore
+"""
+from bisect import bisect_left, insort
+
+from neo.Core.State.CoinState import CoinState
+
+UNSPENDABLE = CoinState.Spent | CoinState.Locked | CoinState.Frozen
+
+
+def IsSpendable(state):
+    """
+    Check if a coin in the given state can be spent.
+
+    Args:
+        state (neo.Core.State.CoinState):
+
+    Returns:
+        bool: True if confirmed and neither spent, locked nor frozen.
+    """
+    return state & CoinState.Confirmed > 0 and state & UNSPENDABLE == 0
+
+
+class CoinBucket():
+    """
+    The spendable coins of one asset at one address, either watch only or not.
+
+    `Entries` holds (value, order, coin) tuples sorted by value, coins of the same value in the
+    order they were added to the store, and `Total` the sum of their values.
+    """
+    __slots__ = ('AssetId', 'ScriptHash', 'WatchOnly', 'Entries', 'Total')
+
+    def __init__(self, asset_id, script_hash, watch_only):
+        self.AssetId = asset_id
+        self.ScriptHash = script_hash
+        self.WatchOnly = watch_only
+        self.Entries = []
+        self.Total = 0
+
+
+class CoinStore(dict):
+    """
+    The coins of a wallet keyed by `CoinReference`, with their spendable coins indexed by
+    (asset, address, watch only) in value sorted buckets.
+
+    Coins notify the store they are in of their state changes, so coins can be updated in
+    place, as before. `Order()` gives the position of a coin in the iteration order.
+    """
+
+    def __init__(self, coins=None):
+        super(CoinStore, self).__init__()
+        self._buckets = {}
+        self._indexed = {}
+        self._order = {}
+        self._next_order = 0
+
+        if coins:
+            for key, coin in coins.items():
+                self[key] = coin
+
+    def __setitem__(self, key, coin):
+        old = self.get(key)
+        if old is not None:
+            self._Unindex(key)
+            old._store = None
+        else:
+            self._order[key] = self._next_order
+            self._next_order += 1
+
+        super(CoinStore, self).__setitem__(key, coin)
+        coin._store = self
+        self._Index(key, coin)
+
+    def __delitem__(self, key):
+        coin = self[key]
+        self._Unindex(key)
+        coin._store = None
+        del self._order[key]
+        super(CoinStore, self).__delitem__(key)
+
+    def clear(self):
+        for coin in self.values():
+            coin._store = None
+        self._buckets.clear()
+        self._indexed.clear()
+        self._order.clear()
+        super(CoinStore, self).clear()
+
+    def Order(self, key):
+        return self._order[key]
+
+    def OnStateChanged(self, coin):
+        """
+        Update the index of a coin after its state changed.
+
+        Args:
+            coin (neo.Wallets.Coin): a coin of this store.
+        """
+        key = coin.Reference
+        self._Unindex(key)
+        self._Index(key, coin)
+
+    def _Index(self, key, coin):
+        state = coin.State
+        if not IsSpendable(state):
+            return
+
+        output = coin.Output
+        watch_only = state & CoinState.WatchOnly
+        bucket_key = (output.AssetId.ToBytes(), output.ScriptHash.ToBytes(), watch_only)
+
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            bucket = CoinBucket(output.AssetId, output.ScriptHash, watch_only)
+            self._buckets[bucket_key] = bucket
+
+        entry = (output.Value.value, self._order[key], coin)
+        insort(bucket.Entries, entry)
+        bucket.Total += entry[0]
+        self._indexed[key] = (bucket_key, entry)
+
+    def _Unindex(self, key):
+        indexed = self._indexed.pop(key, None)
+        if indexed is None:
+            return
+
+        bucket_key, entry = indexed
+        bucket = self._buckets[bucket_key]
+        del bucket.Entries[bisect_left(bucket.Entries, entry[:2])]
+        bucket.Total -= entry[0]
+
+        if not bucket.Entries:
+            del self._buckets[bucket_key]
+
+    def GetBuckets(self, asset_id=None, script_hash=None, watch_only_val=0):
+        """
+        Get the buckets of spendable coins.
+
+        Args:
+            asset_id (UInt256): only the buckets of this asset if given.
+            script_hash (UInt160): only the buckets of this address if given.
+            watch_only_val (int): a flag ( 0 or 64 ) indicating whether to get watch only buckets.
+
+        Returns:
+            list: of CoinBucket.
+        """
+        asset_key = asset_id.ToBytes() if asset_id is not None else None
+        address_key = script_hash.ToBytes() if script_hash is not None else None
+
+        if asset_key is not None and address_key is not None:
+            bucket = self._buckets.get((asset_key, address_key, watch_only_val))
+            return [bucket] if bucket is not None else []
+
+        buckets = []
+        for (asset, address, watch_only), bucket in self._buckets.items():
+            if watch_only != watch_only_val:
+                continue
+            if asset_key is not None and asset != asset_key:
+                continue
+            if address_key is not None and address != address_key:
+                continue
+            buckets.append(bucket)
+        return buckets
+
+    def GetBucketOf(self, key):
+        """
+        Get the key of the bucket holding a coin.
+
+        Args:
+            key (neo.Core.CoinReference): reference of the coin.
+
+        Returns:
+            tuple: (asset id, script hash, watch only) bytes key of the bucket, None if the coin
+                   is not spendable.
+        """
+        indexed = self._indexed.get(key)
+        return indexed[0] if indexed is not None else None
@@ -5,7 +5,9 @@ Description:
 Usage:
     from neo.Wallets.Wallet import Wallet
 """
+import heapq
 import traceback
+from bisect import bisect_left
 from itertools import groupby
 from base58 import b58decode
 from decimal import Decimal
@@ -22,6 +24,7 @@ from neocore.Cryptography.Helper import *
 from neocore.Cryptography.Crypto import Crypto
 from neo.Wallets.AddressState import AddressState
 from neo.Wallets.Coin import Coin
+from neo.Wallets.CoinStore import CoinStore
 from neocore.KeyPair import KeyPair
 from neo.Wallets.NEP5Token import NEP5Token
 from neo.Settings import settings
@@ -43,7 +46,7 @@ class Wallet(object):
     _contracts = {}  # holds Contracts
     _tokens = {}  # holds references to NEP5 tokens
     _watch_only = []  # holds set of hashes
-    _coins = {}  # holds Coin References
+    _coins = CoinStore()  # holds Coin References
 
     _current_height = 0
 
@@ -76,7 +79,7 @@ class Wallet(object):
             self._master_key = bytes(Random.get_random_bytes(32))
             self._keys = {}
             self._contracts = {}
-            self._coins = {}
+            self._coins = CoinStore()
 
             if Blockchain.Default() is None:
                 self._indexedDB = LevelDBBlockchain(settings.LEVELDB_PATH)
@@ -125,7 +128,7 @@ class Wallet(object):
             self._contracts = self.LoadContracts()
             self._watch_only = self.LoadWatchOnly()
             self._tokens = self.LoadNEP5Tokens()
-            self._coins = self.LoadCoins()
+            self._coins = CoinStore(self.LoadCoins())
             try:
                 h = int(self.LoadStoredData('Height'))
                 self._current_height = h
@@ -360,17 +363,43 @@ class Wallet(object):
             vins: A list of ``neo.Core.CoinReference`` objects.
 
         Returns:
-            list: A list of ``neo.Wallet.Coin`` objects.
+            list: A list of ``neo.Wallet.Coin`` objects, in the order of the wallet coins.
         """
+        counts = {}
+        for vin in vins:
+            if vin in self._coins:
+                counts[vin] = counts.get(vin, 0) + 1
+
         ret = []
-        for coin in self.GetCoins():
-            coinref = coin.Reference
-            for vin in vins:
-                if coinref.PrevIndex == vin.PrevIndex and \
-                        coinref.PrevHash == vin.PrevHash:
-                    ret.append(coin)
+        for vin in sorted(counts, key=self._coins.Order):
+            ret.extend([self._coins[vin]] * counts[vin])
         return ret
 
+    def _FindUnspentBuckets(self, asset_id=None, from_addr=None, use_standard=False, watch_only_val=0):
+        """
+        Get the buckets of unspent coins matching the arguments of `FindUnspentCoins`.
+
+        Returns:
+            list: a list of ``neo.Wallets.CoinStore.CoinBucket``.
+        """
+        buckets = self._coins.GetBuckets(asset_id, from_addr, watch_only_val)
+
+        if from_addr is None and use_standard:
+            buckets = [bucket for bucket in buckets if self._contracts[bucket.ScriptHash.ToBytes()].IsStandard]
+
+        return buckets
+
+    def _FindUnspentEntries(self, buckets):
+        """
+        Get the (value, order, coin) entries of the coins in `buckets` not excluded, in the order of the wallet coins.
+        """
+        entries = [entry for bucket in buckets for entry in bucket.Entries]
+        if self._vin_exclude:
+            entries = [entry for entry in entries if entry[2].Reference not in self._vin_exclude]
+
+        entries.sort(key=lambda entry: entry[1])
+        return entries
+
     def FindUnspentCoins(self, from_addr=None, use_standard=False, watch_only_val=0):
         """
         Finds unspent coin objects in the wallet.
@@ -383,37 +412,8 @@ class Wallet(object):
         Returns:
             list: a list of ``neo.Wallet.Coins`` in the wallet that are not spent.
         """
-        ret = []
-        for coin in self.GetCoins():
-            if coin.State & CoinState.Confirmed > 0 and \
-                    coin.State & CoinState.Spent == 0 and \
-                    coin.State & CoinState.Locked == 0 and \
-                    coin.State & CoinState.Frozen == 0 and \
-                    coin.State & CoinState.WatchOnly == watch_only_val:
-
-                do_exclude = False
-                if self._vin_exclude:
-                    for to_exclude in self._vin_exclude:
-
-                        if coin.Reference.PrevIndex == to_exclude.PrevIndex and \
-                                coin.Reference.PrevHash == to_exclude.PrevHash:
-                            do_exclude = True
-
-                if do_exclude:
-                    continue
-
-                if from_addr is not None:
-                    if coin.Output.ScriptHash == from_addr:
-                        ret.append(coin)
-                elif use_standard:
-
-                    contract = self._contracts[coin.Output.ScriptHash.ToBytes()]
-                    if contract.IsStandard:
-                        ret.append(coin)
-                else:
-                    ret.append(coin)
-
-        return ret
+        buckets = self._FindUnspentBuckets(from_addr=from_addr, use_standard=use_standard, watch_only_val=watch_only_val)
+        return [entry[2] for entry in self._FindUnspentEntries(buckets)]
 
     def FindUnspentCoinsByAsset(self, asset_id, from_addr=None, use_standard=False, watch_only_val=0):
         """
@@ -428,9 +428,8 @@ class Wallet(object):
         Returns:
             list: a list of ``neo.Wallet.Coin`` in the wallet that are not spent
         """
-        coins = self.FindUnspentCoins(from_addr=from_addr, use_standard=use_standard, watch_only_val=watch_only_val)
-
-        return [coin for coin in coins if coin.Output.AssetId == asset_id]
+        buckets = self._FindUnspentBuckets(asset_id, from_addr=from_addr, use_standard=use_standard, watch_only_val=watch_only_val)
+        return [entry[2] for entry in self._FindUnspentEntries(buckets)]
 
     def FindUnspentCoinsByAssetAndTotal(self, asset_id, amount, from_addr=None, use_standard=False, watch_only_val=0, reverse=False):
         """
@@ -446,34 +445,55 @@ class Wallet(object):
         Returns:
             list: a list of ``neo.Wallet.Coin`` in the wallet that are not spent. this list is empty if there are not enough coins to satisfy the request.
         """
-        coins = self.FindUnspentCoinsByAsset(asset_id, from_addr=from_addr,
-                                             use_standard=use_standard, watch_only_val=watch_only_val)
+        buckets = self._FindUnspentBuckets(asset_id, from_addr=from_addr, use_standard=use_standard, watch_only_val=watch_only_val)
+        exclude = self._vin_exclude or ()
 
-        sum = Fixed8(0)
+        sum = 0
+        for bucket in buckets:
+            sum += bucket.Total
 
-        for coin in coins:
-            sum = sum + coin.Output.Value
+        if exclude:
+            bucket_keys = set((bucket.AssetId.ToBytes(), bucket.ScriptHash.ToBytes(), bucket.WatchOnly) for bucket in buckets)
+            for vin in exclude:
+                if self._coins.GetBucketOf(vin) in bucket_keys:
+                    sum -= self._coins[vin].Output.Value.value
 
-        if sum < amount:
+        if Fixed8(sum) < amount:
             return None
 
-        coins = sorted(coins, key=lambda coin: coin.Output.Value.value)
-
+        # coins sorted by value, then in the order of the wallet coins
         if reverse:
-            coins.reverse()
-
-        total = Fixed8(0)
-
-        # go through all coins, see if one is an exact match. then we'll use that
-        for coin in coins:
-            if coin.Output.Value == amount:
-                return [coin]
-
+            entries = heapq.merge(*[reversed(bucket.Entries) for bucket in buckets], reverse=True)
+        else:
+            entries = heapq.merge(*[bucket.Entries for bucket in buckets])
+
+        # see if one coin is an exact match. then we'll use that
+        exact = None
+        for bucket in buckets:
+            index = bisect_left(bucket.Entries, (amount.value,))
+            matches = []
+            while index < len(bucket.Entries) and bucket.Entries[index][0] == amount.value:
+                if bucket.Entries[index][2].Reference not in exclude:
+                    matches.append(bucket.Entries[index])
+                index += 1
+
+            if matches:
+                match = matches[-1] if reverse else matches[0]
+                if exact is None or (match[1] > exact[1] if reverse else match[1] < exact[1]):
+                    exact = match
+
+        if exact is not None:
+            return [exact[2]]
+
+        total = 0
         to_ret = []
-        for coin in coins:
-            total = total + coin.Output.Value
+        for value, order, coin in entries:
+            if coin.Reference in exclude:
+                continue
+
+            total += value
             to_ret.append(coin)
-            if total >= amount:
+            if Fixed8(total) >= amount:
                 break
 
         return to_ret
@@ -603,14 +623,8 @@ class Wallet(object):
         if type(asset_id) is NEP5Token:
             return self.GetTokenBalance(asset_id, watch_only)
 
-        for coin in self.GetCoins():
-            if coin.Output.AssetId == asset_id:
-                if coin.State & CoinState.Confirmed > 0 and \
-                        coin.State & CoinState.Spent == 0 and \
-                        coin.State & CoinState.Locked == 0 and \
-                        coin.State & CoinState.Frozen == 0 and \
-                        coin.State & CoinState.WatchOnly == watch_only:
-                    total = total + coin.Output.Value
+        for bucket in self._coins.GetBuckets(asset_id, watch_only_val=watch_only):
+            total = total + Fixed8(bucket.Total)
 
         return total
 
@@ -754,7 +768,7 @@ class Wallet(object):
         Sets the current height to 0 and now `ProcessBlocks` will start from
         the beginning of the blockchain.
         """
-        self._coins = {}
+        self._coins = CoinStore()
         self._current_height = 0
 
     def OnProcessNewBlock(self, block, added, changed, deleted):
@@ -1045,7 +1059,7 @@ class Wallet(object):
 
         paycoins = {}
 
-        self._vin_exclude = exclude_vin
+        self._vin_exclude = set(exclude_vin) if exclude_vin else None
 
         for assetId, amount in paytotal.items():
 
@@ -1116,18 +1130,12 @@ class Wallet(object):
         Returns:
             bool: True is successfully processes, otherwise False if input is not in the coin list, already spent or not confirmed.
         """
-        coins = self.GetCoins()
         changed = []
         added = []
         deleted = []
         found_coin = False
         for input in tx.inputs:
-            coin = None
-
-            for coinref in coins:
-                test_coin = coinref.Reference
-                if test_coin == input:
-                    coin = coinref
+            coin = self._coins.get(input)
 
             if coin is None:
                 return False
@@ -0,0 +1,76 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Core.CoinReference import CoinReference
+from neo.Core.TX.Transaction import TransactionOutput
+from neo.Core.State.CoinState import CoinState
+from neo.Wallets.Coin import Coin
+from neo.Wallets.CoinStore import CoinStore
+from neo.Wallets.Wallet import Wallet
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+from neocore.UInt256 import UInt256
+
+
+class CoinStoreTestCase(NeoTestCase):
+
+    neo = UInt256(data=bytearray(b'\x01' * 32))
+    gas = UInt256(data=bytearray(b'\x02' * 32))
+    address = UInt160(data=bytearray(b'\x03' * 20))
+
+    def new_coin(self, index, value, asset=None, state=CoinState.Confirmed):
+        reference = CoinReference(UInt256(data=bytearray(index.to_bytes(32, 'little'))), 0)
+        output = TransactionOutput(asset or self.neo, Fixed8.FromDecimal(value), self.address)
+        return Coin.CoinFromRef(reference, output, state)
+
+    def new_wallet(self, coins):
+        wallet = Wallet.__new__(Wallet)
+        wallet._contracts = {}
+        wallet._vin_exclude = None
+        wallet._coins = CoinStore()
+        for coin in coins:
+            wallet._coins[coin.Reference] = coin
+        return wallet
+
+    def test_index(self):
+        coins = [self.new_coin(1, 5), self.new_coin(2, 1), self.new_coin(3, 5), self.new_coin(4, 2, asset=self.gas)]
+        store = CoinStore({coin.Reference: coin for coin in coins})
+
+        bucket, = store.GetBuckets(self.neo)
+        self.assertEqual([entry[2] for entry in bucket.Entries], [coins[1], coins[0], coins[2]])
+        self.assertEqual(bucket.Total, Fixed8.FromDecimal(11).value)
+
+        # state changes in place are indexed
+        coins[0].State |= CoinState.Spent
+        self.assertEqual(store.GetBuckets(self.neo)[0].Total, Fixed8.FromDecimal(6).value)
+        self.assertIsNone(store.GetBucketOf(coins[0].Reference))
+
+        coins[2].State |= CoinState.WatchOnly
+        self.assertEqual(len(store.GetBuckets(self.neo, watch_only_val=CoinState.WatchOnly)), 1)
+
+        del store[coins[1].Reference]
+        self.assertEqual(store.GetBuckets(self.neo), [])
+        coins[1].State = CoinState.Confirmed
+        self.assertEqual(store.GetBuckets(self.neo), [])
+
+    def test_find_unspent_coins(self):
+        coins = [self.new_coin(i, value) for i, value in enumerate([3, 1, 2, 2, 7])]
+        coins.append(self.new_coin(10, 4, state=CoinState.Unconfirmed))
+        wallet = self.new_wallet(coins)
+
+        # in the order of the wallet coins
+        self.assertEqual(wallet.FindUnspentCoinsByAsset(self.neo), coins[:5])
+        self.assertEqual(wallet.GetBalance(self.neo), Fixed8.FromDecimal(15))
+
+        self.assertEqual(wallet.FindUnspentCoinsByAssetAndTotal(self.neo, Fixed8.FromDecimal(2)), [coins[2]])
+        self.assertEqual(wallet.FindUnspentCoinsByAssetAndTotal(self.neo, Fixed8.FromDecimal(2), reverse=True), [coins[3]])
+        self.assertEqual(wallet.FindUnspentCoinsByAssetAndTotal(self.neo, Fixed8.FromDecimal(4)), [coins[1], coins[2], coins[3]])
+        self.assertEqual(wallet.FindUnspentCoinsByAssetAndTotal(self.neo, Fixed8.FromDecimal(8), reverse=True), [coins[4], coins[0]])
+        self.assertIsNone(wallet.FindUnspentCoinsByAssetAndTotal(self.neo, Fixed8.FromDecimal(16)))
+
+        wallet._vin_exclude = {coins[2].Reference, coins[4].Reference}
+        self.assertEqual(wallet.FindUnspentCoinsByAssetAndTotal(self.neo, Fixed8.FromDecimal(2)), [coins[3]])
+        self.assertIsNone(wallet.FindUnspentCoinsByAssetAndTotal(self.neo, Fixed8.FromDecimal(9)))
+
+        # in the order of the wallet coins, once per matching vin
+        self.assertEqual(wallet.FindCoinsByVins([coins[4].Reference, coins[0].Reference]), [coins[0], coins[4]])
+        self.assertEqual(wallet.FindCoinsByVins([coins[4].Reference, self.new_coin(20, 1).Reference, coins[1].Reference,
+                                                 coins[4].Reference]), [coins[1], coins[4], coins[4]])